@@ -1,6 +1,11 @@
 import fs from "fs";
+import path from "path";
+import { spawn } from "child_process";
+import { fileURLToPath } from "url";
 import { GoogleGenerativeAI } from "@google/generative-ai";
 
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+
 // Initialize Google Generative AI with API Key from environment variable
 const genAI = new GoogleGenerativeAI(process.env.GOOGLE_API_KEY);
 
@@ -79,10 +84,38 @@ test.describe('Login Tests', () => {
   }
 }
 
+// Compile test cases locally with playwright_compiler.py: steps are translated from templates
+// and a selector map built from figma_data.json, and only unresolved steps go to the local LLM.
+function compileToPlaywright(inputTxtFile, outputJsFile, figmaDataFile) {
+  const args = [path.join(__dirname, "playwright_compiler.py"), inputTxtFile, "--output", outputJsFile];
+  if (fs.existsSync(figmaDataFile)) {
+    args.push("--figma", figmaDataFile);
+  } else {
+    console.warn(`⚠️ ${figmaDataFile} not found; selectors will be guessed from the step text.`);
+  }
+  return new Promise((resolve, reject) => {
+    const compiler = spawn("python", args, { stdio: "inherit" });
+    compiler.on("error", reject);
+    compiler.on("close", (code) => {
+      if (code !== 0) {
+        return reject(new Error(`playwright_compiler.py exited with code ${code}`));
+      }
+      console.log(`✅ Playwright test cases saved in ${outputJsFile}`);
+      resolve();
+    });
+  });
+}
+
 // Example usage
 // jsonToTxt("test_cases.json", "output.txt");
-// Example usage
-convertToPlaywright("test_cases.txt", "playwright_tests2.js");
+// Set PLAYWRIGHT_CONVERTER=gemini to convert the whole file with Gemini instead.
+if (process.env.PLAYWRIGHT_CONVERTER === "gemini") {
+  convertToPlaywright("test_cases.txt", "playwright_tests2.js");
+} else {
+  compileToPlaywright("test_cases.txt", "playwright_tests2.js", "figma_data.json").catch((error) => {
+    console.error("❌ Error compiling Playwright test cases:", error);
+  });
+}
 
 function jsonToTxt(inputFile, outputFile) {
   // Read the JSON file
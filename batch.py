@@ -0,0 +1,93 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_manifest(manifest_path, default_srs_file=None):
+    """Return the list of {id, figma, srs} jobs described by a manifest.
+
+    The manifest is either a JSONL file with one {"figma": ..., "srs": ..., "id": ...}
+    object per line (paths relative to the manifest), or a directory of Figma
+    exports where `design.json` is paired with `design.txt` when it exists.
+    Jobs without an SRS summary fall back to default_srs_file.
+    """
+    jobs = []
+    if os.path.isdir(manifest_path):
+        for name in sorted(os.listdir(manifest_path)):
+            stem, extension = os.path.splitext(name)
+            if extension != ".json":
+                continue
+            srs_file = os.path.join(manifest_path, f"{stem}.txt")
+            jobs.append({
+                "id": stem,
+                "figma": os.path.join(manifest_path, name),
+                "srs": srs_file if os.path.exists(srs_file) else default_srs_file,
+            })
+    else:
+        base_dir = os.path.dirname(os.path.abspath(manifest_path))
+        with open(manifest_path, 'r', encoding="utf-8") as file:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if "figma" not in entry:
+                    raise ValueError(f"Manifest line {line_number} has no 'figma' path")
+                jobs.append({
+                    "id": str(entry.get("id") or os.path.splitext(os.path.basename(entry["figma"]))[0]),
+                    "figma": os.path.join(base_dir, entry["figma"]),
+                    # Only manifest paths are relative to the manifest; the fallback is used as given
+                    "srs": os.path.join(base_dir, entry["srs"]) if entry.get("srs") else default_srs_file,
+                })
+
+    # Job ids name the output directories, so they must be unique.
+    seen = {}
+    for job in jobs:
+        count = seen.get(job["id"], 0)
+        seen[job["id"]] = count + 1
+        if count:
+            job["id"] = f"{job['id']}-{count + 1}"
+    return jobs
+
+
+def run_batch(jobs, run_job, output_dir, workers=2):
+    """Run run_job(job, job_output_dir) for every job on a shared worker pool.
+
+    run_job returns a dict of per-job details to include in the report, or raises
+    on failure. The report, with per-job timings, is written to
+    output_dir/batch_report.json and returned.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def run(job):
+        job_output_dir = os.path.join(output_dir, job["id"])
+        os.makedirs(job_output_dir, exist_ok=True)
+        started = time.perf_counter()
+        result = {"id": job["id"], "figma": job["figma"], "srs": job["srs"], "outputDir": job_output_dir}
+        try:
+            result.update(run_job(job, job_output_dir) or {})
+            result["status"] = "ok"
+        except Exception as e:
+            print(f"Error in batch job {job['id']}: {e}")
+            result["status"] = "failed"
+            result["error"] = str(e)
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        print(f" [{result['status']}] {job['id']} in {result['seconds']}s")
+        return result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run, jobs))
+
+    report = {
+        "jobs": results,
+        "total": len(results),
+        "succeeded": sum(1 for result in results if result["status"] == "ok"),
+        "failed": sum(1 for result in results if result["status"] != "ok"),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    report_file = os.path.join(output_dir, "batch_report.json")
+    with open(report_file, 'w', encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f" Batch report saved to '{report_file}'.")
+    return report
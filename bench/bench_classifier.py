@@ -0,0 +1,83 @@
+"""Compare the rule-table element classifier against the original substring checks.
+
+Usage: python bench/bench_classifier.py [element_count]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import paste
+
+ELEMENT_KINDS = [
+    ("Email Input", "TEXT", "Text"),
+    ("Password input field", "TEXT", "Text"),
+    ("Submit", "BUTTON", "Button"),
+    ("Sign Up Button", "TEXT", "Text"),
+    ("Country", "DROPDOWN", "Dropdown"),
+    ("Remember me checkbox", "CHECKBOX", "Checkbox"),
+    ("Gender radio", "RADIO_BUTTON", "Radio Button"),
+    ("Welcome back", "TEXT", "Text"),
+]
+
+
+def synthetic_design(element_count, elements_per_frame=50, seed=1):
+    """Build a temp.mjs-style export with element_count elements drawn from a small component set."""
+    rng = random.Random(seed)
+    frames = []
+    for start in range(0, element_count, elements_per_frame):
+        elements = []
+        for _ in range(min(elements_per_frame, element_count - start)):
+            name, element_type, category = rng.choice(ELEMENT_KINDS)
+            elements.append({"name": f"{name} {rng.randrange(200)}", "type": element_type, "category": category})
+        frames.append({"frame": f"Screen {start // elements_per_frame}", "description": "", "elements": elements})
+    return {"pages": [{"page": "Page 1", "frames": frames}]}
+
+
+def legacy_process_figma_data(data):
+    """The original paste.py substring classification, kept here as the benchmark baseline."""
+    processed_data = {"screens": [], "inputs": [], "buttons": []}
+    for page in data.get("pages", []):
+        for frame in page.get("frames", []):
+            frame_name = frame.get("frame", "").strip()
+            if frame_name and frame_name.lower() != "frame":
+                processed_data["screens"].append(frame_name)
+            for element in frame.get("elements", []):
+                element_name = element.get("name", "").strip().lower()
+                if "input" in element_name:
+                    processed_data["inputs"].append(element.get("name", "Unnamed Input Field"))
+                if "button" in element_name:
+                    processed_data["buttons"].append(element.get("name", "Unnamed Button"))
+    return processed_data
+
+
+def main():
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    design = synthetic_design(element_count)
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as file:
+        json.dump(design, file)
+        design_file = file.name
+
+    try:
+        runs = [
+            ("legacy", lambda: legacy_process_figma_data(paste.load_figma_data(design_file))),
+            ("rules", lambda: paste.load_and_process_figma_data(design_file)),
+            ("rules+stream", lambda: paste.load_and_process_figma_data(design_file, stream=True)),
+        ]
+        print(f"{element_count} elements, {os.path.getsize(design_file) / 1024 / 1024:.1f} MB")
+        for name, run in runs:
+            started = time.perf_counter()
+            processed_data = run()
+            elapsed = time.perf_counter() - started
+            counts = ", ".join(f"{key}={len(values)}" for key, values in processed_data.items())
+            print(f"{name:<13} {elapsed:>7.3f}s  {counts}")
+    finally:
+        os.remove(design_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare the single-pass case_parser against the original split-based parser.
+
+Usage: python bench/bench_parser.py [size_mb ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import case_parser
+
+
+def legacy_parse_test_cases(text_output):
+    """The original temp.py parser, kept here as the benchmark baseline."""
+    test_cases = []
+    sections = text_output.split("Test Case: ")
+    for section in sections[1:]:
+        lines = section.split("\n")
+        case = {"testCase": lines[0].strip(), "steps": [], "expectedResult": ""}
+        for line in lines[1:]:
+            if "- " in line:
+                case["steps"].append(line.strip("- ").strip())
+            elif "Expected Result:" in line:
+                case["expectedResult"] = line.split(":", 1)[-1].strip()
+        test_cases.append(case)
+    return test_cases
+
+
+def synthetic_output(size_mb, numbered=True):
+    """Build LLM-style output alternating numbered and bulleted steps, or bulleted steps only."""
+    blocks = []
+    size = 0
+    index = 0
+    while size < size_mb * 1024 * 1024:
+        marker = (lambda n: f"{n}.") if numbered and index % 2 else (lambda n: "-")
+        steps = "\n".join(f"{marker(n)} Step {n} on 'Screen {index}' with 'Field {n}'" for n in range(1, 6))
+        block = (f"Test Case: Generated case {index}\nSteps:\n{steps}\n"
+                 f"Expected Result: User should see result {index}.\n\n")
+        blocks.append(block)
+        size += len(block)
+        index += 1
+    return "".join(blocks)
+
+
+def measure(parse, text):
+    """Time one untraced run, then measure peak allocations in a second, traced run."""
+    started = time.perf_counter()
+    test_cases = parse(text)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    parse(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    steps = sum(len(test_case["steps"]) for test_case in test_cases)
+    return elapsed, peak, len(test_cases), steps
+
+
+def main():
+    sizes = [float(arg) for arg in sys.argv[1:]] or [1, 4, 16]
+    # The legacy parser skips numbered steps, so the "bullets" corpus is the like-for-like comparison
+    print(f"{'size':>6} {'corpus':<8} {'parser':<8} {'seconds':>8} {'peak MB':>8} {'cases':>8} {'steps':>8}")
+    for size_mb in sizes:
+        for corpus, numbered in (("mixed", True), ("bullets", False)):
+            text = synthetic_output(size_mb, numbered)
+            for name, parse in (("legacy", legacy_parse_test_cases), ("single", case_parser.parse_test_cases)):
+                elapsed, peak, cases, steps = measure(parse, text)
+                print(f"{size_mb:>5}M {corpus:<8} {name:<8} {elapsed:>8.3f} {peak / 1024 / 1024:>8.1f} "
+                      f"{cases:>8} {steps:>8}")
+
+
+if __name__ == "__main__":
+    main()
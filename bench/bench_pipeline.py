@@ -0,0 +1,166 @@
+"""Time each paste.py pipeline stage on synthetic Figma exports of increasing size.
+
+Stages: load, process, prompt, llm, parse and save. Each is timed in an untraced run
+and its peak allocations are measured in a second, traced run. The llm stage runs the
+default generation path: a streamed completion that stops at the target case count
+(non-streamed when LLM_EARLY_STOP=0), building its own prompt as paste.py does. The LLM
+is the offline stub in bench/stub_llm.py unless --llm-url is given. Results are written as JSON, and
+--compare prints per-stage ratios against an earlier results file.
+
+Usage: python bench/bench_pipeline.py [element_count ...] [--output bench_results.json] [--compare old.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_llm import start_stub
+
+STAGES = ["load", "process", "prompt", "llm", "parse", "save"]
+
+
+def synthetic_srs(kilobytes):
+    """Build an SRS summary of roughly the given size in requirement bullets."""
+    lines = []
+    size = 0
+    index = 0
+    while size < kilobytes * 1024:
+        line = f"- The system shall let the user submit 'Screen {index}' after validating 'Field {index}'."
+        lines.append(line)
+        size += len(line) + 1
+        index += 1
+    return "\n".join(lines)
+
+
+def measure(run):
+    """Return (result, seconds, peak_bytes): one untraced timed run, then one traced run."""
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_size(paste, case_parser, synthetic_design, element_count, srs_description, work_dir):
+    design_file = os.path.join(work_dir, f"design_{element_count}.json")
+    with open(design_file, "w", encoding="utf-8") as file:
+        json.dump(synthetic_design(element_count), file)
+    output_file = os.path.join(work_dir, "test_cases.txt")
+
+    stages = {}
+    values = {}
+    runs = {
+        "load": lambda: paste.load_figma_data(design_file),
+        "process": lambda: paste.process_figma_data(values["load"]),
+        "prompt": lambda: paste.build_payload(values["process"], srs_description),
+        "llm": lambda: paste.generate_playwright_test_cases(values["process"], srs_description),
+        "parse": lambda: case_parser.parse_test_cases(values["llm"]),
+        "save": lambda: paste.save_test_cases_as_text(values["llm"], output_file),
+    }
+    for stage in STAGES:
+        with contextlib.redirect_stdout(io.StringIO()):
+            values[stage], seconds, peak = measure(runs[stage])
+        stages[stage] = {"seconds": round(seconds, 6), "peakBytes": peak}
+
+    return {
+        "elements": element_count,
+        "figmaBytes": os.path.getsize(design_file),
+        "promptChars": len(values["prompt"]["prompt"]),
+        "completionChars": len(values["llm"]),
+        "testCases": len(values["parse"]),
+        "stages": stages,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_results(results, baseline=None):
+    baseline_by_size = {entry["elements"]: entry for entry in (baseline or {}).get("results", [])}
+    print(f"{'elements':>9} " + " ".join(f"{stage:>16}" for stage in STAGES))
+    for entry in results["results"]:
+        cells = []
+        for stage in STAGES:
+            seconds = entry["stages"][stage]["seconds"]
+            cell = f"{seconds:.4f}s"
+            previous = baseline_by_size.get(entry["elements"])
+            if previous and previous["stages"].get(stage, {}).get("seconds"):
+                cell += f" x{seconds / previous['stages'][stage]['seconds']:.2f}"
+            cells.append(f"{cell:>16}")
+        print(f"{entry['elements']:>9} " + " ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the paste.py pipeline stage by stage.")
+    parser.add_argument("sizes", nargs="*", type=int, default=[1_000, 10_000, 100_000],
+                        help="Element counts of the synthetic Figma exports")
+    parser.add_argument("--srs-kb", type=int, default=16, help="Size of the synthetic SRS summary")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM latency before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=2000, help="Stub LLM completion token rate")
+    parser.add_argument("--cases", type=int, default=10, help="Test cases per stub completion")
+    parser.add_argument("--llm-url", help="Benchmark against this completions URL instead of the stub")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare stage timings against")
+    args = parser.parse_args()
+
+    stub = None
+    if args.llm_url:
+        os.environ["LLM_API_URL"] = args.llm_url
+    else:
+        stub = start_stub(latency=args.latency, tokens_per_second=args.tokens_per_second, cases=args.cases)
+        os.environ["LLM_API_URL"] = stub.url
+
+    # llm_client reads LLM_API_URL at import time, and bench_classifier imports paste
+    import case_parser
+    import paste
+    from bench_classifier import synthetic_design
+
+    srs_description = synthetic_srs(args.srs_kb)
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "llm": {"url": os.environ["LLM_API_URL"], "stub": stub is not None, "latency": args.latency,
+                "tokensPerSecond": args.tokens_per_second, "cases": args.cases, "earlyStop": paste.EARLY_STOP},
+        "srsBytes": len(srs_description),
+        "results": [],
+    }
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for element_count in args.sizes:
+                results["results"].append(
+                    bench_size(paste, case_parser, synthetic_design, element_count, srs_description, work_dir))
+    finally:
+        if stub is not None:
+            stub.shutdown()
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
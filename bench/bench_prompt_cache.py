@@ -0,0 +1,113 @@
+"""Measure time-to-first-token with each prompt template version on a prefix-caching server.
+
+Sends one streamed request per screen shard of a synthetic design, as --shard screen
+does, and records the time to the first completion token. The offline stub in
+bench/stub_llm.py simulates prefill at --prefill-tokens-per-second for prompt tokens
+outside its prefix cache; each template version gets a fresh stub, so every run
+starts cold. With --llm-url the requests go to a real server instead.
+
+Usage: python bench/bench_prompt_cache.py [--versions v1 v2 v3] [--shards 8] [--prompt-budget 600]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_llm import WORD_RE, start_stub
+
+
+def common_prefix_tokens(prompts):
+    """Tokens shared at the start of every prompt."""
+    token_lists = [WORD_RE.findall(prompt) for prompt in prompts]
+    shared = 0
+    for tokens in zip(*token_lists):
+        if any(token != tokens[0] for token in tokens):
+            break
+        shared += 1
+    return shared
+
+
+def time_to_first_token(client, payload):
+    """Stream payload and return (seconds to the first delta, usage reported by the server)."""
+    stats = {}
+    started = time.perf_counter()
+    first = None
+    for _ in client.stream(payload, stats=stats):
+        if first is None:
+            first = time.perf_counter() - started
+    return first, stats.get("usage") or {}
+
+
+def bench_version(paste, version, shards, srs_description, args, llm_client_class):
+    stub = None
+    url = args.llm_url
+    if not url:
+        stub = start_stub(latency=args.latency, tokens_per_second=0, cases=args.cases,
+                          prefill_tokens_per_second=args.prefill_tokens_per_second)
+        url = stub.url
+    client = llm_client_class(api_url=url)
+    try:
+        prompts = []
+        timings = []
+        cached = []
+        for shard in shards:
+            srs = srs_description
+            if args.prompt_budget:
+                srs = paste.select_srs(srs_description, shard, args.prompt_budget)
+            prompt = paste.build_prompt(shard, srs, version=version)
+            prompts.append(prompt)
+            seconds, usage = time_to_first_token(client, {**paste.build_payload(shard, ""), "prompt": prompt})
+            timings.append(seconds)
+            cached.append((usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0))
+    finally:
+        client.close()
+        if stub is not None:
+            stub.shutdown()
+    return {
+        "version": version,
+        "promptTokens": round(statistics.mean(len(WORD_RE.findall(prompt)) for prompt in prompts)),
+        "sharedPrefixTokens": common_prefix_tokens(prompts),
+        "firstTtft": timings[0],
+        "warmTtft": statistics.mean(timings[1:]) if len(timings) > 1 else None,
+        "cachedTokens": statistics.mean(cached[1:]) if len(cached) > 1 else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time-to-first-token per prompt template version.")
+    parser.add_argument("--versions", nargs="+", default=["v1", "v2", "v3"], help="Template versions to compare")
+    parser.add_argument("--shards", type=int, default=8, help="Requests per version, one per screen")
+    parser.add_argument("--elements", type=int, default=400, help="Elements in the synthetic design")
+    parser.add_argument("--srs-kb", type=int, default=4, help="Size of the synthetic SRS summary")
+    parser.add_argument("--prompt-budget", type=int, default=0,
+                        help="Select SRS chunks per shard within this budget, as --prompt-budget does (0 = whole SRS)")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub latency before prefill")
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=2000, help="Stub prefill rate")
+    parser.add_argument("--cases", type=int, default=2, help="Test cases per stub completion")
+    parser.add_argument("--llm-url", help="Benchmark against this completions URL instead of the stub")
+    args = parser.parse_args()
+
+    # llm_client reads LLM_API_URL at import time, and bench_classifier imports paste
+    os.environ.setdefault("LLM_API_URL", args.llm_url or "http://127.0.0.1:9/v1/completions")
+    import paste
+    from bench_classifier import synthetic_design
+    from bench_pipeline import synthetic_srs
+    from llm_client import LLMClient
+
+    design = synthetic_design(args.elements)
+    shards = paste.shard_frames(paste.iter_data_frames(design), "screen", 1)[:args.shards]
+    srs_description = synthetic_srs(args.srs_kb)
+
+    print(f"{'version':>8} {'prompt tok':>11} {'shared tok':>11} {'cold TTFT':>10} {'warm TTFT':>10} {'cached tok':>11}")
+    for version in args.versions:
+        result = bench_version(paste, version, shards, srs_description, args, LLMClient)
+        warm = f"{result['warmTtft']:.3f}s" if result["warmTtft"] is not None else "-"
+        print(f"{result['version']:>8} {result['promptTokens']:>11} {result['sharedPrefixTokens']:>11} "
+              f"{result['firstTtft']:>9.3f}s {warm:>10} {result['cachedTokens']:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Offline OpenAI-compatible /v1/completions server for benchmarks.
+
+Replies with synthetic test cases after a fixed latency, emitting completion
+tokens at a fixed rate. Supports streamed (SSE) and plain responses, and
+returns a JSON array when the request asks for a json_schema response_format.
+max_tokens and stop sequences are honoured, and cancelled streams are counted.
+With --prefill-tokens-per-second it also simulates prompt prefill and a server-side
+prefix (KV) cache: prompts are hashed in blocks of BLOCK_TOKENS tokens, and only the
+tokens after the longest previously seen prefix of whole blocks cost prefill time.
+
+Usage: python bench/stub_llm.py [--port 8765] [--latency 0.2] [--tokens-per-second 200] [--cases 10]
+       [--prefill-tokens-per-second 2000]
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORD_RE = re.compile(r"\S+\s*")
+BLOCK_TOKENS = 16
+
+
+def synthetic_test_cases(count):
+    """Return count test cases as {testCase, steps, expectedResult} dicts."""
+    return [
+        {
+            "testCase": f"Generated case {index}",
+            "steps": [f"Go to 'Screen {index}'.", f"Enter a value in 'Field {index}'.", "Click on 'Submit' button."],
+            "expectedResult": f"User should see confirmation {index}.",
+        }
+        for index in range(1, count + 1)
+    ]
+
+
+def completion_text(count, structured=False):
+    """Render count synthetic test cases as the LLM would: plain text, or JSON for structured output."""
+    test_cases = synthetic_test_cases(count)
+    if structured:
+        return json.dumps(test_cases)
+    blocks = []
+    for test_case in test_cases:
+        steps = "\n".join(f"{number}. {step}" for number, step in enumerate(test_case["steps"], 1))
+        blocks.append(f"Test Case: {test_case['testCase']}\nSteps:\n{steps}\n"
+                      f"Expected Result: {test_case['expectedResult']}\n")
+    return "\n".join(blocks)
+
+
+def prefill_tokens(server, prompt_tokens):
+    """Return how many of prompt_tokens miss the server's prefix cache, and cache all their blocks."""
+    cached = 0
+    key = None
+    missed = False
+    with server.prefix_lock:
+        for start in range(0, len(prompt_tokens) - BLOCK_TOKENS + 1, BLOCK_TOKENS):
+            # Each block's key covers the whole prefix up to it, as in paged KV caches
+            key = hash((key, tuple(prompt_tokens[start:start + BLOCK_TOKENS])))
+            if not missed and key in server.prefix_blocks:
+                cached += BLOCK_TOKENS
+            else:
+                missed = True
+                server.prefix_blocks.add(key)
+    return len(prompt_tokens) - cached, cached
+
+
+def make_handler(latency, tokens_per_second, cases, prefill_tokens_per_second=0):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            text = completion_text(cases, structured="response_format" in payload)
+            self.server.requests += 1
+            for stop in payload.get("stop") or []:
+                if stop in text:
+                    text = text[:text.index(stop)]
+            tokens = WORD_RE.findall(text)[:payload.get("max_tokens") or None]
+            prompt_tokens = WORD_RE.findall(payload.get("prompt", ""))
+            usage = {"prompt_tokens": len(prompt_tokens), "completion_tokens": len(tokens)}
+            delay = latency
+            if prefill_tokens_per_second:
+                uncached, cached = prefill_tokens(self.server, prompt_tokens)
+                usage["prompt_tokens_details"] = {"cached_tokens": cached}
+                delay += uncached / prefill_tokens_per_second
+            time.sleep(delay)
+            if payload.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for token in tokens:
+                        if tokens_per_second:
+                            time.sleep(1 / tokens_per_second)
+                        self.write_chunk("data: " + json.dumps({"choices": [{"text": token}]}) + "\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled the request, e.g. after parsing enough test cases
+                    self.server.cancelled += 1
+                    self.close_connection = True
+                    return
+                self.write_chunk("data: " + json.dumps({"choices": [{"text": ""}], "usage": usage}) + "\n\n")
+                self.write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                if tokens_per_second:
+                    time.sleep(len(tokens) / tokens_per_second)
+                body = json.dumps({"choices": [{"text": "".join(tokens)}], "usage": usage}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        def do_GET(self):
+            # Health check endpoint (/v1/models), as probed by llm_router
+            body = json.dumps({"object": "list", "data": [{"id": "stub", "object": "model"}]}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def write_chunk(self, data):
+            data = data.encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def make_server(host="127.0.0.1", port=0, latency=0.2, tokens_per_second=200, cases=10, prefill_tokens_per_second=0):
+    """Create the stub server; server.url is its completions URL and server.requests counts POSTs."""
+    server = ThreadingHTTPServer((host, port),
+                                 make_handler(latency, tokens_per_second, cases, prefill_tokens_per_second))
+    server.daemon_threads = True
+    server.requests = 0
+    server.cancelled = 0
+    server.prefix_blocks = set()
+    server.prefix_lock = threading.Lock()
+    server.url = f"http://{host}:{server.server_address[1]}/v1/completions"
+    return server
+
+
+def start_stub(host="127.0.0.1", port=0, latency=0.2, tokens_per_second=200, cases=10, prefill_tokens_per_second=0):
+    """Start the stub in a daemon thread and return the server."""
+    server = make_server(host, port, latency, tokens_per_second, cases, prefill_tokens_per_second)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200, help="Completion token rate (0 = instant)")
+    parser.add_argument("--cases", type=int, default=10, help="Test cases per completion")
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=0,
+                        help="Simulated prefill rate for prompt tokens missing the prefix cache (0 = no prefill)")
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.latency, args.tokens_per_second, args.cases,
+                         args.prefill_tokens_per_second)
+    print(f"Stub LLM listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import random
+import re
+import time
+
+# Estimated Jaccard similarity of step/expected-result shingles above which two
+# test cases are treated as the same case.
+DEFAULT_THRESHOLD = float(os.getenv("CASE_DEDUPE_THRESHOLD", "0.8"))
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+# LSH banding: cases whose signatures agree on every row of any band become candidates.
+# 16 bands of 4 rows find pairs above ~0.8 similarity with >99% probability.
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {"a", "an", "the", "on", "in", "into", "to", "of", "for", "and", "is", "are", "be", "should",
+             "will", "then", "that", "user", "users", "button", "field", "successfully"}
+# Verbs the LLM uses interchangeably for the same action.
+SYNONYMS = {"tap": "click", "press": "click", "clicks": "click", "navigate": "go", "open": "go", "visit": "go",
+            "type": "enter", "input": "enter", "fill": "enter", "enters": "enter", "displayed": "see",
+            "shown": "see", "visible": "see", "sees": "see", "appears": "see", "redirected": "go"}
+
+
+def normalize_text(text):
+    """Lowercase text into content words, dropping filler and mapping synonymous verbs."""
+    words = (SYNONYMS.get(word, word) for word in WORD_RE.findall(text.lower()))
+    return [word for word in words if word not in STOPWORDS]
+
+
+def case_tokens(test_case):
+    """Normalized words of a case's steps followed by its expected result; the title is ignored."""
+    tokens = []
+    for step in test_case.get("steps", []):
+        tokens.extend(normalize_text(step))
+    tokens.append("|")
+    tokens.extend(normalize_text(test_case.get("expectedResult", "")))
+    return tokens
+
+
+def _fingerprint(tokens):
+    return hashlib.sha256(" ".join(tokens).encode("utf-8")).hexdigest()
+
+
+def case_fingerprint(test_case):
+    """Exact-match key: a hash of the normalized steps and expected result."""
+    return _fingerprint(case_tokens(test_case))
+
+
+def shingles(tokens, size=SHINGLE_SIZE):
+    if len(tokens) <= size:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash_signature(tokens):
+    """MinHash signature (NUM_PERM ints) of the token shingles."""
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+              for shingle in shingles(tokens)]
+    return [min((a * value + b) % _PRIME for value in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for left, right in zip(signature, other) if left == right) / NUM_PERM
+
+
+def _bands(signature):
+    return [(band, tuple(signature[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+
+
+class DedupeIndex:
+    """Fingerprint index of test cases: exact matches by hash, near duplicates by MinHash LSH.
+
+    add() returns ("new" | "duplicate" | "near-duplicate", entry); for duplicates entry
+    is the stored case the new one matched. Entries are plain dicts with the test case
+    fields plus id, fingerprint and signature, kept in insertion order.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.entries = []
+        self.by_fingerprint = {}
+        self.buckets = {}
+
+    def match(self, fingerprint, signature):
+        """Return (status, entry) for the stored case matching a fingerprint/signature, if any."""
+        exact = self.by_fingerprint.get(fingerprint)
+        if exact is not None:
+            return "duplicate", exact
+        best, best_score = None, self.threshold
+        seen = set()
+        for key in _bands(signature):
+            for entry in self.buckets.get(key, ()):
+                if id(entry) in seen:
+                    continue
+                seen.add(id(entry))
+                score = similarity(signature, entry["signature"])
+                if score >= best_score:
+                    best, best_score = entry, score
+        return ("near-duplicate", best) if best is not None else ("new", None)
+
+    def insert(self, entry):
+        self.entries.append(entry)
+        self.by_fingerprint[entry["fingerprint"]] = entry
+        for key in _bands(entry["signature"]):
+            self.buckets.setdefault(key, []).append(entry)
+
+    def add(self, test_case):
+        tokens = case_tokens(test_case)
+        fingerprint = _fingerprint(tokens)
+        signature = minhash_signature(tokens)
+        status, entry = self.match(fingerprint, signature)
+        if entry is None:
+            entry = {"id": fingerprint[:16], "testCase": test_case.get("testCase", ""),
+                     "steps": list(test_case.get("steps", [])), "expectedResult": test_case.get("expectedResult", ""),
+                     "fingerprint": fingerprint, "signature": signature}
+            self.insert(entry)
+        return status, entry
+
+
+def dedupe_test_cases(test_cases, threshold=DEFAULT_THRESHOLD):
+    """Return test_cases without exact or near duplicates, keeping the first of each group."""
+    index = DedupeIndex(threshold)
+    return [test_case for test_case in test_cases if index.add(test_case)[0] == "new"]
+
+
+class TestSuite:
+    """Persistent, de-duplicated suite of test cases merged across runs.
+
+    Cases keep the id, wording and position they had when first seen, so repeated
+    or sharded generations only append genuinely new cases. Each entry counts how
+    often it was generated and remembers the alternative titles it was generated under.
+    """
+
+    MAX_ALIASES = 10
+
+    def __init__(self, suite_file, threshold=DEFAULT_THRESHOLD):
+        self.suite_file = suite_file
+        self.index = DedupeIndex(threshold)
+        try:
+            with open(suite_file, 'r', encoding="utf-8") as file:
+                data = json.load(file)
+            for entry in data.get("cases", []):
+                self.index.insert(entry)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading test suite, starting a new one: {e}")
+            self.index = DedupeIndex(threshold)
+
+    def merge(self, test_cases):
+        """Add test_cases to the suite; return counts of new, duplicate and near-duplicate cases."""
+        counts = {"new": 0, "duplicate": 0, "near-duplicate": 0}
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        for test_case in test_cases:
+            status, entry = self.index.add(test_case)
+            counts[status] += 1
+            if status == "new":
+                entry.update(firstSeen=now, occurrences=0, aliases=[])
+            entry["lastSeen"] = now
+            entry["occurrences"] = entry.get("occurrences", 0) + 1
+            title = test_case.get("testCase", "")
+            aliases = entry.setdefault("aliases", [])
+            if title and title != entry["testCase"] and title not in aliases and len(aliases) < self.MAX_ALIASES:
+                aliases.append(title)
+        return counts
+
+    def test_cases(self):
+        """Return the suite as {testCase, steps, expectedResult} dicts in stable order."""
+        return [{"testCase": entry["testCase"], "steps": entry["steps"], "expectedResult": entry["expectedResult"]}
+                for entry in self.index.entries]
+
+    def save(self):
+        temp_file = f"{self.suite_file}.tmp"
+        with open(temp_file, 'w', encoding="utf-8") as file:
+            json.dump({"version": 1, "cases": self.index.entries}, file, indent=2, ensure_ascii=False)
+        os.replace(temp_file, self.suite_file)
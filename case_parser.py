@@ -0,0 +1,220 @@
+import json
+import re
+
+# Line grammar, matched with string methods: optional markup, then a heading ("Test Case: Name",
+# "**1. Test Case 2: Name**"), an expected result ("Expected Result: ...", "**Expected Result:** ...")
+# or a step ("- step", "* step", "1. step", "1) step"), then the text.
+DIGITS = "0123456789"
+DIGIT_SET = frozenset(DIGITS)
+MARKUP = " \t*#"     # allowed before a marker
+LEADING = " \t*"     # between a marker and the text
+TRAILING = " \t*\r"  # markdown emphasis and carriage returns left at the end of a line
+BLANKS = frozenset(" \t")
+BULLETS = frozenset("-•")
+NUMBER_ENDS = frozenset(".)")
+HEADING_SEPARATORS = frozenset(":.-")
+HEADING_STARTS = frozenset("Tt")
+# First characters of a line that classify_line can match
+LINE_STARTS = frozenset(MARKUP + DIGITS + "-•TtEe")
+# Step markers: a bullet or a number's "." or ")", then a blank
+BULLET_MARKS = frozenset(bullet + blank for bullet in "-•" for blank in " \t")
+NUMBER_MARKS = frozenset(end + blank for end in ".)" for blank in " \t")
+HEADING, EXPECTED, STEP = "heading", "expected", "step"
+# Lines are split off the buffer this many characters at a time, bounding the temporary line list.
+SCAN_BLOCK = 1 << 16
+HEADING_RE = re.compile(r"[ \t*#]*(?:\d+[.)][ \t*]*)?Test Case[ \t]*\d*[ \t]*[:.-][ \t]*(.*)$", re.IGNORECASE)
+
+# Shape of a single test case in structured-output mode.
+TEST_CASE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "testCase": {"type": "string"},
+        "steps": {"type": "array", "items": {"type": "string"}},
+        "expectedResult": {"type": "string"},
+    },
+    "required": ["testCase", "steps", "expectedResult"],
+    "additionalProperties": False,
+}
+TEST_CASES_SCHEMA = {"type": "array", "items": TEST_CASE_SCHEMA}
+
+
+def _heading_name(rest):
+    """The case name from the text after "Test Case", or None unless a ":", "." or "-" follows."""
+    rest = rest.lstrip(" \t").lstrip(DIGITS).lstrip(" \t")
+    if rest[:1] in HEADING_SEPARATORS:
+        return rest[1:].lstrip(LEADING).rstrip(TRAILING)
+    return None
+
+
+def classify_line(line):
+    """Return (HEADING, name), (EXPECTED, text), (STEP, text) or (None, None) for one line."""
+    stripped = line.lstrip(MARKUP)
+    first = stripped[:1]
+    if first in DIGIT_SET:
+        rest = stripped.lstrip(DIGITS)
+        if rest[:1] in NUMBER_ENDS:
+            text = rest[1:].lstrip(LEADING)
+            if text[:9].lower() == "test case":
+                name = _heading_name(text[9:])
+                if name is not None:
+                    return HEADING, name
+            if rest[1:2] in BLANKS:
+                return STEP, text.rstrip(TRAILING)
+    elif first in HEADING_STARTS:
+        if stripped[:9].lower() == "test case":
+            name = _heading_name(stripped[9:])
+            if name is not None:
+                return HEADING, name
+    elif first in BULLETS:
+        if stripped[1:2] in BLANKS:
+            return STEP, stripped[2:].lstrip(LEADING).rstrip(TRAILING)
+    elif stripped[:15].lower() == "expected result":
+        rest = stripped[15:].lstrip(LEADING)
+        if rest[:1] == ":":
+            return EXPECTED, rest[1:].lstrip(LEADING).rstrip(TRAILING)
+    # "* step": a "*" bullet is part of the markup stripped above
+    markup = line[:len(line) - len(stripped)]
+    bullet = max(markup.rfind("* "), markup.rfind("*\t"))
+    if bullet != -1:
+        return STEP, line[bullet + 2:].lstrip(LEADING).rstrip(TRAILING)
+    return None, None
+
+
+class IncrementalTestCaseParser:
+    """Parse "Test Case / Steps / Expected Result" text as it arrives in arbitrary chunks.
+
+    feed() returns the test cases completed by the chunk; a case is complete as
+    soon as its "Expected Result:" line ends. close() flushes whatever remains.
+    Each line is visited exactly once, so parsing is linear in the input size.
+    """
+
+    def __init__(self):
+        self.pending = ""
+        self.case = None
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return the test cases it completed."""
+        buffer = self.pending + chunk if self.pending else chunk
+        completed = []
+        end = buffer.rfind("\n") + 1
+        self._scan(buffer, end, completed)
+        self.pending = buffer[end:]
+        return completed
+
+    def close(self):
+        """Flush the final partial line and any unfinished case."""
+        completed = []
+        if self.pending:
+            self._scan(self.pending + "\n", len(self.pending) + 1, completed)
+            self.pending = ""
+        if self.case is not None:
+            completed.append(self.case)
+            self.case = None
+        return completed
+
+    def _scan(self, buffer, end, completed):
+        """Process every test case line in buffer[:end], which must end on a line boundary."""
+        # Hot loop: step lines, by far the most common, and lines that cannot match are handled
+        # inline with a few string operations; the rest go through classify_line. Steps outside
+        # a case are collected into a throwaway list rather than tested for on every line.
+        case = self.case
+        steps = case["steps"].append if case is not None else [].append
+        done = completed.append
+        start = 0
+        while start < end:
+            stop = buffer.find("\n", min(start + SCAN_BLOCK, end - 1)) + 1
+            lines = buffer[start:stop - 1].split("\n")
+            start = stop
+            for line in lines:
+                first = line[:1]
+                if first in DIGIT_SET:
+                    rest = line.lstrip(DIGITS)
+                    if rest[:2] in NUMBER_MARKS:
+                        text = rest[2:].lstrip(LEADING)
+                        if text[:1] not in HEADING_STARTS:
+                            steps(text.rstrip(TRAILING))
+                            continue
+                elif line[:2] in BULLET_MARKS:
+                    steps(line[2:].lstrip(LEADING).rstrip(TRAILING))
+                    continue
+                elif first not in LINE_STARTS:
+                    # Blank lines, "Steps:" and prose
+                    continue
+                # The exact forms the prompt asks for skip classify_line too
+                if line[:10] == "Test Case:":
+                    kind, text = HEADING, line[10:].lstrip(LEADING).rstrip(TRAILING)
+                elif line[:16] == "Expected Result:":
+                    kind, text = EXPECTED, line[16:].lstrip(LEADING).rstrip(TRAILING)
+                else:
+                    kind, text = classify_line(line)
+                if kind is HEADING:
+                    if case is not None:
+                        done(case)
+                    case = {"testCase": text, "steps": [], "expectedResult": ""}
+                    steps = case["steps"].append
+                elif case is None:
+                    continue
+                elif kind is EXPECTED:
+                    case["expectedResult"] = text
+                    done(case)
+                    case = None
+                    steps = [].append
+                elif kind is STEP:
+                    steps(text)
+        self.case = case
+
+
+def parse_test_cases(text_output):
+    """Parse LLM text output into a list of {testCase, steps, expectedResult} dicts."""
+    parser = IncrementalTestCaseParser()
+    return parser.feed(text_output) + parser.close()
+
+
+def iter_test_cases(chunks):
+    """Yield test cases from an iterable of text chunks, such as an open file or a streamed completion."""
+    parser = IncrementalTestCaseParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def validate_test_case(test_case):
+    """Raise ValueError unless test_case matches TEST_CASE_SCHEMA exactly."""
+    if not isinstance(test_case, dict):
+        raise ValueError(f"Test case must be an object, got {type(test_case).__name__}")
+    keys = set(test_case)
+    missing = set(TEST_CASE_SCHEMA["required"]) - keys
+    extra = keys - set(TEST_CASE_SCHEMA["properties"])
+    if missing or extra:
+        raise ValueError(f"Test case has missing keys {sorted(missing)} or unexpected keys {sorted(extra)}")
+    if not isinstance(test_case["testCase"], str) or not isinstance(test_case["expectedResult"], str):
+        raise ValueError("testCase and expectedResult must be strings")
+    if not isinstance(test_case["steps"], list) or not all(isinstance(step, str) for step in test_case["steps"]):
+        raise ValueError("steps must be an array of strings")
+
+
+def parse_test_cases_json(text_output):
+    """Parse structured-output mode responses: a JSON array of test cases, validated strictly.
+
+    Leading prose or a markdown code fence before the array is tolerated; anything
+    that does not match TEST_CASES_SCHEMA raises ValueError.
+    """
+    start = text_output.find("[")
+    if start == -1:
+        raise ValueError("No JSON array found in LLM output")
+    test_cases, _ = json.JSONDecoder().raw_decode(text_output, start)
+    if not isinstance(test_cases, list):
+        raise ValueError("Structured output must be a JSON array")
+    for test_case in test_cases:
+        validate_test_case(test_case)
+    return test_cases
+
+
+def format_test_cases_as_text(test_cases):
+    """Render parsed test cases back into the plain text format used by test_cases.txt."""
+    blocks = []
+    for test_case in test_cases:
+        steps = "\n".join(f"{number}. {step}" for number, step in enumerate(test_case["steps"], 1))
+        blocks.append(f"Test Case: {test_case['testCase']}\nSteps:\n{steps}\n"
+                      f"Expected Result: {test_case['expectedResult']}")
+    return "\n\n".join(blocks)
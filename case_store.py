@@ -0,0 +1,191 @@
+"""Append-only SQLite store of generated test cases.
+
+Every generation run appends its cases; nothing is updated or deleted. Cases are
+indexed by project, content fingerprint, run and the screens they touch, so
+"all cases touching screen X" and "everything added since id N" are index lookups
+rather than full-file scans. WAL mode lets concurrent jobs write while others read.
+
+Usage: python case_store.py [--db test_cases.db] runs [--project P]
+       python case_store.py [--db test_cases.db] export --project P [--screen S] [--since ID]
+                            [--all-versions] [--format txt|jsonl]
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from case_dedupe import case_fingerprint
+from case_parser import format_test_cases_as_text
+
+DEFAULT_DB = os.getenv("TEST_CASE_DB", "test_cases.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    source TEXT,
+    settings TEXT
+);
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    project TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    title TEXT NOT NULL,
+    steps TEXT NOT NULL,
+    expected_result TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS case_screens (
+    case_id INTEGER NOT NULL REFERENCES cases(id),
+    project TEXT NOT NULL,
+    screen_key TEXT NOT NULL,
+    screen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cases_project_fingerprint ON cases(project, fingerprint);
+CREATE INDEX IF NOT EXISTS cases_run ON cases(run_id);
+CREATE INDEX IF NOT EXISTS case_screens_lookup ON case_screens(project, screen_key, case_id);
+CREATE INDEX IF NOT EXISTS runs_project ON runs(project);
+"""
+
+NAVIGATION_RE = re.compile(r"^\s*(?:go|navigate|open|visit|launch|return)\b.*?['\"‘“]([^'\"‘’“”]+)['\"’”]",
+                           re.IGNORECASE)
+
+
+def screen_key(name):
+    """Lookup key for a screen: case-folded words without a trailing "page" or "screen"."""
+    words = re.findall(r"\w+", name.casefold())
+    while len(words) > 1 and words[-1] in ("page", "screen"):
+        words.pop()
+    return " ".join(words)
+
+
+def case_screens(test_case, known_screens=()):
+    """Screens a case touches: known screens it mentions, plus screens its steps navigate to."""
+    text = " ".join([test_case.get("testCase", ""), *test_case.get("steps", []), test_case.get("expectedResult", "")])
+    text = f" {screen_key(text)} "
+    screens = {}
+    for screen in known_screens:
+        key = screen_key(screen)
+        if key and f" {key} " in text:
+            screens.setdefault(key, screen)
+    for step in test_case.get("steps", []):
+        match = NAVIGATION_RE.match(step)
+        if match:
+            screens.setdefault(screen_key(match.group(1)), match.group(1))
+    return screens
+
+
+class CaseStore:
+    """Connection to the test case database; create one per thread or job."""
+
+    def __init__(self, db_file=DEFAULT_DB):
+        self.db_file = db_file
+        self.connection = sqlite3.connect(db_file, timeout=30, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def add_run(self, project, test_cases, known_screens=(), source=None, settings=None):
+        """Append one generation run and its cases in a single transaction; returns the run id.
+
+        Exact repeats (same fingerprint) within the run are stored once.
+        """
+        connection = self.connection
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent writers queue
+        # on the busy timeout instead of failing with "database is locked" mid-transaction.
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            run_id = connection.execute(
+                "INSERT INTO runs (project, started_at, source, settings) VALUES (?, ?, ?, ?)",
+                (project, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), source,
+                 json.dumps(settings) if settings is not None else None)).lastrowid
+            seen = set()
+            for test_case in test_cases:
+                fingerprint = case_fingerprint(test_case)
+                if fingerprint in seen:
+                    continue
+                seen.add(fingerprint)
+                case_id = connection.execute(
+                    "INSERT INTO cases (run_id, project, fingerprint, title, steps, expected_result) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (run_id, project, fingerprint, test_case.get("testCase", ""),
+                     json.dumps(test_case.get("steps", []), ensure_ascii=False),
+                     test_case.get("expectedResult", ""))).lastrowid
+                connection.executemany(
+                    "INSERT INTO case_screens (case_id, project, screen_key, screen) VALUES (?, ?, ?, ?)",
+                    [(case_id, project, key, screen) for key, screen in case_screens(test_case, known_screens).items()])
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return run_id
+
+    def cases(self, project, screen=None, since=0, latest=True):
+        """Return stored cases as dicts (with id, runId and fingerprint), oldest first.
+
+        screen limits the result to cases touching that screen, since to ids above it
+        (for incremental export). With latest, only the newest row per fingerprint is kept.
+        """
+        query = "SELECT c.* FROM cases c"
+        parameters = []
+        if screen is not None:
+            query += " JOIN case_screens s ON s.case_id = c.id AND s.project = ? AND s.screen_key = ?"
+            parameters += [project, screen_key(screen)]
+        query += " WHERE c.project = ? AND c.id > ?"
+        parameters += [project, since]
+        if latest:
+            query += " AND c.id = (SELECT MAX(id) FROM cases WHERE project = c.project AND fingerprint = c.fingerprint)"
+        query += " ORDER BY c.id"
+        return [{"id": row["id"], "runId": row["run_id"], "fingerprint": row["fingerprint"],
+                 "testCase": row["title"], "steps": json.loads(row["steps"]), "expectedResult": row["expected_result"]}
+                for row in self.connection.execute(query, parameters)]
+
+    def runs(self, project=None):
+        query = ("SELECT r.*, COUNT(c.id) AS cases FROM runs r LEFT JOIN cases c ON c.run_id = r.id"
+                 + (" WHERE r.project = ?" if project else "") + " GROUP BY r.id ORDER BY r.id")
+        return [dict(row) for row in self.connection.execute(query, [project] if project else [])]
+
+    def close(self):
+        self.connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the append-only test case store.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Database file (default: TEST_CASE_DB or test_cases.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    runs_parser = commands.add_parser("runs", help="List generation runs")
+    runs_parser.add_argument("--project")
+    export_parser = commands.add_parser("export", help="Write cases to stdout")
+    export_parser.add_argument("--project", required=True)
+    export_parser.add_argument("--screen", help="Only cases touching this screen")
+    export_parser.add_argument("--since", type=int, default=0, help="Only cases with an id above this one")
+    export_parser.add_argument("--all-versions", action="store_true",
+                               help="Include every stored row, not just the newest per fingerprint")
+    export_parser.add_argument("--format", choices=["txt", "jsonl"], default="txt")
+    args = parser.parse_args(argv)
+
+    store = CaseStore(args.db)
+    try:
+        if args.command == "runs":
+            for run in store.runs(args.project):
+                print(json.dumps(run, ensure_ascii=False))
+            return
+        cases = store.cases(args.project, screen=args.screen, since=args.since, latest=not args.all_versions)
+        if args.format == "jsonl":
+            for case in cases:
+                print(json.dumps(case, ensure_ascii=False))
+        elif cases:
+            print(format_test_cases_as_text(cases))
+        # The highest id goes to stderr so callers can pass it as --since next time
+        print(f"last id: {cases[-1]['id'] if cases else args.since}", file=sys.stderr)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+
+# Each rule maps Figma elements to one processed_data list. An element is matched by
+# its exported type or category first, then by name; the first matching rule wins.
+DEFAULT_RULES = [
+    {"key": "radioButtons", "label": "Radio Buttons", "types": ["RADIO_BUTTON"], "categories": ["Radio Button"],
+     "patterns": [r"radio"]},
+    {"key": "checkboxes", "label": "Checkboxes", "types": ["CHECKBOX"], "categories": ["Checkbox"],
+     "patterns": [r"check ?box"]},
+    {"key": "dropdowns", "label": "Dropdowns", "types": ["DROPDOWN"], "categories": ["Dropdown"],
+     "patterns": [r"drop ?down", r"\bselect\b", r"combo ?box"]},
+    {"key": "inputs", "label": "Input Fields", "types": ["TEXTBOX"], "categories": ["Input Field"],
+     "patterns": [r"input", r"text ?field", r"text ?box"]},
+    {"key": "buttons", "label": "Buttons", "types": ["BUTTON"], "categories": ["Button"],
+     "patterns": [r"button", r"\bbtn\b"]},
+]
+
+# Distinct (name, type, category) combinations remembered per classifier. The classifier is
+# resident in --serve modes, so the memo is bounded rather than growing with every name seen.
+DEFAULT_MEMO_SIZE = int(os.getenv("ELEMENT_CLASSIFIER_MEMO_SIZE", "65536"))
+
+
+class ElementClassifier:
+    """Classify Figma elements into processed_data lists using a rule table.
+
+    All name patterns are compiled into a single alternation, so each distinct
+    element is classified with at most two dict lookups and one regex search;
+    repeated (name, type, category) combinations are served from an LRU memo
+    of memo_size entries.
+    """
+
+    def __init__(self, rules=DEFAULT_RULES, memo_size=DEFAULT_MEMO_SIZE):
+        self.rules = rules
+        self.keys = [rule["key"] for rule in rules]
+        self.labels = {rule["key"]: rule.get("label", rule["key"]) for rule in rules}
+        self.by_type = {}
+        self.by_category = {}
+        alternatives = []
+        for position, rule in enumerate(rules):
+            for element_type in rule.get("types", []):
+                self.by_type.setdefault(element_type, rule["key"])
+            for category in rule.get("categories", []):
+                self.by_category.setdefault(category, rule["key"])
+            if rule.get("patterns"):
+                alternatives.append(f"(?P<rule{position}>{'|'.join(rule['patterns'])})")
+        self.name_re = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        self.memo = lru_cache(maxsize=memo_size)(self._classify)
+
+    def _classify(self, name, element_type, category):
+        key = self.by_type.get(element_type) or self.by_category.get(category)
+        if key is None and self.name_re is not None:
+            match = self.name_re.search(name)
+            if match:
+                key = self.rules[int(match.lastgroup[len("rule"):])]["key"]
+        return key
+
+    def classify(self, element):
+        """Return the processed_data key for element, or None if it is not interactive."""
+        return self.memo(element.get("name", ""), element.get("type", ""), element.get("category", ""))
+
+    def collect(self, elements, processed_data):
+        """Append the name of every classified element to its processed_data list in one pass."""
+        memo = self.memo
+        for element in elements:
+            name = element.get("name", "")
+            key = memo(name, element.get("type", ""), element.get("category", ""))
+            if key:
+                processed_data[key].append(name.strip() or "Unnamed Element")
+
+
+def load_rules(rules_file):
+    """Load a rule table from a JSON file with the same shape as DEFAULT_RULES."""
+    with open(rules_file, 'r', encoding="utf-8") as file:
+        rules = json.load(file)
+    for rule in rules:
+        if "key" not in rule:
+            raise ValueError(f"Element rule has no 'key': {rule}")
+    return rules
+
+
+_default_classifier = None
+_default_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    """Return the shared classifier, built from ELEMENT_RULES_FILE when it is set."""
+    global _default_classifier
+    if _default_classifier is not None:
+        return _default_classifier
+    with _default_classifier_lock:
+        if _default_classifier is None:
+            rules_file = os.getenv("ELEMENT_RULES_FILE")
+            _default_classifier = ElementClassifier(load_rules(rules_file) if rules_file else DEFAULT_RULES)
+        return _default_classifier
+
+
+def dedupe_names(names):
+    """Drop repeated component names (ignoring case and spacing), keeping first-seen order."""
+    seen = set()
+    unique = []
+    for name in names:
+        normalized = name.casefold()
+        if "  " in normalized:
+            normalized = " ".join(normalized.split())
+        if normalized not in seen:
+            seen.add(normalized)
+            unique.append(name)
+    return unique
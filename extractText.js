@@ -42,7 +42,6 @@
 
 const fs = require("fs");
 const path = require("path");
-const pdfParse = require("pdf-parse");
 
 // Paths
 const uploadDir = path.join(__dirname, "./uploads");
@@ -53,7 +52,7 @@ if (!fs.existsSync(textDataDir)) {
    fs.mkdirSync(textDataDir, { recursive: true });
 }
 
-// Function to extract text from a stored PDF
+// Function to extract text from a stored PDF, one page at a time
 const extractTextFromStoredPDF = async (pdfFilename) => {
    const pdfFilePath = path.join(uploadDir, pdfFilename);
    const textFilePath = path.join(textDataDir, "extracted_text.txt");
@@ -64,15 +63,23 @@ const extractTextFromStoredPDF = async (pdfFilename) => {
          return;
       }
 
-      // Read and parse the PDF
-      const pdfBuffer = fs.readFileSync(pdfFilePath);
-      const pdfData = await pdfParse(pdfBuffer);
-
-      console.log(`📄 Extracted text from ${pdfFilename}:`);
-      console.log(pdfData.text);
+      // pdfPages.mjs is an ES module
+      const { iterPdfPages } = await import("./pdfPages.mjs");
+      const pdfBuffer = await fs.promises.readFile(pdfFilePath);
+
+      // Pages are appended as they are extracted instead of building the whole text in memory
+      const output = fs.createWriteStream(textFilePath, "utf-8");
+      let pages = 0;
+      let cachedPages = 0;
+      for await (const { text, cached } of iterPdfPages(pdfBuffer)) {
+         if (pages > 0) output.write("\n");
+         if (!output.write(text)) await new Promise(resolve => output.once("drain", resolve));
+         pages++;
+         if (cached) cachedPages++;
+      }
+      await new Promise((resolve, reject) => output.end(err => (err ? reject(err) : resolve())));
 
-      // Save the extracted text to a file
-      fs.writeFileSync(textFilePath, pdfData.text, "utf-8");
+      console.log(`📄 Extracted ${pages} pages from ${pdfFilename} (${cachedPages} from cache)`);
       console.log(`✅ Extracted text saved to: ${textFilePath}`);
    } catch (err) {
       console.error(`❌ Error extracting text from ${pdfFilename}:`, err);
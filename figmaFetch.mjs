@@ -0,0 +1,198 @@
+import fetch from "node-fetch";
+import fs from 'fs/promises';
+import path from 'path';
+import { fileURLToPath } from 'url';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const FIGMA_API_URL = process.env.FIGMA_API_URL || "https://api.figma.com/v1";
+// Responses are cached per file: the shallow page/frame listing with its ETag, and frame
+// subtrees keyed by the file version they were fetched at.
+const FIGMA_CACHE_DIR = process.env.FIGMA_CACHE_DIR || path.join(__dirname, ".figma_cache");
+// Frame ids per /nodes request, and how many of those requests run at once.
+const NODE_BATCH_SIZE = Number(process.env.FIGMA_NODE_BATCH_SIZE) || 50;
+const NODE_CONCURRENCY = Number(process.env.FIGMA_NODE_CONCURRENCY) || 4;
+
+const IMPORTANT_TYPES = new Set(["TEXT", "TEXTBOX", "BUTTON", "DROPDOWN", "CHECKBOX", "RADIO_BUTTON"]);
+
+// Function to extract minimal node data
+export const extractNodeData = (node) => {
+    if (!node || !node.name || !node.type) return null;
+    return { id: node.id, name: node.name.trim(), type: node.type };
+};
+
+// Collect important descendants in document (pre-)order with an explicit stack, so deep
+// trees neither recurse nor copy the result array at every level.
+export const extractImportantChildren = (children) => {
+    const importantChildren = [];
+    if (!children) return importantChildren;
+    const stack = [];
+    for (let i = children.length - 1; i >= 0; i--) stack.push(children[i]);
+    while (stack.length > 0) {
+        const child = stack.pop();
+        if (IMPORTANT_TYPES.has(child.type)) {
+            importantChildren.push(extractNodeData(child));
+        }
+        if (child.children) {
+            for (let i = child.children.length - 1; i >= 0; i--) stack.push(child.children[i]);
+        }
+    }
+    return importantChildren;
+};
+
+// Helper function to map Figma types to categories
+export function getCategoryFromType(type) {
+    switch(type) {
+        case "BUTTON":
+            return "Button";
+        case "TEXTBOX":
+        case "TEXT":
+            if (type.toLowerCase().includes("input")) {
+                return "Input Field";
+            }
+            return "Text";
+        case "DROPDOWN":
+            return "Dropdown";
+        case "CHECKBOX":
+            return "Checkbox";
+        case "RADIO_BUTTON":
+            return "Radio Button";
+        default:
+            return type;
+    }
+}
+
+const readJson = async (file) => {
+    try {
+        return JSON.parse(await fs.readFile(file, "utf-8"));
+    } catch (err) {
+        return null;
+    }
+};
+
+const getOk = async (url, headers) => {
+    const response = await fetch(url, { headers });
+    if (!response.ok) {
+        throw new Error(`❌ Figma API Error (${response.status}): ${response.statusText}`);
+    }
+    return response;
+};
+
+// GET url, revalidating the copy in cacheFile with If-None-Match when there is one.
+const getWithEtag = async (url, headers, cacheFile) => {
+    const cached = cacheFile ? await readJson(cacheFile) : null;
+    const requestHeaders = cached && cached.etag ? { ...headers, "If-None-Match": cached.etag } : headers;
+    const response = await fetch(url, { headers: requestHeaders });
+    if (response.status === 304 && cached) {
+        return { body: cached.body, revalidated: true };
+    }
+    if (!response.ok) {
+        throw new Error(`❌ Figma API Error (${response.status}): ${response.statusText}`);
+    }
+    const body = await response.json();
+    const etag = response.headers.get("etag");
+    if (cacheFile && etag) {
+        await fs.writeFile(cacheFile, JSON.stringify({ etag, body }), "utf-8");
+    }
+    return { body, revalidated: false };
+};
+
+// Fetch the subtrees of frameIds with /nodes?ids=, reusing frames cached at the same file version.
+const fetchFrameNodes = async (fileId, frameIds, version, headers, cacheDir) => {
+    const cacheFile = cacheDir && version ? path.join(cacheDir, `nodes-${version}.json`) : null;
+    const nodes = (cacheFile && await readJson(cacheFile)) || {};
+    const missing = frameIds.filter(id => !nodes[id]);
+
+    const batches = [];
+    for (let i = 0; i < missing.length; i += NODE_BATCH_SIZE) {
+        batches.push(missing.slice(i, i + NODE_BATCH_SIZE));
+    }
+    for (let i = 0; i < batches.length; i += NODE_CONCURRENCY) {
+        await Promise.all(batches.slice(i, i + NODE_CONCURRENCY).map(async (ids) => {
+            const url = `${FIGMA_API_URL}/files/${fileId}/nodes?ids=${encodeURIComponent(ids.join(","))}`;
+            const data = await (await getOk(url, headers)).json();
+            for (const [id, node] of Object.entries(data.nodes || {})) {
+                if (node && node.document) nodes[id] = node.document;
+            }
+        }));
+    }
+
+    if (cacheFile && missing.length > 0) {
+        // Frames cached at older versions can never be served again
+        for (const name of await fs.readdir(cacheDir)) {
+            if (name.startsWith("nodes-") && name !== path.basename(cacheFile)) {
+                await fs.rm(path.join(cacheDir, name), { force: true });
+            }
+        }
+        await fs.writeFile(cacheFile, JSON.stringify(nodes), "utf-8");
+    }
+    return { nodes, fetched: missing.length };
+};
+
+// Fetch a Figma file and reduce it to the { pages: [{ page, frames: [{ frame, elements }] }] }
+// shape that paste.py and the test case prompt expect. A depth=2 request lists pages and their
+// top-level frames; only frames on "Page N" pages are then fetched, in /nodes batches.
+export const fetchFigmaDesign = async (figmaToken, fileId, { useCache = process.env.FIGMA_CACHE_DISABLE !== "1" } = {}) => {
+    const headers = { "X-Figma-Token": figmaToken };
+    const cacheDir = useCache ? path.join(FIGMA_CACHE_DIR, encodeURIComponent(fileId)) : null;
+    if (cacheDir) await fs.mkdir(cacheDir, { recursive: true });
+
+    const fileUrl = `${FIGMA_API_URL}/files/${fileId}?depth=2`;
+    console.log("📤 Sending request to Figma API...");
+    console.log("📡 Fetching data from:", fileUrl);
+    const { body: data, revalidated } = await getWithEtag(fileUrl, headers, cacheDir && path.join(cacheDir, "file.json"));
+    if (!data.document || !data.document.children) {
+        throw new Error("❌ Invalid Figma data structure!");
+    }
+
+    const filteredPages = data.document.children.filter(page => /^Page \d+/.test(page.name));
+    const frameIds = [];
+    for (const page of filteredPages) {
+        for (const node of page.children || []) {
+            if (node.type === "FRAME" || node.type === "GROUP") frameIds.push(node.id);
+        }
+    }
+    const { nodes, fetched } = await fetchFrameNodes(fileId, frameIds, data.version, headers, cacheDir);
+    console.log(`📦 Figma file ${revalidated ? "unchanged" : "listed"}: ${frameIds.length} frames, ${fetched} fetched, ${frameIds.length - fetched} from cache`);
+
+    // Extract relevant data
+    const extractedData = [];
+    for (const page of filteredPages) {
+        const framesData = [];
+        for (const { id } of page.children || []) {
+            const node = nodes[id];
+            if (!node) continue;
+            const nodeData = extractNodeData(node);
+            const importantChildren = extractImportantChildren(node.children);
+            if (importantChildren.length > 0) {
+                framesData.push({ ...nodeData, children: importantChildren });
+            }
+        }
+        if (framesData.length > 0) {
+            extractedData.push({ page: page.name, frames: framesData });
+        }
+    }
+
+    // Format the data for the Python script
+    return {
+        pages: extractedData.map(page => {
+            return {
+                page: page.page,
+                frames: page.frames.map(frame => {
+                    return {
+                        frame: frame.name,
+                        description: frame.description || "No text available",
+                        elements: frame.children.map(child => {
+                            return {
+                                name: child.name,
+                                type: child.type,
+                                category: getCategoryFromType(child.type)
+                            };
+                        })
+                    };
+                })
+            };
+        })
+    };
+};
@@ -0,0 +1,168 @@
+import json
+import re
+
+# Size of each read from the Figma export; buffers grow geometrically past this
+# only while a single frame is larger than the current window.
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+_decoder = json.JSONDecoder()
+# What skip() looks for inside and outside strings.
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+_STRUCTURE_RE = re.compile(r'["{}\[\]]')
+
+
+class _JsonStream:
+    """Minimal pull-reader over a JSON file that keeps only the unread tail in memory."""
+
+    def __init__(self, file, chunk_size=CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size):
+        """Drop the consumed prefix and read at least `size` more characters."""
+        if self.eof:
+            return False
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        chunk = self.file.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(self.chunk_size):
+                raise ValueError("Unexpected end of Figma JSON")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in Figma JSON, found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more of the file as needed."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # A bare number at the end of the buffer may continue in the next chunk.
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(size)
+            size *= 2
+
+    def skip(self):
+        """Consume the next JSON value without decoding it, so skipped values are never held whole."""
+        if self.peek() not in '{["':
+            # Numbers, true, false and null are short
+            self.value()
+            return
+        depth = 0
+        in_string = False
+        while True:
+            match = (_STRING_SPECIAL_RE if in_string else _STRUCTURE_RE).search(self.buffer, self.pos)
+            if match is None or (match.group() == "\\" and match.end() == len(self.buffer)):
+                # Keep an escape whose next character is still unread
+                self.pos = match.start() if match else len(self.buffer)
+                if not self._fill(self.chunk_size):
+                    raise ValueError("Unexpected end of Figma JSON")
+                continue
+            char = match.group()
+            self.pos = match.end()
+            if char == "\\":
+                self.pos += 1
+            elif char == '"':
+                in_string = not in_string
+                if not in_string and depth == 0:
+                    return
+            elif char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def members(self):
+        """Iterate over the keys of an object; the caller must consume each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or '}}' in Figma JSON, found '{separator}'")
+
+    def items(self):
+        """Iterate over the elements of an array; the caller must consume each value."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' in Figma JSON, found '{separator}'")
+
+
+def iter_figma_frames(json_file_path, chunk_size=CHUNK_SIZE):
+    """Yield (page_name, frame) pairs from a Figma export without loading the whole file.
+
+    Only one frame object is decoded at a time, so peak memory is bounded by the
+    largest frame rather than the document. Keys other than `pages`, `page` and
+    `frames` are skipped without being decoded. Frames that come before their page's
+    `page` key are held until the name is read, or until the page ends.
+    """
+    with open(json_file_path, 'r', encoding="utf-8") as file:
+        stream = _JsonStream(file, chunk_size)
+        for key in stream.members():
+            if key != "pages":
+                stream.skip()
+                continue
+            for _ in stream.items():
+                page_name = None
+                waiting = []
+                for page_key in stream.members():
+                    if page_key == "frames":
+                        for _ in stream.items():
+                            if page_name is None:
+                                waiting.append(stream.value())
+                            else:
+                                yield page_name, stream.value()
+                    elif page_key == "page":
+                        page_name = stream.value()
+                        for frame in waiting:
+                            yield page_name, frame
+                        waiting = []
+                    else:
+                        stream.skip()
+                for frame in waiting:
+                    yield "", frame
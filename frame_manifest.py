@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+
+
+def _digest(value):
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def fingerprint_frame(frame):
+    """Hash a frame's name and its elements' name/type/category as exported by temp.mjs."""
+    elements = [[element.get("name", ""), element.get("type", ""), element.get("category", "")]
+                for element in frame.get("elements", [])]
+    return _digest([frame.get("frame", ""), elements])
+
+
+def frame_keys(frames):
+    """Yield a stable key per (page_name, frame), disambiguating repeated frame names."""
+    seen = {}
+    for page_name, frame in frames:
+        key = f"{page_name}/{frame.get('frame', '')}"
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        yield (f"{key}#{count + 1}" if count else key), frame
+
+
+class FrameManifest:
+    """Persistent record of each frame's fingerprint and the test cases generated for it.
+
+    The manifest also stores a context hash (SRS text and generation settings);
+    when that changes every frame is treated as changed.
+    """
+
+    def __init__(self, manifest_file):
+        self.manifest_file = manifest_file
+        self.context = None
+        self.frames = {}
+        try:
+            with open(manifest_file, 'r', encoding="utf-8") as file:
+                data = json.load(file)
+            self.context = data.get("context")
+            self.frames = data.get("frames", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error reading frame manifest, regenerating all frames: {e}")
+
+    def set_context(self, *values):
+        """Invalidate every stored frame if the generation context changed."""
+        context = _digest(list(values))
+        if context != self.context:
+            self.context = context
+            self.frames = {}
+
+    def lookup(self, key, fingerprint):
+        """Return stored test case text for an unchanged frame, or None if it must be regenerated."""
+        entry = self.frames.get(key)
+        if entry and entry.get("fingerprint") == fingerprint:
+            return entry.get("testCases")
+        return None
+
+    def save(self, entries):
+        """Replace the manifest with entries ({key: {fingerprint, testCases}}), dropping removed frames."""
+        self.frames = entries
+        temp_file = f"{self.manifest_file}.tmp"
+        with open(temp_file, 'w', encoding="utf-8") as file:
+            json.dump({"context": self.context, "frames": self.frames}, file, indent=2, ensure_ascii=False)
+        os.replace(temp_file, self.manifest_file)
@@ -0,0 +1,65 @@
+import math
+import os
+import re
+
+from case_dedupe import DedupeIndex
+
+# Cases requested per prompt: two per screen plus one per three interactive elements,
+# clamped to [LLM_MIN_CASES, LLM_MAX_CASES]; LLM_TARGET_CASES fixes the count instead.
+MIN_CASES = int(os.getenv("LLM_MIN_CASES", "3"))
+MAX_CASES = int(os.getenv("LLM_MAX_CASES", "30"))
+FIXED_CASES = int(os.getenv("LLM_TARGET_CASES", "0"))
+# Completion tokens budgeted per plain-text case; structured (JSON) cases take about half again as many.
+TOKENS_PER_CASE = int(os.getenv("LLM_TOKENS_PER_CASE", "120"))
+MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "4000"))
+# Stop streaming once the target number of distinct cases has been parsed.
+EARLY_STOP = os.getenv("LLM_EARLY_STOP", "1") != "0"
+
+# Where plain-text completions wander off after the last case: closing remarks. Runs of blank
+# lines are not a stop, since some models leave two blank lines between cases; the case-count
+# early stop ends generation instead.
+STOP_SEQUENCES = ["\nNote:", "\n**Note"]
+
+EXPECTED_LINE_RE = re.compile(r"^[ \t*#]*Expected Result[ \t*]*:.*$", re.IGNORECASE | re.MULTILINE)
+
+
+def target_case_count(processed_data):
+    """Number of test cases to ask for, scaled to the screens and elements in processed_data."""
+    if FIXED_CASES:
+        return FIXED_CASES
+    screens = len(processed_data.get("screens", []))
+    elements = sum(len(names) for key, names in processed_data.items() if key != "screens" and isinstance(names, list))
+    return max(MIN_CASES, min(MAX_CASES, 2 * screens + math.ceil(elements / 3)))
+
+
+def max_tokens_for(case_count, structured=False):
+    """Completion budget for case_count cases, with 25% headroom, capped at LLM_MAX_TOKENS."""
+    per_case = TOKENS_PER_CASE * (1.5 if structured else 1)
+    return min(MAX_TOKENS, math.ceil(case_count * per_case * 1.25) + 64)
+
+
+def is_well_formed(test_case):
+    return bool(test_case.get("testCase") and test_case.get("steps") and test_case.get("expectedResult"))
+
+
+class CaseCounter:
+    """Counts distinct, well-formed test cases as they are parsed from a stream."""
+
+    def __init__(self):
+        self.index = DedupeIndex()
+        self.count = 0
+
+    def add(self, test_case):
+        """Count test_case if it is well formed and not a duplicate; returns whether it counted."""
+        if not is_well_formed(test_case) or self.index.add(test_case)[0] != "new":
+            return False
+        self.count += 1
+        return True
+
+
+def trim_to_last_case(text):
+    """Cut text after the last complete "Expected Result:" line, dropping a half-generated case."""
+    last = None
+    for last in EXPECTED_LINE_RE.finditer(text):
+        pass
+    return text[:last.end()] + "\n" if last else text
@@ -0,0 +1,114 @@
+import { randomUUID } from 'crypto';
+
+// Bounded job queue with priorities and per-tenant fairness.
+// Higher priority jobs always run first; within a priority level, tenants take turns
+// so one tenant submitting many jobs cannot starve the others.
+export class JobQueue {
+    constructor({ concurrency = 2, runJob, historyLimit = 500 }) {
+        this.concurrency = concurrency;
+        this.runJob = runJob;
+        this.historyLimit = historyLimit;
+        this.jobs = new Map();
+        // priority -> { tenants: Map<tenant, job[]>, order: tenant[] }
+        this.levels = new Map();
+        this.running = 0;
+    }
+
+    enqueue({ tenant = "default", priority = 0, payload }) {
+        const job = {
+            id: randomUUID(),
+            tenant,
+            priority,
+            payload,
+            status: "queued",
+            createdAt: new Date().toISOString(),
+            startedAt: null,
+            finishedAt: null,
+            result: null,
+            error: null,
+        };
+        this.jobs.set(job.id, job);
+
+        if (!this.levels.has(priority)) {
+            this.levels.set(priority, { tenants: new Map(), order: [] });
+        }
+        const level = this.levels.get(priority);
+        if (!level.tenants.has(tenant)) {
+            level.tenants.set(tenant, []);
+            level.order.push(tenant);
+        }
+        level.tenants.get(tenant).push(job);
+
+        this.pump();
+        return job;
+    }
+
+    get(id) {
+        return this.jobs.get(id);
+    }
+
+    // Position of a queued job in dispatch order is not tracked; report queue depth instead.
+    stats() {
+        let queued = 0;
+        for (const level of this.levels.values()) {
+            for (const jobs of level.tenants.values()) queued += jobs.length;
+        }
+        return { queued, running: this.running, concurrency: this.concurrency };
+    }
+
+    next() {
+        const priorities = [...this.levels.keys()].sort((a, b) => b - a);
+        for (const priority of priorities) {
+            const level = this.levels.get(priority);
+            while (level.order.length > 0) {
+                // Rotate tenants so each gets one job per turn.
+                const tenant = level.order.shift();
+                const jobs = level.tenants.get(tenant);
+                const job = jobs.shift();
+                if (jobs.length > 0) {
+                    level.order.push(tenant);
+                } else {
+                    level.tenants.delete(tenant);
+                }
+                if (job) return job;
+            }
+            this.levels.delete(priority);
+        }
+        return null;
+    }
+
+    pump() {
+        while (this.running < this.concurrency) {
+            const job = this.next();
+            if (!job) return;
+            this.start(job);
+        }
+    }
+
+    async start(job) {
+        this.running++;
+        job.status = "running";
+        job.startedAt = new Date().toISOString();
+        try {
+            job.result = await this.runJob(job);
+            job.status = "succeeded";
+        } catch (err) {
+            job.status = "failed";
+            job.error = err.message;
+        } finally {
+            job.finishedAt = new Date().toISOString();
+            this.running--;
+            this.prune();
+            this.pump();
+        }
+    }
+
+    // Forget the oldest finished jobs once the history grows past historyLimit.
+    prune() {
+        if (this.jobs.size <= this.historyLimit) return;
+        for (const [id, job] of this.jobs) {
+            if (this.jobs.size <= this.historyLimit) break;
+            if (job.status === "succeeded" || job.status === "failed") this.jobs.delete(id);
+        }
+    }
+}
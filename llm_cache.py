@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+DEFAULT_MAX_AGE = int(os.getenv("LLM_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+DEFAULT_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+# Seconds between full directory scans for expired entries while the cache is under budget.
+DEFAULT_EVICT_INTERVAL = int(os.getenv("LLM_CACHE_EVICT_INTERVAL", "300"))
+# Temp files older than this were left behind by a writer that crashed between mkstemp and replace.
+STALE_TEMP_AGE = 3600
+
+# Payload fields that determine the completion; anything else (e.g. stream) is ignored.
+KEY_FIELDS = ("model", "prompt", "temperature", "max_tokens", "stop")
+
+
+def cache_key(payload):
+    """Return a content hash of the payload fields that affect the completion."""
+    material = {field: payload.get(field) for field in KEY_FIELDS}
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def lookup(cache, client, payload):
+    """Return a cached completion for payload as client would send it, or None.
+
+    A routed client may send each backend its own model name, and entries are stored under
+    the model that answered, so every payload in client.cache_payloads(payload) is tried.
+    """
+    for candidate in client.cache_payloads(payload):
+        text = cache.get(candidate)
+        if text is not None:
+            return text
+    return None
+
+
+def answered_payload(payload, stats):
+    """payload with the model that answered it, when the client reported one in stats["model"]."""
+    return {**payload, "model": stats["model"]} if stats.get("model") else payload
+
+
+class ResponseCache:
+    """On-disk, content-addressed cache of LLM completions.
+
+    Each entry is one JSON file named after its key. Entries older than max_age
+    seconds are treated as misses, and the least recently used entries are
+    evicted once the directory grows beyond max_bytes. The directory size is
+    tracked as entries are written, so the directory is only rescanned when the
+    budget is exceeded or every evict_interval seconds. Temp files of writes in
+    progress count towards max_bytes; stale ones are removed by the first scan
+    of each process.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_age=DEFAULT_MAX_AGE, max_bytes=DEFAULT_MAX_BYTES,
+                 evict_interval=DEFAULT_EVICT_INTERVAL):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+        self._lock = threading.Lock()
+        self._size = None
+        self._last_evict = 0.0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, payload):
+        """Return the cached completion text for payload, or None on a miss."""
+        path = self._path(cache_key(payload))
+        try:
+            if self.max_age and time.time() - os.path.getmtime(path) > self.max_age:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding="utf-8") as file:
+                text = json.load(file)["text"]
+            # Touch the entry so eviction is least-recently-used rather than oldest-written.
+            os.utime(path)
+            return text
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, payload, text):
+        """Store a completion and evict old entries if the cache is over budget."""
+        if not text:
+            return
+        key = cache_key(payload)
+        path = self._path(key)
+        temp_path = None
+        try:
+            # A unique temp file per write, since sharded workers in one process can store the same key at once
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding="utf-8") as file:
+                json.dump({"model": payload.get("model"), "created": time.time(), "text": text}, file)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error writing LLM cache entry: {e}")
+            if temp_path:
+                self._remove(temp_path)
+            return
+
+        with self._lock:
+            # Overwriting an existing key over-counts, which only brings the next scan forward
+            if self._size is not None:
+                self._size += size
+            due = (self._size is None or (self.max_bytes and self._size > self.max_bytes)
+                   or time.time() - self._last_evict >= self.evict_interval)
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Remove stale temp files and expired entries, then the least recently used entries until under max_bytes."""
+        now = time.time()
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            temp = entry.name.endswith(".tmp")
+            if not temp and not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if temp:
+                # Fresh temp files belong to writes in progress and are replaced, not evicted
+                if now - stat.st_mtime > STALE_TEMP_AGE:
+                    self._remove(entry.path)
+                else:
+                    total += stat.st_size
+                continue
+            if self.max_age and now - stat.st_mtime > self.max_age:
+                self._remove(entry.path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        if self.max_bytes and total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                self._remove(path)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+        with self._lock:
+            self._size = total
+            self._last_evict = now
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
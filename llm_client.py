@@ -0,0 +1,197 @@
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+LLM_API_URL = os.getenv("LLM_API_URL", "http://10.21.19.17:1234/v1/completions")
+
+# Statuses worth retrying: rate limiting and transient server-side failures.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of contacting the LLM while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Stop calling a failing endpoint after repeated errors, then probe it again after a cool-down.
+
+    The breaker is closed while requests succeed and opens after failure_threshold
+    consecutive failures. Once reset_timeout has passed it is half-open: a single
+    probe request is let through, and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a request may be sent now."""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Admit exactly one probe; everyone else keeps failing fast until it reports back.
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.state = self.CLOSED
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class LLMClient:
+    """Pooled keep-alive HTTP client for an OpenAI-compatible completions endpoint.
+
+    Requests are retried with exponential backoff and full jitter on connection
+    errors, timeouts and retryable statuses, and a circuit breaker fails fast
+    once the endpoint has been down for several consecutive attempts.
+    """
+
+    def __init__(self, api_url=LLM_API_URL, pool_size=None, connect_timeout=None, read_timeout=None,
+                 max_retries=None, backoff_base=None, backoff_max=None, breaker=None):
+        self.api_url = api_url
+        pool_size = pool_size or int(os.getenv("LLM_POOL_SIZE", "10"))
+        self.timeout = (
+            connect_timeout or float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+            read_timeout or float(os.getenv("LLM_READ_TIMEOUT", "600")),
+        )
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", "4"))
+        self.backoff_base = backoff_base or float(os.getenv("LLM_BACKOFF_BASE", "1"))
+        self.backoff_max = backoff_max or float(os.getenv("LLM_BACKOFF_MAX", "30"))
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30")),
+        )
+        self.retry_count = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _backoff(self, attempt):
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def post(self, payload, stats=None, **kwargs):
+        """POST payload to the endpoint with retries, returning the successful response.
+
+        If stats is a dict, stats["retries"] counts the retries made for this request.
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {self.api_url}; skipping request")
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            except requests.exceptions.RequestException:
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    # Any other status means the endpoint is up, even if it rejected this request
+                    self.breaker.record_success()
+                    response.raise_for_status()
+                    return response
+                error = requests.exceptions.HTTPError(
+                    f"{response.status_code} Server Error for url: {self.api_url}", response=response)
+                # Release the pooled connection; a stream=True response is otherwise held until garbage collected
+                response.close()
+
+            self.breaker.record_failure()
+            if attempt >= self.max_retries:
+                raise error
+            delay = self._backoff(attempt)
+            print(f"LLM request failed ({error}); retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            attempt += 1
+            self.retry_count += 1
+            if stats is not None:
+                stats["retries"] = stats.get("retries", 0) + 1
+
+    def complete(self, payload, stats=None):
+        """Return the completion text for payload.
+
+        If stats is a dict, it receives "retries" and the server's "usage" token counts, when reported.
+        """
+        body = self.post(payload, stats=stats).json()
+        if stats is not None and body.get("usage"):
+            stats["usage"] = body["usage"]
+        return body.get("choices", [{}])[0].get("text", "")
+
+    def stream(self, payload, stats=None):
+        """Yield completion text deltas from a server-sent events (stream: true) response."""
+        response = self.post({**payload, "stream": True}, stats=stats, stream=True)
+        with response:
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8", errors="replace")
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                try:
+                    event = json.loads(data)
+                except ValueError:
+                    continue
+                if stats is not None and event.get("usage"):
+                    stats["usage"] = event["usage"]
+                choice = (event.get("choices") or [{}])[0]
+                text = choice.get("text")
+                if text is None:
+                    text = (choice.get("delta") or {}).get("content", "")
+                if text:
+                    yield text
+
+    def cache_payloads(self, payload):
+        """Payloads a cached completion for payload may be stored under: one endpoint sends payload as is."""
+        return [payload]
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Return the process-wide LLM client shared by every LLM call.
+
+    When LLM_BACKENDS lists several endpoints this is an llm_router.LLMRouter
+    spreading requests across them; otherwise a single LLMClient for LLM_API_URL.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            if os.getenv("LLM_BACKENDS"):
+                from llm_router import router_from_env
+                _default_client = router_from_env()
+            else:
+                _default_client = LLMClient()
+        return _default_client
@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+
+import requests
+
+from llm_client import CircuitOpenError, LLMClient
+
+ROUTING_STRATEGIES = ("least-outstanding", "weighted-round-robin")
+
+
+class Backend:
+    """One OpenAI-compatible completions endpoint behind the router."""
+
+    def __init__(self, url, model=None, weight=1, health_url=None, max_retries=None):
+        self.url = url
+        self.model = model
+        self.weight = max(int(weight), 1)
+        self.health_url = health_url or url.rsplit("/", 1)[0] + "/models"
+        self.client = LLMClient(api_url=url, max_retries=max_retries)
+        self.outstanding = 0
+        self.current_weight = 0
+        self.healthy = True
+
+    def prepare(self, payload):
+        """Return payload with this backend's model name, if it has one."""
+        return {**payload, "model": self.model} if self.model else payload
+
+
+def is_backend_failure(error):
+    """True if error means the backend is down (connection error, timeout, 5xx), not that the request was bad."""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, CircuitOpenError)):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code >= 500
+
+
+def parse_backends(spec):
+    """Parse LLM_BACKENDS: a JSON list of {url, model, weight, healthUrl} objects, or comma-separated URLs."""
+    spec = spec.strip()
+    if spec.startswith("["):
+        entries = json.loads(spec)
+    else:
+        entries = [{"url": url.strip()} for url in spec.split(",") if url.strip()]
+    for entry in entries:
+        if not entry.get("url"):
+            raise ValueError(f"LLM backend has no 'url': {entry}")
+    return entries
+
+
+class LLMRouter:
+    """Spread completion requests over several backends, with health checks and failover.
+
+    Backends are chosen by least outstanding requests (ties broken by weight) or by
+    smooth weighted round robin. A backend that fails a request after its own retries
+    with a connection error, timeout or 5xx is marked unhealthy and the request moves
+    to the next backend; other errors (e.g. a 4xx) are raised as they are. A background
+    thread probes every backend's /models endpoint and restores those that answer.
+    Exposes the same complete/stream/cache_payloads/close interface as LLMClient, and
+    reports the model each request was sent with in stats["model"].
+    """
+
+    def __init__(self, backends, strategy="least-outstanding", health_interval=15.0):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown routing strategy {strategy!r}; use one of {', '.join(ROUTING_STRATEGIES)}")
+        self.backends = backends
+        self.strategy = strategy
+        self.health_interval = health_interval
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        if health_interval > 0:
+            threading.Thread(target=self._health_loop, daemon=True).start()
+
+    @property
+    def retry_count(self):
+        return sum(backend.client.retry_count for backend in self.backends)
+
+    def cache_payloads(self, payload):
+        """payload as the backends would send it, one per distinct model, healthy backends first.
+
+        Backends may set their own model name, so a cached completion for payload is keyed by
+        the model that produced it; any of these payloads is a valid cache entry.
+        """
+        variants = {}
+        for backend in sorted(self.backends, key=lambda backend: not backend.healthy):
+            prepared = backend.prepare(payload)
+            variants.setdefault(prepared.get("model"), prepared)
+        return list(variants.values())
+
+    def _candidates(self):
+        """Healthy backends, or every backend when none is known to be healthy."""
+        healthy = [backend for backend in self.backends if backend.healthy]
+        return healthy or list(self.backends)
+
+    def _pick(self, exclude):
+        with self.lock:
+            candidates = [backend for backend in self._candidates() if backend not in exclude]
+            if not candidates:
+                return None
+            if self.strategy == "weighted-round-robin":
+                total = sum(backend.weight for backend in candidates)
+                for backend in candidates:
+                    backend.current_weight += backend.weight
+                chosen = max(candidates, key=lambda backend: backend.current_weight)
+                chosen.current_weight -= total
+            else:
+                chosen = min(candidates, key=lambda backend: (backend.outstanding / backend.weight, -backend.weight))
+            chosen.outstanding += 1
+            return chosen
+
+    def _release(self, backend, healthy):
+        with self.lock:
+            backend.outstanding -= 1
+            backend.healthy = healthy
+
+    def _failover(self, stats, tried, error):
+        print(f"LLM backend {tried[-1].url} failed ({error}); trying another backend...")
+        if stats is not None:
+            stats["retries"] = stats.get("retries", 0) + 1
+
+    def complete(self, payload, stats=None):
+        """Return the completion text for payload from the first backend that answers."""
+        tried = []
+        while True:
+            backend = self._pick(tried)
+            if backend is None:
+                raise error
+            tried.append(backend)
+            prepared = backend.prepare(payload)
+            if stats is not None:
+                stats["backend"] = backend.url
+                stats["model"] = prepared.get("model")
+            try:
+                text = backend.client.complete(prepared, stats=stats)
+            except requests.exceptions.RequestException as e:
+                if not is_backend_failure(e):
+                    self._release(backend, healthy=True)
+                    raise
+                self._release(backend, healthy=False)
+                error = e
+                self._failover(stats, tried, e)
+                continue
+            self._release(backend, healthy=True)
+            return text
+
+    def stream(self, payload, stats=None):
+        """Yield completion text deltas; fails over only until the first delta has been yielded."""
+        tried = []
+        while True:
+            backend = self._pick(tried)
+            if backend is None:
+                raise error
+            tried.append(backend)
+            prepared = backend.prepare(payload)
+            if stats is not None:
+                stats["backend"] = backend.url
+                stats["model"] = prepared.get("model")
+            started = False
+            try:
+                for text in backend.client.stream(prepared, stats=stats):
+                    started = True
+                    yield text
+            except requests.exceptions.RequestException as e:
+                failed = is_backend_failure(e)
+                self._release(backend, healthy=not failed)
+                if started or not failed:
+                    raise
+                error = e
+                self._failover(stats, tried, e)
+                continue
+            except BaseException:
+                # Consumer stopped early (GeneratorExit) or another error: not the backend's fault
+                self._release(backend, healthy=True)
+                raise
+            self._release(backend, healthy=True)
+            return
+
+    def check_health(self):
+        """Probe every backend once and update its health."""
+        for backend in self.backends:
+            try:
+                response = backend.client.session.get(backend.health_url, timeout=backend.client.timeout[0])
+                healthy = response.status_code < 500
+            except requests.exceptions.RequestException:
+                healthy = False
+            with self.lock:
+                if backend.healthy != healthy:
+                    print(f"LLM backend {backend.url} is {'healthy' if healthy else 'unhealthy'}.")
+                backend.healthy = healthy
+
+    def _health_loop(self):
+        while not self.stopped.wait(self.health_interval):
+            self.check_health()
+
+    def close(self):
+        self.stopped.set()
+        for backend in self.backends:
+            backend.client.close()
+
+
+def router_from_env():
+    """Build an LLMRouter from LLM_BACKENDS, LLM_ROUTING and LLM_HEALTH_INTERVAL."""
+    entries = parse_backends(os.environ["LLM_BACKENDS"])
+    # With somewhere to fail over to, give up on a single backend sooner
+    max_retries = int(os.getenv("LLM_BACKEND_MAX_RETRIES", "1")) if len(entries) > 1 else None
+    backends = [Backend(entry["url"], model=entry.get("model"), weight=entry.get("weight", 1),
+                        health_url=entry.get("healthUrl"), max_retries=max_retries) for entry in entries]
+    return LLMRouter(backends, strategy=os.getenv("LLM_ROUTING", "least-outstanding"),
+                     health_interval=float(os.getenv("LLM_HEALTH_INTERVAL", "15")))
@@ -0,0 +1,200 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the stage and LLM request duration histograms.
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Span:
+    """One timed pipeline stage and the attributes recorded while it ran."""
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.started = time.time()
+        self.duration = None
+        self.status = "ok"
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, key, amount):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def fail(self, error):
+        self.status = "error"
+        self.attributes["error"] = str(error)
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for position, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                self.buckets[position] += 1
+
+
+class Metrics:
+    """Aggregates finished spans and LLM calls; exports JSON log lines and Prometheus text.
+
+    log_file receives one JSON object per finished span ("-" for stderr).
+    prometheus_file is rewritten atomically by write_prometheus(), e.g. for the
+    node_exporter textfile collector.
+    """
+
+    def __init__(self, log_file=None, prometheus_file=None):
+        self.log_file = log_file
+        self.prometheus_file = prometheus_file
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.stages = {}
+        self.stage_errors = {}
+        self.llm_duration = _Histogram()
+        self.counters = {"llm_requests": 0, "llm_errors": 0, "llm_cache_hits": 0, "llm_retries": 0,
+                         "prompt_tokens": 0, "completion_tokens": 0}
+        self.last_tokens_per_second = 0.0
+
+    def record_span(self, span):
+        with self.lock:
+            self.stages.setdefault(span.name, _Histogram()).observe(span.duration)
+            if span.status != "ok":
+                self.stage_errors[span.name] = self.stage_errors.get(span.name, 0) + 1
+            if self.log_file:
+                record = {"time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(span.started)), "span": span.name,
+                          "durationSeconds": round(span.duration, 6), "status": span.status, **span.attributes}
+                line = json.dumps(record, ensure_ascii=False) + "\n"
+                if self.log_file == "-":
+                    sys.stderr.write(line)
+                else:
+                    with open(self.log_file, "a", encoding="utf-8") as file:
+                        file.write(line)
+
+    def record_llm(self, prompt_tokens, completion_tokens, retries, seconds, error=False):
+        with self.lock:
+            self.llm_duration.observe(seconds)
+            self.counters["llm_requests"] += 1
+            self.counters["llm_errors"] += int(error)
+            self.counters["llm_retries"] += retries
+            self.counters["prompt_tokens"] += prompt_tokens
+            self.counters["completion_tokens"] += completion_tokens
+            if completion_tokens and seconds > 0:
+                self.last_tokens_per_second = completion_tokens / seconds
+
+    def record_cache_hit(self):
+        with self.lock:
+            self.counters["llm_cache_hits"] += 1
+
+    def render_prometheus(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def histogram(name, values, labels=""):
+            for bound, count in zip(DURATION_BUCKETS, values.buckets):
+                lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels}le="+Inf"}} {values.count}')
+            suffix = f"{{{labels.rstrip(',')}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {values.sum:.6f}")
+            lines.append(f"{name}_count{suffix} {values.count}")
+
+        with self.lock:
+            lines.append("# HELP paste_stage_duration_seconds Duration of paste.py pipeline stages.")
+            lines.append("# TYPE paste_stage_duration_seconds histogram")
+            for stage, values in sorted(self.stages.items()):
+                histogram("paste_stage_duration_seconds", values, f'stage="{stage}",')
+            lines.append("# HELP paste_stage_errors_total Pipeline stages that failed.")
+            lines.append("# TYPE paste_stage_errors_total counter")
+            for stage, count in sorted(self.stage_errors.items()):
+                lines.append(f'paste_stage_errors_total{{stage="{stage}"}} {count}')
+            lines.append("# HELP paste_llm_request_duration_seconds LLM round-trip time, including retries.")
+            lines.append("# TYPE paste_llm_request_duration_seconds histogram")
+            histogram("paste_llm_request_duration_seconds", self.llm_duration)
+            for counter, help_text in [
+                ("llm_requests", "LLM requests sent."),
+                ("llm_errors", "LLM requests that failed after all retries."),
+                ("llm_cache_hits", "Completions served from the response cache."),
+                ("llm_retries", "LLM request retries."),
+                ("prompt_tokens", "Prompt tokens sent to the LLM."),
+                ("completion_tokens", "Completion tokens received from the LLM."),
+            ]:
+                lines.append(f"# HELP paste_{counter}_total {help_text}")
+                lines.append(f"# TYPE paste_{counter}_total counter")
+                lines.append(f"paste_{counter}_total {self.counters[counter]}")
+            lines.append("# HELP paste_llm_tokens_per_second Completion tokens per second of the latest LLM request.")
+            lines.append("# TYPE paste_llm_tokens_per_second gauge")
+            lines.append(f"paste_llm_tokens_per_second {self.last_tokens_per_second:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self):
+        """Rewrite prometheus_file, if one is configured."""
+        if not self.prometheus_file:
+            return
+        with self.write_lock:
+            temporary_file = f"{self.prometheus_file}.tmp"
+            with open(temporary_file, "w", encoding="utf-8") as file:
+                file.write(self.render_prometheus())
+            os.replace(temporary_file, self.prometheus_file)
+
+
+_metrics = Metrics(log_file=os.getenv("METRICS_LOG_FILE"), prometheus_file=os.getenv("METRICS_PROM_FILE"))
+_local = threading.local()
+
+
+def get_metrics():
+    """Return the process-wide Metrics."""
+    return _metrics
+
+
+def configure_metrics(log_file=None, prometheus_file=None):
+    """Set where span logs and Prometheus metrics are written; None keeps the current setting."""
+    if log_file is not None:
+        _metrics.log_file = log_file
+    if prometheus_file is not None:
+        _metrics.prometheus_file = prometheus_file
+
+
+def current_span():
+    """Return the innermost open span on this thread, or None."""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time a pipeline stage. Exceptions mark the span as failed and propagate."""
+    current = Span(name, attributes)
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.fail(e)
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        stack.pop()
+        _metrics.record_span(current)
+
+
+def record_llm_call(prompt_tokens, completion_tokens, retries, seconds, error=False):
+    """Record one LLM round-trip and add its token counts to the enclosing span."""
+    _metrics.record_llm(prompt_tokens, completion_tokens, retries, seconds, error)
+    enclosing = current_span()
+    if enclosing is not None:
+        enclosing.add("promptTokens", prompt_tokens)
+        enclosing.add("completionTokens", completion_tokens)
+        enclosing.add("retries", retries)
+        enclosing.add("llmSeconds", round(seconds, 6))
+        if enclosing.attributes["llmSeconds"] > 0:
+            enclosing.set(tokensPerSecond=round(enclosing.attributes["completionTokens"]
+                                                / enclosing.attributes["llmSeconds"], 3))
@@ -2,143 +2,801 @@ import requests
 import json
 import sys
 import os
+import argparse
+import re
+import socketserver
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from itertools import groupby, islice
 
-# Fixed URL for LLM API
-LLM_API_URL = os.getenv("LLM_API_URL", "http://10.21.19.17:1234/v1/completions")
+from batch import load_manifest, run_batch
+from case_dedupe import DedupeIndex, TestSuite
+from case_parser import (HEADING_RE, TEST_CASES_SCHEMA, IncrementalTestCaseParser, format_test_cases_as_text,
+                         parse_test_cases, parse_test_cases_json)
+from case_store import CaseStore
+from figma_stream import iter_figma_frames
+from element_classifier import dedupe_names, get_classifier
+from generation_control import (EARLY_STOP, STOP_SEQUENCES, CaseCounter, max_tokens_for, target_case_count,
+                                trim_to_last_case)
+from frame_manifest import FrameManifest, fingerprint_frame, frame_keys
+from llm_cache import ResponseCache, answered_payload, lookup
+from llm_client import get_llm_client
+from metrics import configure_metrics, current_span, get_metrics, record_llm_call, span
+from prompt_builder import (PROMPT_VERSION, count_tokens, fit_processed_data, load_prompt_template, render_prompt,
+                            select_srs)
 
 def load_figma_data(json_file_path):
     """Load Figma data from a JSON file."""
-    try:
-        with open(json_file_path, 'r', encoding="utf-8") as file:
-            return json.load(file)
-    except Exception as e:
-        print(f"Error loading Figma data: {e}")
-        return None
+    with span("load_figma_data", file=json_file_path) as stage:
+        try:
+            with open(json_file_path, 'r', encoding="utf-8") as file:
+                return json.load(file)
+        except Exception as e:
+            stage.fail(e)
+            print(f"Error loading Figma data: {e}")
+            return None
+
+def new_processed_data():
+    """Return an empty processed_data dict with a list per screen and element category."""
+    processed_data = {"screens": [], "inputs": [], "buttons": []}
+    for key in get_classifier().keys:
+        processed_data.setdefault(key, [])
+    return processed_data
+
+def frame_screen_name(frame):
+    """The screen name of a frame, or None for unnamed and default-named ("Frame") frames."""
+    frame_name = frame.get("frame", "").strip()
+    return frame_name if frame_name and frame_name.lower() != "frame" else None
+
+def process_frame(frame, processed_data):
+    """Add the screen and classified elements of a single frame to processed_data."""
+    frame_name = frame_screen_name(frame)
+    if frame_name:
+        processed_data["screens"].append(frame_name)
+
+    get_classifier().collect(frame.get("elements", []), processed_data)
+
+def dedupe_processed_data(processed_data):
+    """Remove repeated component names from every element category in place."""
+    for key in get_classifier().keys:
+        processed_data[key] = dedupe_names(processed_data[key])
+    return processed_data
 
 def process_figma_data(data):
     """Extract relevant information for test case generation."""
-    processed_data = {"screens": [], "inputs": [], "buttons": []}
-    
+    with span("process_figma_data") as stage:
+        processed_data = new_processed_data()
+
+        for page in data.get("pages", []):
+            for frame in page.get("frames", []):
+                process_frame(frame, processed_data)
+
+        stage.set(screens=len(processed_data["screens"]))
+        return dedupe_processed_data(processed_data)
+
+def stream_figma_data(json_file_path):
+    """Yield processed screens, inputs and buttons page-by-page while parsing the file.
+
+    Unlike load_figma_data + process_figma_data, only one frame is held in memory at a time.
+    """
+    for page_name, frames in groupby(iter_figma_frames(json_file_path), key=lambda item: item[0]):
+        page_data = {"page": page_name, **new_processed_data()}
+        for _, frame in frames:
+            process_frame(frame, page_data)
+        yield page_data
+
+def iter_data_frames(data):
+    """Yield (page_name, frame) pairs from already loaded Figma data."""
     for page in data.get("pages", []):
         for frame in page.get("frames", []):
-            frame_name = frame.get("frame", "").strip()
-            if frame_name and frame_name.lower() != "frame":
-                processed_data["screens"].append(frame_name)
+            yield page.get("page", ""), frame
 
-            for element in frame.get("elements", []):
-                element_name = element.get("name", "").strip().lower()
-                if "input" in element_name:
-                    processed_data["inputs"].append(element.get("name", "Unnamed Input Field"))
-                if "button" in element_name:
-                    processed_data["buttons"].append(element.get("name", "Unnamed Button"))
+def iter_frames(json_file_path, stream=False):
+    """Yield (page_name, frame) pairs from a Figma export, loading it whole unless stream is set."""
+    if stream:
+        yield from iter_figma_frames(json_file_path)
+        return
+    with open(json_file_path, 'r', encoding="utf-8") as file:
+        data = json.load(file)
+    yield from iter_data_frames(data)
 
-    return processed_data
+def shard_frames(frames, shard_by="screen", shard_size=1):
+    """Group (page_name, frame) pairs into processed_data shards, one per page or per shard_size screens."""
+    if shard_by == "page":
+        groups = (group for _, group in groupby(frames, key=lambda item: item[0]))
+    else:
+        groups = iter(lambda: list(islice(frames, shard_size)), [])
+
+    shards = []
+    for group in groups:
+        shard = new_processed_data()
+        for _, frame in group:
+            process_frame(frame, shard)
+        if any(shard.values()):
+            shards.append(dedupe_processed_data(shard))
+    return shards
+
+def build_shards(json_file_path, shard_by="screen", shard_size=1, stream=False):
+    """Split a Figma export into processed_data shards, one per page or per shard_size screens."""
+    with span("process_figma_data", shard=shard_by, stream=stream) as stage:
+        try:
+            shards = shard_frames(iter_frames(json_file_path, stream=stream), shard_by, shard_size)
+        except (OSError, ValueError) as e:
+            stage.fail(e)
+            print(f"Error loading Figma data: {e}")
+            return None
+        stage.set(shards=len(shards))
+        return shards
+
+def load_and_process_figma_data(json_file_path, stream=False):
+    """Return processed_data for a Figma export, optionally using streaming ingestion."""
+    if not stream:
+        figma_data = load_figma_data(json_file_path)
+        return process_figma_data(figma_data) if figma_data else None
+
+    with span("process_figma_data", stream=True) as stage:
+        processed_data = new_processed_data()
+        try:
+            for page_data in stream_figma_data(json_file_path):
+                for key in processed_data:
+                    processed_data[key].extend(page_data[key])
+        except (OSError, ValueError) as e:
+            stage.fail(e)
+            print(f"Error loading Figma data: {e}")
+            return None
+        stage.set(screens=len(processed_data["screens"]))
+        return dedupe_processed_data(processed_data)
+
+def format_extra_elements(processed_data):
+    """Render prompt lines for element categories beyond inputs and buttons that are present."""
+    classifier = get_classifier()
+    return "".join(f"\n- **{classifier.labels[key]}**: {', '.join(processed_data[key])}"
+                   for key in classifier.keys if key not in ("inputs", "buttons") and processed_data.get(key))
+
+def build_prompt(processed_data, srs_description, version=PROMPT_VERSION):
+    """Build the test case generation prompt from the versioned template in prompts/."""
+    return render_prompt(load_prompt_template(version), {
+        "case_count": target_case_count(processed_data),
+        "srs_description": srs_description,
+        "screens": ", ".join(processed_data['screens']),
+        "inputs": ", ".join(processed_data['inputs']),
+        "buttons": ", ".join(processed_data['buttons']),
+        "extra_elements": format_extra_elements(processed_data),
+    })
+
+def record_llm_usage(payload, text, stats, seconds, error=False):
+    """Record metrics for one LLM call, preferring the token counts reported by the server."""
+    usage = stats.get("usage") or {}
+    record_llm_call(usage.get("prompt_tokens", count_tokens(payload["prompt"])),
+                    usage.get("completion_tokens", count_tokens(text)),
+                    stats.get("retries", 0), seconds, error)
+    stage = current_span()
+    if stage is not None and stats.get("backend"):
+        stage.set(backend=stats["backend"])
 
-def generate_playwright_test_cases(processed_data, srs_description):
-    """Generate test cases using LLM."""
-    prompt = f"""
-    You are a QA automation expert. Based on the given Software Requirements Specification (SRS) and Figma design data, generate Playwright test cases in the following structured **text format**:
-
-    Test Case: <Test Case Name>
-    Steps:
-    1. <Step 1>
-    2. <Step 2>
-    3. <Step 3>
-    Expected Result: <Expected Result>
-
-    ## **Project Information**
-    - **SRS Description**: {srs_description}
-    - **Screens**: {processed_data['screens']}
-    - **Input Fields**: {processed_data['inputs']}
-    - **Buttons**: {processed_data['buttons']}
-
-    ## **Guidelines for Test Case Generation**
-    1. **Ensure Clarity**: Use a clear and precise step-by-step structure.
-    2. **Include Page Navigation**: Mention the screen name where each action is performed.
-    3. **Identify UI Elements**: Use actual names (e.g., "Sign Up Button", "Email Input Field").
-    4. **Test for Positive & Negative Cases**:
-       - **Positive**: Successful user actions (e.g., valid login, successful form submission).
-       - **Negative**: Error scenarios (e.g., invalid inputs, missing fields).
-    5. **Expected Results**:
-       - Specify visible UI changes (e.g., "User should see a success message").
-       - Mention redirections (e.g., "User should be redirected to the dashboard").
-       - Cover error handling (e.g., "User should see an error message").
-
-    ## **Example Test Cases**
-    
-    Test Case: Successful User Login
-    Steps:
-    1. Go to 'Login Page'.
-    2. Enter a valid email and password.
-    3. Click on 'Login' button.
-    Expected Result: User should be redirected to the dashboard.
-
-    Test Case: Login Failure - Invalid Password
-    Steps:
-    1. Go to 'Login Page'.
-    2. Enter a valid email and an incorrect password.
-    3. Click on 'Login' button.
-    Expected Result: User should see an error message indicating incorrect credentials.
-
-    **Now generate at least 10 relevant test cases in the above text format.**
+def record_cache_hit():
+    """Count a response cache hit and mark the enclosing span as cached."""
+    get_metrics().record_cache_hit()
+    stage = current_span()
+    if stage is not None:
+        stage.set(cached=True)
+
+def request_completion(payload, cache=None):
+    """Send a completion request to the LLM, consulting the response cache first."""
+    if cache is not None:
+        cached = lookup(cache, get_llm_client(), payload)
+        if cached is not None:
+            print(" Using cached LLM response.")
+            record_cache_hit()
+            return cached
+
+    stats = {}
+    started = time.perf_counter()
+    try:
+        text = get_llm_client().complete(payload, stats=stats)
+    except requests.exceptions.RequestException as e:
+        print(f"Error contacting LLM: {e}")
+        record_llm_usage(payload, "", stats, time.perf_counter() - started, error=True)
+        return ""
+    record_llm_usage(payload, text, stats, time.perf_counter() - started)
+
+    if cache is not None:
+        cache.put(answered_payload(payload, stats), text)
+    return text
+
+STRUCTURED_OUTPUT_INSTRUCTIONS = f"""
+**Return the test cases as a JSON array only, with no other text. It must match this JSON schema:**
+{json.dumps(TEST_CASES_SCHEMA)}
+"""
+
+def build_budgeted_prompt(processed_data, srs_description, budget):
+    """Build a prompt of at most budget tokens.
+
+    Element lists are trimmed first if they alone exceed the budget; the remaining
+    tokens go to the SRS chunks most relevant to this request's screens and elements.
     """
+    processed_data = fit_processed_data(processed_data, budget,
+                                        lambda data: count_tokens(build_prompt(data, "")))
+    srs_budget = budget - count_tokens(build_prompt(processed_data, ""))
+    return build_prompt(processed_data, select_srs(srs_description, processed_data, srs_budget))
 
+def build_payload(processed_data, srs_description, structured=False, prompt_budget=None):
+    """Build the completions request payload."""
+    if prompt_budget:
+        prompt = build_budgeted_prompt(processed_data, srs_description, prompt_budget)
+    else:
+        prompt = build_prompt(processed_data, srs_description)
     payload = {
         "model": "mistral-nemo-instruct-2407",
         "prompt": prompt,
-        "max_tokens": 4000,
+        # Sized to the number of cases requested instead of a flat 4000
+        "max_tokens": max_tokens_for(target_case_count(processed_data), structured),
         "temperature": 0.7
     }
+    if not structured:
+        payload["stop"] = STOP_SEQUENCES
+    if structured:
+        payload["prompt"] += STRUCTURED_OUTPUT_INSTRUCTIONS
+        payload["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": "test_cases", "strict": True, "schema": TEST_CASES_SCHEMA}
+        }
+    return payload
 
+def structured_output_to_text(text_output):
+    """Validate a structured-output completion and render it in the plain text format."""
     try:
-        response = requests.post(LLM_API_URL, json=payload)
-        response.raise_for_status()
-        return response.json().get("choices", [{}])[0].get("text", "")
-    except requests.exceptions.RequestException as e:
-        print(f"Error contacting LLM: {e}")
-        return ""
+        return format_test_cases_as_text(parse_test_cases_json(text_output))
+    except ValueError as e:
+        print(f"Error parsing structured LLM output: {e}")
+        return text_output
 
-def save_test_cases_as_text(test_cases):
-    """Save test cases as a plain text file."""
+def generate_playwright_test_cases(processed_data, srs_description, cache=None, structured=False, prompt_budget=None):
+    """Generate test cases using LLM.
+
+    Plain-text generation is streamed so it can stop at the target case count (see
+    stream_playwright_test_cases) unless LLM_EARLY_STOP=0.
+    """
+    if EARLY_STOP and not structured:
+        result = {}
+        text_output = stream_playwright_test_cases(processed_data, srs_description, cache=cache,
+                                                   prompt_budget=prompt_budget, result=result)
+        # Like request_completion, report a failed request as empty output rather than a truncated
+        # completion, so callers such as the --incremental manifest do not record it as final.
+        return "" if result["error"] else text_output
+    with span("generate_playwright_test_cases", structured=structured):
+        payload = build_payload(processed_data, srs_description, structured, prompt_budget)
+        text_output = request_completion(payload, cache=cache)
+        return structured_output_to_text(text_output) if structured and text_output else text_output
+
+def stream_playwright_test_cases(processed_data, srs_description, cache=None, on_test_case=None, prompt_budget=None,
+                                 result=None):
+    """Generate test cases with a streamed completion, reporting each case as soon as it is parsed.
+
+    on_test_case is called with every finished {testCase, steps, expectedResult} dict while
+    generation is still running. Once target_case_count() distinct, well-formed cases have
+    been parsed the request is cancelled (unless LLM_EARLY_STOP=0), freeing the server slot,
+    and the text is cut after the last complete case. Returns the completion text; if the
+    stream fails part way, that is the text received so far, result["error"] is set and
+    nothing is cached.
+    """
+    result = {} if result is None else result
+    result["error"] = False
+    with span("generate_playwright_test_cases", stream=True) as stage:
+        payload = build_payload(processed_data, srs_description, prompt_budget=prompt_budget)
+        target = target_case_count(processed_data)
+        counter = CaseCounter()
+        stage.set(targetCases=target, maxTokens=payload["max_tokens"])
+        parser = IncrementalTestCaseParser()
+        on_test_case = on_test_case or (lambda test_case: None)
+
+        cached = lookup(cache, get_llm_client(), payload) if cache is not None else None
+        if cached is not None:
+            print(" Using cached LLM response.")
+            record_cache_hit()
+            for test_case in parser.feed(cached) + parser.close():
+                on_test_case(test_case)
+            return cached
+
+        chunks = []
+        stats = {}
+        stopped = False
+        started = time.perf_counter()
+        completion = get_llm_client().stream(payload, stats=stats)
+        try:
+            for chunk in completion:
+                chunks.append(chunk)
+                for test_case in parser.feed(chunk):
+                    on_test_case(test_case)
+                    counter.add(test_case)
+                if EARLY_STOP and counter.count >= target:
+                    stopped = True
+                    break
+            error = False
+        except requests.exceptions.RequestException as e:
+            print(f"Error contacting LLM: {e}")
+            error = True
+        finally:
+            # Closing the stream drops the connection, which cancels generation on the server
+            completion.close()
+        record_llm_usage(payload, "".join(chunks), stats, time.perf_counter() - started, error=error)
+        result["error"] = error
+
+        text = "".join(chunks)
+        if stopped:
+            print(f" Stopped generation after {counter.count} distinct test cases.")
+            text = trim_to_last_case(text)
+        elif not error:
+            # After a failed stream the last buffered case is cut off, so it is not reported
+            for test_case in parser.close():
+                on_test_case(test_case)
+                counter.add(test_case)
+        stage.set(distinctCases=counter.count, earlyStop=stopped)
+        if cache is not None and text and not error:
+            cache.put(answered_payload(payload, stats), text)
+        return text
+
+def append_jsonl(file, record):
+    """Write one record as a JSON line and flush it so readers see it immediately."""
+    file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    file.flush()
+
+def split_test_case_blocks(text_output):
+    """Split raw LLM output into one text block per "Test Case:" heading."""
+    starts = [match.start() for match in re.finditer("^" + HEADING_RE.pattern, text_output, re.MULTILINE | re.IGNORECASE)]
+    return [text_output[start:end].strip() for start, end in zip(starts, starts[1:] + [len(text_output)])]
+
+def merge_test_case_texts(text_outputs):
+    """Concatenate test case blocks from several completions, dropping duplicates."""
+    seen = set()
+    merged = []
+    for text_output in text_outputs:
+        for block in split_test_case_blocks(text_output):
+            fingerprint = re.sub(r"[\W_]+", " ", block.lower()).strip()
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                merged.append(block)
+    return "\n\n".join(merged)
+
+def generate_sharded_test_cases(shards, srs_description, workers=4, cache=None, structured=False,
+                                prompt_budget=None):
+    """Generate test cases for each shard concurrently and merge the de-duplicated results."""
+    print(f" Generating test cases for {len(shards)} shards with {workers} workers...")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        text_outputs = list(executor.map(
+            lambda shard: generate_playwright_test_cases(shard, srs_description, cache=cache, structured=structured,
+                                                         prompt_budget=prompt_budget),
+            shards))
+    return merge_test_case_texts(text_outputs)
+
+def generate_incremental_test_cases(figma_data_file, srs_description, manifest_file, workers=4, cache=None,
+                                    structured=False, stream=False, prompt_budget=None, screens=None):
+    """Prompt the LLM only for frames whose content changed since the last run.
+
+    Unchanged frames reuse the test cases stored in the frame manifest. If screens is
+    a list, the screen name of every frame, changed or not, is appended to it. Returns
+    the merged text, or None if the Figma data could not be loaded.
+    """
+    manifest = FrameManifest(manifest_file)
+    manifest.set_context(srs_description, structured, prompt_budget, PROMPT_VERSION)
+
+    entries = {}
+    changed = []
     try:
-        with open("test_cases.txt", 'w', encoding="utf-8") as file:
-            file.write(test_cases)
-        print(" Test cases saved successfully as 'test_cases.txt'.")
-    except Exception as e:
-        print(f"Error saving test cases: {e}")
+        for key, frame in frame_keys(iter_frames(figma_data_file, stream=stream)):
+            screen = frame_screen_name(frame)
+            if screens is not None and screen:
+                screens.append(screen)
+            fingerprint = fingerprint_frame(frame)
+            stored = manifest.lookup(key, fingerprint)
+            if stored is not None:
+                entries[key] = {"fingerprint": fingerprint, "testCases": stored}
+                continue
+            shard = new_processed_data()
+            process_frame(frame, shard)
+            dedupe_processed_data(shard)
+            entries[key] = {"fingerprint": fingerprint, "testCases": ""}
+            if any(shard.values()):
+                changed.append((key, shard))
+    except (OSError, ValueError) as e:
+        print(f"Error loading Figma data: {e}")
+        return None
+
+    print(f" Reusing {len(entries) - len(changed)} unchanged frames, regenerating {len(changed)} changed frames...")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        text_outputs = list(executor.map(
+            lambda item: generate_playwright_test_cases(item[1], srs_description, cache=cache, structured=structured,
+                                                        prompt_budget=prompt_budget),
+            changed))
+    for (key, _), text_output in zip(changed, text_outputs):
+        if text_output:
+            entries[key]["testCases"] = text_output
+        else:
+            # Leave failed frames out of the manifest so the next run retries them.
+            del entries[key]
+
+    try:
+        manifest.save(entries)
+    except OSError as e:
+        print(f"Error saving frame manifest: {e}")
+    return merge_test_case_texts(entry["testCases"] for entry in entries.values())
+
+def dedupe_test_cases_stage(test_cases):
+    """Return test_cases without exact and near-duplicates."""
+    with span("dedupe_test_cases") as stage:
+        if not test_cases:
+            return test_cases
+        index = DedupeIndex()
+        unique = [test_case for test_case in test_cases if index.add(test_case)[0] == "new"]
+        stage.set(cases=len(test_cases), unique=len(unique))
+        print(f" De-duplicated {len(test_cases)} test cases to {len(unique)}.")
+        return unique
+
+def merge_into_suite(test_cases, suite):
+    """Merge test_cases into a TestSuite, save it and return the whole suite."""
+    with span("merge_test_suite", file=suite.suite_file) as stage:
+        counts = suite.merge(test_cases)
+        try:
+            suite.save()
+        except OSError as e:
+            stage.fail(e)
+            print(f"Error saving test suite: {e}")
+        merged = suite.test_cases()
+        stage.set(suiteCases=len(merged), newCases=counts["new"])
+        print(f" Test suite '{suite.suite_file}': {counts['new']} new cases, {len(merged)} in total.")
+        return merged
+
+def store_test_cases(test_cases, store_file, project, screens=(), source=None):
+    """Append one run's test cases to the case store; returns the run id, or None on error."""
+    with span("store_test_cases", file=store_file, project=project) as stage:
+        store = None
+        try:
+            store = CaseStore(store_file)
+            run_id = store.add_run(project, test_cases, known_screens=screens, source=source,
+                                   settings={"promptVersion": PROMPT_VERSION})
+        except sqlite3.Error as e:
+            stage.fail(e)
+            print(f"Error saving test cases to the store: {e}")
+            return None
+        finally:
+            if store is not None:
+                store.close()
+        stage.set(run=run_id, cases=len(test_cases))
+        print(f" Stored {len(test_cases)} test cases as run {run_id} of '{project}' in '{store_file}'.")
+        return run_id
+
+def save_test_cases_as_text(test_cases, output_file="test_cases.txt"):
+    """Save test cases as a plain text file."""
+    with span("save_test_cases_as_text", file=output_file) as stage:
+        try:
+            with open(output_file, 'w', encoding="utf-8") as file:
+                file.write(test_cases)
+            print(f" Test cases saved successfully as '{output_file}'.")
+        except Exception as e:
+            stage.fail(e)
+            print(f"Error saving test cases: {e}")
+
+DEFAULT_SRS_SUMMARY_FILE = os.getenv(
+    "SRS_SUMMARY_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataintext", "summary.txt"))
+
+def read_srs_summary(srs_summary_file):
+    """Read the SRS summary text."""
+    with open(srs_summary_file, "r", encoding="utf-8") as file:
+        return file.read().strip()
+
+def run_pipeline(figma_data_file, srs_description, args, cache=None, output_file="test_cases.txt",
+                 jsonl_file=None, manifest_file=None, suite_file=None, project=None):
+    """Generate and save test cases for one Figma export.
+
+    Returns the generated text, or None if the Figma data could not be loaded.
+    """
+    screens = []
+    if args.incremental:
+        # Only send new or changed frames to the LLM
+        text_output = generate_incremental_test_cases(
+            figma_data_file, srs_description, manifest_file or args.manifest, workers=max(args.workers, 1),
+            cache=cache, structured=args.structured_output, stream=args.stream, prompt_budget=args.prompt_budget,
+            screens=screens)
+        if text_output is None:
+            return None
+    elif args.shard:
+        # Load Figma data as shards and generate test cases for each concurrently
+        shards = build_shards(figma_data_file, shard_by=args.shard, shard_size=max(args.shard_size, 1),
+                              stream=args.stream)
+        if not shards:
+            return None
+        screens = [screen for shard in shards for screen in shard["screens"]]
+        text_output = generate_sharded_test_cases(shards, srs_description, workers=max(args.workers, 1),
+                                                  cache=cache, structured=args.structured_output,
+                                                  prompt_budget=args.prompt_budget)
+    else:
+        # Load and process Figma data
+        processed_data = load_and_process_figma_data(figma_data_file, stream=args.stream)
+        if not processed_data:
+            return None
+        screens = processed_data["screens"]
+
+        # Generate test cases from LLM
+        if args.stream_completions:
+            jsonl_file = jsonl_file or args.jsonl
+            index = DedupeIndex()
+            with open(jsonl_file, 'w', encoding="utf-8") as file:
+                def on_test_case(test_case):
+                    # Duplicates are dropped as they stream in, before they reach the JSONL file
+                    if args.no_dedupe or index.add(test_case)[0] == "new":
+                        append_jsonl(file, test_case)
+                text_output = stream_playwright_test_cases(
+                    processed_data, srs_description, cache=cache,
+                    on_test_case=on_test_case, prompt_budget=args.prompt_budget)
+            print(f" Streamed test cases saved to '{jsonl_file}'.")
+        else:
+            text_output = generate_playwright_test_cases(processed_data, srs_description, cache=cache,
+                                                         structured=args.structured_output,
+                                                         prompt_budget=args.prompt_budget)
+
+    test_cases = parse_test_cases(text_output or "")
+    if test_cases:
+        if not args.no_dedupe:
+            test_cases = dedupe_test_cases_stage(test_cases)
+        if args.store and not args.no_store:
+            store_test_cases(test_cases, args.store, project or args.project or figma_project_name(figma_data_file),
+                             screens=screens, source=figma_data_file)
+        suite_file = suite_file or args.suite
+        if not args.no_dedupe and suite_file:
+            test_cases = merge_into_suite(test_cases, TestSuite(suite_file))
+        if not args.no_dedupe:
+            text_output = format_test_cases_as_text(test_cases)
+
+    # Save test cases as a plain text file
+    save_test_cases_as_text(text_output, output_file)
+    return text_output
+
+def figma_project_name(figma_data_file):
+    """Default case store project for a Figma export: its file name without the extension."""
+    return os.path.splitext(os.path.basename(figma_data_file))[0]
+
+def run_batch_job(job, job_output_dir, args, cache=None):
+    """Run the pipeline for one batch manifest entry, writing its outputs to job_output_dir."""
+    if not job["srs"]:
+        raise ValueError("No SRS summary file for job")
+    text_output = run_pipeline(job["figma"], read_srs_summary(job["srs"]), args, cache=cache,
+                               output_file=os.path.join(job_output_dir, "test_cases.txt"),
+                               jsonl_file=os.path.join(job_output_dir, "test_cases.jsonl"),
+                               manifest_file=os.path.join(job_output_dir, "frame_manifest.json"),
+                               suite_file=args.suite and os.path.join(job_output_dir, "test_suite.json"),
+                               project=args.project or job["id"])
+    if text_output is None:
+        raise ValueError("Failed to load Figma data")
+    return {"testCases": len(split_test_case_blocks(text_output))}
+
+def handle_worker_request(request, cache, emit):
+    """Generate test cases for one worker request, emitting a testCase event per distinct parsed case.
+
+    The request carries the Figma data ({"pages": [...]}) and SRS text inline, plus
+    optional "options": shard, shardSize, workers, structured, promptBudget and
+    stream (stream the completion so cases are emitted while it is generated).
+    Raises RuntimeError if a streamed completion fails part way; testCase events
+    already emitted for it are not followed by a done event.
+    """
+    options = request.get("options") or {}
+    figma_data = request.get("figma") or {}
+    srs_description = request.get("srs") or ""
+    structured = bool(options.get("structured"))
+    prompt_budget = options.get("promptBudget")
+    index = DedupeIndex()
+
+    def emit_test_case(test_case):
+        if index.add(test_case)[0] == "new":
+            emit({"event": "testCase", "testCase": test_case})
+
+    if options.get("shard"):
+        shards = shard_frames(iter_data_frames(figma_data), options["shard"], max(int(options.get("shardSize", 1)), 1))
+        text_output = generate_sharded_test_cases(shards, srs_description, workers=max(int(options.get("workers", 4)), 1),
+                                                  cache=cache, structured=structured, prompt_budget=prompt_budget)
+    elif options.get("stream") and not structured:
+        result = {}
+        text_output = stream_playwright_test_cases(process_figma_data(figma_data), srs_description, cache=cache,
+                                                   on_test_case=emit_test_case, prompt_budget=prompt_budget,
+                                                   result=result)
+        if result["error"]:
+            # Report an error rather than done, so callers do not store the truncated suite as complete
+            raise RuntimeError(f"LLM stream failed after {len(text_output)} characters; the output is incomplete")
+        return text_output
+    else:
+        text_output = generate_playwright_test_cases(process_figma_data(figma_data), srs_description, cache=cache,
+                                                     structured=structured, prompt_budget=prompt_budget)
+    for test_case in parse_test_cases(text_output):
+        emit_test_case(test_case)
+    return text_output
+
+def serve_requests(lines, write, cache=None, workers=4):
+    """Answer JSON-line requests read from lines, writing JSON-line events with write().
+
+    Each request is {"id": ..., "figma": {...}, "srs": "...", "options": {...}} and
+    produces testCase events followed by a done (or error) event with the same id.
+    Requests are processed concurrently on a bounded pool.
+    """
+    write_lock = threading.Lock()
+
+    def send(event):
+        with write_lock:
+            write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def handle(request, received):
+        request_id = request.get("id")
+        started = time.perf_counter()
+        emit = lambda event: send({"id": request_id, **event})
+        try:
+            # queueSeconds is how long the request waited for a free worker thread
+            with span("worker_request", queueSeconds=round(started - received, 6)):
+                text_output = handle_worker_request(request, cache, emit)
+            emit({"event": "done", "text": text_output, "seconds": round(time.perf_counter() - started, 3)})
+        except Exception as e:
+            emit({"event": "error", "error": str(e)})
+        get_metrics().write_prometheus()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                send({"id": None, "event": "error", "error": f"Invalid request: {e}"})
+                continue
+            executor.submit(handle, request, time.perf_counter())
+
+def serve_stdio(cache=None, workers=4):
+    """Run as a resident worker speaking JSON lines over stdin/stdout.
+
+    Log output from the pipeline is redirected to stderr so stdout carries only events.
+    """
+    protocol = sys.stdout
+
+    def write(data):
+        protocol.write(data)
+        protocol.flush()
+
+    with redirect_stdout(sys.stderr):
+        print(" Worker ready on stdin/stdout.")
+        write(json.dumps({"id": None, "event": "ready"}) + "\n")
+        serve_requests(sys.stdin, write, cache=cache, workers=workers)
+
+def serve_tcp(host, port, cache=None, workers=4):
+    """Run as a resident worker accepting JSON-line connections on a local socket."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            lines = (line.decode("utf-8") for line in self.rfile)
+            serve_requests(lines, lambda data: self.wfile.write(data.encode("utf-8")), cache=cache, workers=workers)
+
+    class Server(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+
+    with redirect_stdout(sys.stderr), Server((host, port), Handler) as server:
+        print(f" Worker listening on {host}:{port}.")
+        server.serve_forever()
+
+def parse_args(argv=None):
+    """Parse command line arguments for the generation pipeline."""
+    parser = argparse.ArgumentParser(description="Generate Playwright test cases from Figma data and an SRS summary.")
+    parser.add_argument("figma_data_file", nargs="?", help="Figma data exported by temp.mjs")
+    parser.add_argument("srs_summary_file", nargs="?", default=DEFAULT_SRS_SUMMARY_FILE,
+                        help="SRS summary written by the server's /upload pipeline (default: SRS_SUMMARY_FILE "
+                             "or dataintext/summary.txt next to this script)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse the Figma file incrementally instead of loading it whole")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the on-disk LLM response cache")
+    parser.add_argument("--shard", choices=["screen", "page"],
+                        help="Prompt the LLM once per screen group or per page instead of once for the whole design")
+    parser.add_argument("--shard-size", type=int, default=1,
+                        help="Screens per shard when sharding by screen (default: 1)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("LLM_WORKERS", "4")),
+                        help="Concurrent LLM requests in sharded mode (default: 4)")
+    parser.add_argument("--stream-completions", action="store_true",
+                        help="Stream the completion and write each test case to --jsonl as soon as it is parsed")
+    parser.add_argument("--jsonl", default="test_cases.jsonl",
+                        help="JSON Lines output for --stream-completions (default: test_cases.jsonl)")
+    parser.add_argument("--structured-output", action="store_true",
+                        help="Ask the LLM for a JSON array of test cases and validate it against a strict schema")
+    parser.add_argument("--prompt-budget", type=int, default=int(os.getenv("LLM_PROMPT_BUDGET", "0")) or None,
+                        help="Token budget for each prompt; only the SRS chunks most relevant to the "
+                             "prompted screens are included (default: unlimited)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only prompt the LLM for frames that changed since the last run")
+    parser.add_argument("--manifest", default="frame_manifest.json",
+                        help="Frame fingerprint manifest for --incremental (default: frame_manifest.json)")
+    parser.add_argument("--no-dedupe", action="store_true",
+                        help="Keep exact and near-duplicate test cases in the output")
+    parser.add_argument("--suite", default=os.getenv("TEST_SUITE_FILE"),
+                        help="Merge de-duplicated cases into this persistent suite and write the whole suite "
+                             "to the output (default: TEST_SUITE_FILE; off when unset)")
+    parser.add_argument("--store", default=os.getenv("TEST_CASE_DB"),
+                        help="Append each run's test cases to this SQLite case store (default: TEST_CASE_DB; "
+                             "off when unset)")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Do not append test cases to the case store, even if TEST_CASE_DB is set")
+    parser.add_argument("--project", default=os.getenv("TEST_CASE_PROJECT"),
+                        help="Project the stored cases belong to (default: TEST_CASE_PROJECT, else the batch job "
+                             "id or the Figma file name)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Stay resident and answer JSON-line requests on stdin/stdout")
+    parser.add_argument("--serve-port", type=int,
+                        help="Stay resident and answer JSON-line requests on a local TCP port")
+    parser.add_argument("--serve-host", default="127.0.0.1",
+                        help="Interface for --serve-port (default: 127.0.0.1)")
+    parser.add_argument("--batch", metavar="MANIFEST",
+                        help="Process every job in a JSONL manifest or directory of Figma exports")
+    parser.add_argument("--batch-output", default="batch_output",
+                        help="Directory for per-job outputs and batch_report.json (default: batch_output)")
+    parser.add_argument("--batch-jobs", type=int, default=2,
+                        help="Jobs processed concurrently in batch mode (default: 2)")
+    parser.add_argument("--batch-srs", help="SRS summary for batch jobs that do not name their own")
+    parser.add_argument("--metrics-log", default=os.getenv("METRICS_LOG_FILE"),
+                        help="Append a JSON line per pipeline stage span to this file ('-' for stderr)")
+    parser.add_argument("--metrics-file", default=os.getenv("METRICS_PROM_FILE"),
+                        help="Write stage, token and retry metrics in Prometheus text format to this file")
+    args = parser.parse_args(argv)
+    serving = args.serve or args.serve_port is not None
+    if serving and (args.batch or args.figma_data_file):
+        parser.error("--serve and --serve-port take requests instead of a figma_data_file or --batch")
+    if not serving and bool(args.batch) == bool(args.figma_data_file):
+        parser.error("pass either a figma_data_file or --batch MANIFEST")
+    if args.stream_completions and (args.shard or args.structured_output):
+        parser.error("--stream-completions cannot be combined with --shard or --structured-output")
+    if args.incremental and (args.shard or args.stream_completions):
+        parser.error("--incremental already prompts per frame and cannot be combined with --shard or --stream-completions")
+    return args
 
 def main():
     """Main function to execute the test case generation pipeline."""
-    if len(sys.argv) < 2:
-        print("Usage: python script.py <figma_data_file> [srs_summary_file]")
-        sys.exit(1)
-    
-    figma_data_file = sys.argv[1]
-    srs_summary_file = sys.argv[2] if len(sys.argv) > 2 else "../NODE_BACKEND/dataintext/summary.txt"
+    args = parse_args()
+    configure_metrics(log_file=args.metrics_log, prometheus_file=args.metrics_file)
+    try:
+        run_main(args)
+    finally:
+        get_metrics().write_prometheus()
+
+def run_main(args):
+    """Run the mode selected by args: a worker, a batch or a single pipeline."""
+    cache = None if args.no_cache or os.getenv("LLM_CACHE_DISABLE") else ResponseCache()
+
+    if args.serve_port is not None:
+        serve_tcp(args.serve_host, args.serve_port, cache=cache, workers=max(args.workers, 1))
+        return
+    if args.serve:
+        serve_stdio(cache=cache, workers=max(args.workers, 1))
+        return
+
+    if args.batch:
+        try:
+            jobs = load_manifest(args.batch, default_srs_file=args.batch_srs)
+        except (OSError, ValueError) as e:
+            print(f"Error reading batch manifest: {e}")
+            sys.exit(1)
+        print(f" Running {len(jobs)} batch jobs with {max(args.batch_jobs, 1)} workers...")
+        report = run_batch(jobs, lambda job, job_output_dir: run_batch_job(job, job_output_dir, args, cache),
+                           args.batch_output, workers=max(args.batch_jobs, 1))
+        print(f" Batch completed: {report['succeeded']} succeeded, {report['failed']} failed.")
+        return
 
     # Load SRS Summary
     try:
-        with open(srs_summary_file, "r", encoding="utf-8") as file:
-            srs_description = file.read().strip()
+        srs_description = read_srs_summary(args.srs_summary_file)
     except Exception as e:
         print(f"Error reading SRS file: {e}")
         sys.exit(1)
 
-    # Load and process Figma data
-    figma_data = load_figma_data(figma_data_file)
-    if not figma_data:
+    if run_pipeline(args.figma_data_file, srs_description, args, cache=cache) is None:
         print("Failed to load Figma data. Exiting.")
         return
-    
-    processed_data = process_figma_data(figma_data)
-
-    # Generate test cases from LLM
-    text_output = generate_playwright_test_cases(processed_data, srs_description)
-
-    # Save test cases as a plain text file
-    save_test_cases_as_text(text_output)
 
     print(" Process completed successfully!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,149 @@
+import crypto from 'crypto';
+import fs from 'fs/promises';
+import path from 'path';
+import { fileURLToPath } from 'url';
+// The pdf.js build bundled with pdf-parse; the package entry point itself reads whole documents only.
+import PDFJS from 'pdf-parse/lib/pdf.js/v1.10.100/build/pdf.js';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+PDFJS.disableWorker = true;
+
+// Extracted page text is cached per page under <cacheDir>/pages/<key>.txt. The key hashes the
+// page number with the page's own text content (see pageContentHash), so pages of a revised PDF
+// whose text did not change keep their keys. <cacheDir>/docs/<sha256 of the PDF>.json lists the
+// page keys of every document already seen, so re-processing the same upload skips pdf.js entirely.
+const PDF_CACHE_DIR = process.env.PDF_CACHE_DIR || path.join(__dirname, ".pdf_cache");
+const PDF_CACHE_MAX_DOCS = Number(process.env.PDF_CACHE_MAX_DOCS) || 50;
+const PDF_CACHE_MAX_PAGES = Number(process.env.PDF_CACHE_MAX_PAGES) || 5000;
+
+const getTextContent = (page) => page.getTextContent({ normalizeWhitespace: false, disableCombineTextItems: false });
+
+// Same text layout as pdf-parse's default renderer: items on one baseline are joined,
+// a change of baseline starts a new line.
+const renderPageText = (textContent) => {
+    let lastY;
+    let text = "";
+    for (const item of textContent.items) {
+        if (lastY === item.transform[5] || lastY === undefined) {
+            text += item.str;
+        } else {
+            text += "\n" + item.str;
+        }
+        lastY = item.transform[5];
+    }
+    return text;
+};
+
+export const hashPdf = (pdfBuffer) => crypto.createHash("sha256").update(pdfBuffer).digest("hex");
+
+// Hash of a page's text content as parsed by pdf.js: every item's string, position and font.
+// pdf.js 1.10 keeps its parsed objects inside the worker and gives no cheaper per-page
+// fingerprint, and the raw bytes cannot be scanned reliably (page dictionaries often sit in
+// compressed object streams). So a revised PDF is parsed again, but each unchanged page keeps
+// its key and is reported as cached.
+export const pageContentHash = (textContent) => {
+    const hash = crypto.createHash("sha256");
+    for (const item of textContent.items) {
+        hash.update(`${item.str}\0${item.transform.join(",")}\0${item.fontName}\n`);
+    }
+    return hash.digest("hex");
+};
+
+const pageKey = (pageNumber, contentHash) =>
+    crypto.createHash("sha256").update(`${pageNumber}\n${contentHash}`).digest("hex");
+
+// Touch a cached page so pruning drops the least recently used pages first; false if it is missing.
+const touchCachedPage = async (pagesDir, key) => {
+    const now = new Date();
+    try {
+        await fs.utimes(path.join(pagesDir, `${key}.txt`), now, now);
+        return true;
+    } catch (err) {
+        return false;
+    }
+};
+
+const readCachedPage = async (pagesDir, key) => {
+    try {
+        const text = await fs.readFile(path.join(pagesDir, `${key}.txt`), "utf-8");
+        await touchCachedPage(pagesDir, key);
+        return text;
+    } catch (err) {
+        return null;
+    }
+};
+
+const readDocPageKeys = async (docFile) => {
+    try {
+        return JSON.parse(await fs.readFile(docFile, "utf-8")).pageKeys;
+    } catch (err) {
+        return null;
+    }
+};
+
+// Keep only the `keep` most recently modified files of dir.
+const pruneDir = async (dir, keep) => {
+    const names = await fs.readdir(dir);
+    if (names.length <= keep) return;
+    const files = await Promise.all(names.map(async (name) => {
+        const file = path.join(dir, name);
+        return { file, mtimeMs: (await fs.stat(file)).mtimeMs };
+    }));
+    files.sort((a, b) => b.mtimeMs - a.mtimeMs);
+    for (const { file } of files.slice(keep)) {
+        await fs.rm(file, { force: true });
+    }
+};
+
+// Yield { pageNumber, text, cached } for each page of a PDF, in order, one page at a time.
+// Pages of a document seen before are served from the cache; the others are parsed, released
+// right after their text is read and written back (cached is true when the same page text is
+// already in the cache). Control returns to the event loop between parsed pages, so a
+// 500-page document does not block the server for the whole extraction.
+export async function* iterPdfPages(pdfBuffer, { cacheDir = PDF_CACHE_DIR, useCache = true } = {}) {
+    const docsDir = path.join(cacheDir, "docs");
+    const pagesDir = path.join(cacheDir, "pages");
+    const docFile = path.join(docsDir, `${hashPdf(pdfBuffer)}.json`);
+    const knownKeys = useCache ? await readDocPageKeys(docFile) : null;
+
+    let doc = null;
+    try {
+        if (useCache) {
+            await fs.mkdir(docsDir, { recursive: true });
+            await fs.mkdir(pagesDir, { recursive: true });
+        }
+        const numPages = knownKeys ? knownKeys.length : (doc = await PDFJS.getDocument(pdfBuffer)).numPages;
+        const pageKeys = [];
+
+        for (let pageNumber = 1; pageNumber <= numPages; pageNumber++) {
+            let key = knownKeys ? knownKeys[pageNumber - 1] : null;
+            let text = key ? await readCachedPage(pagesDir, key) : null;
+            let cached = text !== null;
+            if (!cached) {
+                if (!doc) doc = await PDFJS.getDocument(pdfBuffer);
+                const page = await doc.getPage(pageNumber);
+                const textContent = await getTextContent(page);
+                page.cleanup();
+                text = renderPageText(textContent);
+                key = pageKey(pageNumber, pageContentHash(textContent));
+                if (useCache) {
+                    cached = await touchCachedPage(pagesDir, key);
+                    if (!cached) await fs.writeFile(path.join(pagesDir, `${key}.txt`), text, "utf-8");
+                }
+                await new Promise(resolve => setImmediate(resolve));
+            }
+            pageKeys.push(key);
+            yield { pageNumber, text, cached };
+        }
+
+        if (useCache && !knownKeys) {
+            await fs.writeFile(docFile, JSON.stringify({ numPages, pageKeys }), "utf-8");
+            await pruneDir(docsDir, PDF_CACHE_MAX_DOCS);
+            await pruneDir(pagesDir, PDF_CACHE_MAX_PAGES);
+        }
+    } finally {
+        if (doc) doc.destroy();
+    }
+}
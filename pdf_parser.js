@@ -3,7 +3,7 @@ const router = express.Router();
 const multer = require("multer");
 const path = require("path");
 const fs = require("fs");
-const pdfParse = require("pdf-parse"); // Import pdf-parse
+const { once } = require("events");
 
 // Multer Setup for File Uploads
 const storage = multer.diskStorage({
@@ -23,6 +23,9 @@ if (!fs.existsSync(textDataFolder)) {
 
 const textFilePath = path.join(textDataFolder, "extracted_text.txt");
 
+// Write chunk, waiting for "drain" when the stream's buffer is full
+const writeChunk = (stream, chunk) => (stream.write(chunk) ? Promise.resolve() : once(stream, "drain"));
+
 router.post("/upload", upload.single("pdfFile"), async (req, res) => {
    console.log("🔹 Received Body:", req.body);
    console.log("🔹 Received File:", req.file);
@@ -40,26 +43,39 @@ router.post("/upload", upload.single("pdfFile"), async (req, res) => {
    const pdfFilePath = req.file.filename; // The uploaded file's name
    const pdfFileFullPath = path.join(__dirname, "../uploads", pdfFilePath);
 
+   let output = null;
+   let pageIterator = null;
    try {
-      // Read the uploaded PDF file
-      const pdfBuffer = fs.readFileSync(pdfFileFullPath);
-      const pdfData = await pdfParse(pdfBuffer);
-
-      console.log("📄 PDF Content:");
-      console.log(pdfData.text); // Logs the extracted text from PDF
-
-      // Write the extracted text to a file (if you want to save it as .txt)
-      fs.writeFileSync(textFilePath, pdfData.text, { flag: "w" });
-
-      // Respond with the extracted text
-      res.json({
-         message: "File uploaded and text extracted successfully",
-         extractedText: pdfData.text, // Return extracted text from PDF
-         fileUrl: `/uploads/${pdfFilePath}`, // URL to access uploaded PDF
-         textFileUrl: `/dataintext/extracted_text.txt`, // URL to the extracted text file
-      });
+      // Extract page by page (pdfPages.mjs is an ES module); an unreadable PDF fails on the
+      // first page, before any of the response is sent
+      const { iterPdfPages } = await import("../pdfPages.mjs");
+      const pdfBuffer = await fs.promises.readFile(pdfFileFullPath);
+      pageIterator = iterPdfPages(pdfBuffer);
+      let next = await pageIterator.next();
+
+      // Each page goes to the text file and the response as it arrives, never the whole text
+      output = fs.createWriteStream(textFilePath, "utf-8");
+      res.status(200).type("json");
+      res.write(`{"message":"File uploaded and text extracted successfully",` +
+         `"fileUrl":${JSON.stringify(`/uploads/${pdfFilePath}`)},` + // URL to access uploaded PDF
+         `"textFileUrl":"/dataintext/extracted_text.txt",` + // URL to the extracted text file
+         `"extractedText":"`); // Extracted text from PDF, streamed page by page
+      let pages = 0;
+      for (; !next.done; next = await pageIterator.next()) {
+         const chunk = (pages > 0 ? "\n" : "") + next.value.text;
+         await writeChunk(output, chunk);
+         await writeChunk(res, JSON.stringify(chunk).slice(1, -1));
+         pages++;
+      }
+      await new Promise((resolve, reject) => output.end(err => (err ? reject(err) : resolve())));
+      res.end(`"}`);
+
+      console.log(`📄 Extracted ${pages} pages`);
    } catch (err) {
       console.error("❌ Error reading PDF:", err);
+      if (output) output.destroy();
+      if (pageIterator) await pageIterator.return(); // releases the pdf.js document
+      if (res.headersSent) return res.destroy(err);
       return res.status(500).json({ error: "Failed to read PDF file" });
    }
 });
@@ -1,8 +1,10 @@
 module.exports = {
     use: {
-       headless: false, // Set to true if you don’t want to see the browser
+       headless: process.env.PLAYWRIGHT_HEADLESS === '1', // Set PLAYWRIGHT_HEADLESS=1 if you don’t want to see the browser
        browserName: 'firefox', // Specify Firefox as the browser
        viewport: { width: 1280, height: 720 },
+       baseURL: process.env.PLAYWRIGHT_BASE_URL || 'http://localhost:3000', // Compiled specs navigate to routes relative to this
     },
     testDir: './tests', // Specify the test directory
+    workers: process.env.PLAYWRIGHT_WORKERS ? Number(process.env.PLAYWRIGHT_WORKERS) : undefined,
 };
\ No newline at end of file
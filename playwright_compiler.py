@@ -0,0 +1,608 @@
+"""Compile parsed test cases into Playwright specs without an LLM round-trip.
+
+Steps are matched against templates (navigate, fill, click, select, check, wait,
+verify) and their quoted targets resolved through a selector map built from the
+Figma element names. Only steps no template or selector covers are sent to the LLM,
+in one batched request per run; without an LLM they become TODO comments.
+
+Usage: python playwright_compiler.py test_cases.txt [--figma figma_data.json]
+       [--selectors selectors.json] [--output playwright_tests2.js | --shards N] [--no-llm]
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+
+from case_dedupe import case_fingerprint
+from case_parser import parse_test_cases
+from case_store import CaseStore
+from element_classifier import get_classifier
+from metrics import span
+from results_store import DEFAULT_RESULTS_STORE, ResultsStore
+
+# Quoted UI names in steps: 'Login', "Email", ‘Sign Up’ or “Sign Up”.
+QUOTED_RE = re.compile(r"['\"‘“]([^'\"‘’“”]+)['\"’”]")
+# Kind words that trail element names in steps ("'Login' button") and Figma names ("Login Button").
+KIND_WORDS = {"button", "btn", "field", "input", "textbox", "box", "page", "screen", "dropdown", "select",
+              "checkbox", "radio", "link", "tab", "menu", "form", "the"}
+# Locator templates per element_classifier key; "name" is a JavaScript string literal.
+LOCATORS = {
+    "inputs": "page.getByLabel({name})",
+    "buttons": "page.getByRole('button', {{ name: {name} }})",
+    "dropdowns": "page.getByLabel({name})",
+    "checkboxes": "page.getByRole('checkbox', {{ name: {name} }})",
+    "radioButtons": "page.getByRole('radio', {{ name: {name} }})",
+}
+# Element kinds implied by the words around a quoted name in a step.
+KIND_HINTS = [
+    ("buttons", re.compile(r"\b(button|btn|link|tab)\b", re.IGNORECASE)),
+    ("inputs", re.compile(r"\b(field|input|text ?box)\b", re.IGNORECASE)),
+    ("dropdowns", re.compile(r"\b(drop ?down|select box|combo ?box)\b", re.IGNORECASE)),
+    ("checkboxes", re.compile(r"\bcheck ?box\b", re.IGNORECASE)),
+    ("radioButtons", re.compile(r"\bradio\b", re.IGNORECASE)),
+]
+
+NAVIGATE_RE = re.compile(r"^(?:go|navigate|open|visit|launch|return|proceed)\b(?: back)?(?: to)?\b", re.IGNORECASE)
+FILL_RE = re.compile(r"^(?:enter|type|fill|input|provide|leave)\b", re.IGNORECASE)
+CLICK_RE = re.compile(r"^(?:click|tap|press|submit|hit)\b", re.IGNORECASE)
+SELECT_RE = re.compile(r"^(?:select|choose|pick)\b", re.IGNORECASE)
+CHECK_RE = re.compile(r"^(?:check|tick|enable|uncheck|untick|disable)\b(?! that| if| whether)", re.IGNORECASE)
+UNCHECK_RE = re.compile(r"^(?:uncheck|untick|disable)\b", re.IGNORECASE)
+WAIT_RE = re.compile(r"^wait\b", re.IGNORECASE)
+VERIFY_RE = re.compile(r"^(?:verify|check that|check if|check whether|ensure|confirm|observe|assert|see)\b",
+                       re.IGNORECASE)
+REDIRECT_RE = re.compile(r"\b(?:redirected|navigated|taken|directed|returned)\b.*?\bto\b(?: the)?\s+(.+)$",
+                         re.IGNORECASE)
+ERROR_RE = re.compile(r"\b(error|invalid|incorrect|required|fail(?:s|ed|ure)?|denied|not allowed|warning)\b",
+                      re.IGNORECASE)
+SUCCESS_RE = re.compile(r"\b(success(?:ful(?:ly)?)?|confirmation|confirmed|saved|created|welcome)\b", re.IGNORECASE)
+EMPTY_RE = re.compile(r"\b(empty|blank|nothing)\b", re.IGNORECASE)
+NEGATIVE_RE = re.compile(r"\b(invalid|incorrect|wrong|unregistered|non-?existent|mismatch(?:ed|ing)?|weak|short)\b",
+                         re.IGNORECASE)
+
+ERROR_TEXT = r"/error|invalid|incorrect|required|failed/i"
+SUCCESS_TEXT = r"/success|confirm|saved|created|welcome/i"
+
+
+def normalize_name(name):
+    """Key for matching a UI name: lowercase words without trailing kind words."""
+    words = re.findall(r"[a-z0-9]+", name.lower())
+    while len(words) > 1 and words[-1] in KIND_WORDS:
+        words.pop()
+    while len(words) > 1 and words[0] in KIND_WORDS:
+        words.pop(0)
+    return " ".join(words)
+
+
+def display_name(name):
+    """name without leading or trailing kind words, keeping its case: "Login Button" -> "Login"."""
+    words = name.split()
+    while len(words) > 1 and re.sub(r"\W", "", words[-1].lower()) in KIND_WORDS:
+        words.pop()
+    while len(words) > 1 and re.sub(r"\W", "", words[0].lower()) in KIND_WORDS:
+        words.pop(0)
+    return " ".join(words)
+
+
+def js_string(value):
+    """Render value as a single-quoted JavaScript string literal."""
+    escaped = value.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n").replace("\r", "")
+    return f"'{escaped}'"
+
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", normalize_name(name)).strip("-")
+
+
+class SelectorMap:
+    """Maps UI names to Playwright locators and screen names to routes.
+
+    Built from the Figma export: every frame is a screen routed at /<slug>, and every
+    classified element gets a role- or label-based locator. overrides ({name: value})
+    take precedence: values for screens are routes, values for elements CSS selectors.
+    """
+
+    def __init__(self, overrides=None):
+        self.elements = {}
+        self.screens = {}
+        self.overrides = {normalize_name(name): value for name, value in (overrides or {}).items()}
+
+    @classmethod
+    def from_figma(cls, figma_data, overrides=None):
+        selectors = cls(overrides)
+        classifier = get_classifier()
+        for page in figma_data.get("pages", []):
+            for frame in page.get("frames", []):
+                screen = frame.get("frame", "").strip()
+                if screen and screen.lower() != "frame":
+                    selectors.add_screen(screen)
+                for element in frame.get("elements", []):
+                    kind = classifier.classify(element)
+                    if kind in LOCATORS and element.get("name", "").strip():
+                        selectors.add_element(element["name"].strip(), kind)
+        return selectors
+
+    def add_screen(self, name):
+        self.screens.setdefault(normalize_name(name), (name, "/" + slugify(name)))
+
+    def add_element(self, name, kind):
+        self.elements.setdefault(normalize_name(name), (name, kind))
+
+    def route(self, name):
+        """Return the route for a screen name, or None if it is unknown."""
+        key = normalize_name(name)
+        if key in self.overrides:
+            return self.overrides[key]
+        if key in self.screens:
+            return self.screens[key][1]
+        return None
+
+    def knows(self, name):
+        """Whether name is a known element or has an override."""
+        key = normalize_name(name)
+        return key in self.elements or key in self.overrides
+
+    def kind(self, name):
+        """Return the element_classifier key of a known element, or None."""
+        entry = self.elements.get(normalize_name(name))
+        return entry[1] if entry else None
+
+    def locator(self, name, kind=None):
+        """Return a locator expression for name, or None if its kind cannot be determined."""
+        key = normalize_name(name)
+        if key in self.overrides:
+            return f"page.locator({js_string(self.overrides[key])})"
+        entry = self.elements.get(key)
+        if entry is not None:
+            name, kind = entry
+        if kind is None:
+            return None
+        return LOCATORS[kind].format(name=js_string(display_name(name)))
+
+    def mentioned_elements(self, text, kind):
+        """Known elements of the given kind mentioned by name in text, in order of appearance."""
+        normalized = f" {normalize_name(text)} "
+        found = []
+        for key, (name, element_kind) in self.elements.items():
+            position = normalized.find(f" {key} ")
+            if element_kind == kind and position != -1:
+                found.append((position, name))
+        return [name for _, name in sorted(found)]
+
+
+def hinted_kind(text):
+    for kind, pattern in KIND_HINTS:
+        if pattern.search(text):
+            return kind
+    return None
+
+
+def clause_mentioning(step, name):
+    """The clause of step (split on commas and "and") that mentions name, or the whole step."""
+    key = normalize_name(name)
+    for clause in re.split(r",|\band\b", step):
+        if f" {key} " in f" {normalize_name(clause)} ":
+            return clause
+    return step
+
+
+def sample_value(field, step):
+    """Test data for a field, chosen from its name and whether the step asks for bad or empty input."""
+    if EMPTY_RE.search(step):
+        return ""
+    negative = bool(NEGATIVE_RE.search(step))
+    field = field.lower()
+    if "mail" in field:
+        return "invalid-email" if negative else "test.user@example.com"
+    if "password" in field:
+        return "wrong-password" if negative else "Password123!"
+    if "phone" in field or "mobile" in field:
+        return "12ab" if negative else "5551234567"
+    if "name" in field:
+        return "" if negative else "Test User"
+    if any(word in field for word in ("amount", "age", "quantity", "number", "zip", "code")):
+        return "-1" if negative else "10"
+    return "invalid" if negative else "Test value"
+
+
+class PlaywrightCompiler:
+    """Translate parsed test cases into Playwright test code, step by step.
+
+    compile_step() returns a list of statements, or None when the step must go to
+    the LLM. Counters track how many steps were compiled locally and how many were not.
+    """
+
+    def __init__(self, selectors):
+        self.selectors = selectors
+        self.compiled = 0
+        self.unresolved = 0
+
+    def compile_step(self, step):
+        step = step.strip().rstrip(".")
+        quoted = QUOTED_RE.findall(step)
+        for pattern, method in ((NAVIGATE_RE, self._navigate), (FILL_RE, self._fill), (CLICK_RE, self._click),
+                                (SELECT_RE, self._select), (CHECK_RE, self._check), (WAIT_RE, self._wait),
+                                (VERIFY_RE, self.compile_expectation)):
+            if pattern.match(step):
+                statements = method(step, quoted)
+                break
+        else:
+            statements = None
+        if statements:
+            self.compiled += 1
+        else:
+            self.unresolved += 1
+        return statements
+
+    def _navigate(self, step, quoted):
+        target = quoted[-1] if quoted else NAVIGATE_RE.sub("", step).strip()
+        if re.match(r"^(https?://|/)", target):
+            return [f"await page.goto({js_string(target)});"]
+        route = self.selectors.route(target)
+        if route is None:
+            if not quoted:
+                return None
+            # A quoted screen missing from the design still gets a predictable route
+            route = "/" + slugify(target)
+        return [f"await page.goto({js_string(route)});"]
+
+    def _fill(self, step, quoted):
+        if len(quoted) >= 2 and not self.selectors.knows(quoted[0]):
+            # "Enter 'value' in 'Field'"
+            fields, value = [quoted[-1]], quoted[0]
+        elif quoted:
+            # "Enter ... in the 'Email' and 'Password' fields": every quoted name is a field
+            fields, value = quoted, None
+        else:
+            # "Enter a valid email and password": fill every known field the step names
+            fields, value = self.selectors.mentioned_elements(step, "inputs"), None
+        statements = []
+        for field in fields:
+            locator = self.selectors.locator(field, "inputs")
+            if locator is None:
+                return None
+            field_value = value if value is not None else sample_value(field, clause_mentioning(step, field))
+            statements.append(f"await {locator}.fill({js_string(field_value)});")
+        return statements or None
+
+    def _click(self, step, quoted):
+        if not quoted:
+            if re.match(r"^submit\b", step, re.IGNORECASE):
+                return ["await page.locator('[type=\"submit\"]').first().click();"]
+            return None
+        target = quoted[-1]
+        locator = self.selectors.locator(target, self.selectors.kind(target) or hinted_kind(step) or "buttons")
+        return [f"await {locator}.click();"]
+
+    def _select(self, step, quoted):
+        if len(quoted) < 2:
+            return self._check(step, quoted) if quoted and hinted_kind(step) in ("checkboxes", "radioButtons") \
+                else None
+        option, target = quoted[0], quoted[-1]
+        locator = self.selectors.locator(target, "dropdowns")
+        return [f"await {locator}.selectOption({{ label: {js_string(option)} }});"]
+
+    def _check(self, step, quoted):
+        if not quoted:
+            return None
+        target = quoted[-1]
+        kind = self.selectors.kind(target) or hinted_kind(step) or "checkboxes"
+        if kind not in ("checkboxes", "radioButtons"):
+            return None
+        action = "uncheck" if UNCHECK_RE.match(step) else "check"
+        return [f"await {self.selectors.locator(target, kind)}.{action}();"]
+
+    def _wait(self, step, quoted):
+        if quoted:
+            locator = self.selectors.locator(quoted[-1], self.selectors.kind(quoted[-1]))
+            if locator is None:
+                locator = f"page.getByText({js_string(quoted[-1])})"
+            return [f"await expect({locator}).toBeVisible();"]
+        return ["await page.waitForLoadState('networkidle');"]
+
+    def compile_expectation(self, text, quoted=None):
+        """Assertions for an expected result or verification step, or None if none apply."""
+        text = text.strip().rstrip(".")
+        quoted = QUOTED_RE.findall(text) if quoted is None else quoted
+        redirect = REDIRECT_RE.search(text)
+        if redirect:
+            target = quoted[-1] if quoted else redirect.group(1)
+            route = self.selectors.route(target)
+            if route is not None:
+                return [f"await expect(page).toHaveURL(new RegExp({js_string(re.escape(route))}));"]
+        if quoted and ("message" in text.lower() or "text" in text.lower()):
+            return [f"await expect(page.getByText({js_string(quoted[-1])})).toBeVisible();"]
+        if ERROR_RE.search(text):
+            return [f"await expect(page.getByText({ERROR_TEXT}).first()).toBeVisible();"]
+        if SUCCESS_RE.search(text):
+            return [f"await expect(page.getByText({SUCCESS_TEXT}).first()).toBeVisible();"]
+        if quoted:
+            locator = self.selectors.locator(quoted[-1], self.selectors.kind(quoted[-1]))
+            if locator is None:
+                locator = f"page.getByText({js_string(quoted[-1])})"
+            return [f"await expect({locator}).toBeVisible();"]
+        return None
+
+
+def build_fallback_prompt(steps, selectors):
+    """Prompt asking the LLM for Playwright statements for steps no template covered."""
+    elements = "\n".join(f"- {name}: {kind}" for name, kind in selectors.elements.values())
+    screens = "\n".join(f"- {name}: {route}" for name, route in selectors.screens.values())
+    numbered = "\n".join(f"{number}. {step}" for number, step in enumerate(steps, 1))
+    return f"""
+    You are a Playwright expert. Translate each numbered test step into Playwright JavaScript statements
+    that run inside `async ({{ page }}) => {{ ... }}` with `expect` imported from '@playwright/test'.
+    Prefer getByRole, getByLabel and getByText locators using the known element names.
+
+    Known screens and routes:
+    {screens or "- (none)"}
+
+    Known elements and kinds:
+    {elements or "- (none)"}
+
+    Steps:
+    {numbered}
+
+    Return only a JSON array with one string of JavaScript per step, in order, and nothing else.
+    """
+
+
+def resolve_with_llm(steps, selectors, cache=None):
+    """Ask the LLM for code for the given steps; returns a list of code strings or None per step."""
+    import requests
+
+    from llm_cache import answered_payload, lookup
+    from llm_client import get_llm_client
+    payload = {"model": os.getenv("COMPILER_LLM_MODEL", "mistral-nemo-instruct-2407"),
+               "prompt": build_fallback_prompt(steps, selectors), "max_tokens": 200 * len(steps) + 200,
+               "temperature": 0}
+    client = get_llm_client()
+    stats = {}
+    text = lookup(cache, client, payload) if cache is not None else None
+    if text is None:
+        try:
+            text = client.complete(payload, stats=stats)
+        except requests.exceptions.RequestException as e:
+            print(f"Error contacting LLM for unresolved steps: {e}")
+            return [None] * len(steps)
+    try:
+        start = text.find("[")
+        code, _ = json.JSONDecoder().raw_decode(text, start) if start != -1 else (None, 0)
+    except ValueError:
+        code = None
+    if not isinstance(code, list) or len(code) != len(steps) or not all(isinstance(item, str) for item in code):
+        print("LLM fallback did not return one code string per step; leaving them as TODOs.")
+        return [None] * len(steps)
+    if cache is not None:
+        cache.put(answered_payload(payload, stats), text)
+    return code
+
+
+def compile_cases(test_cases, selectors, use_llm=True, cache=None):
+    """Compile every case's steps; returns (compiled, stats).
+
+    compiled holds one {id, testCase, screen, body} dict per case, where id is the
+    case's content fingerprint (stable across runs) and body a list of (step, statements).
+    """
+    with span("compile_playwright", cases=len(test_cases)) as stage:
+        compiler = PlaywrightCompiler(selectors)
+        compiled = []
+        pending = []
+        for test_case in test_cases:
+            body = []
+            for step in test_case.get("steps", []):
+                statements = compiler.compile_step(step)
+                if statements is None:
+                    pending.append((body, len(body), step))
+                    statements = []
+                body.append((step, statements))
+            expected = f"Expected: {test_case.get('expectedResult', '')}"
+            expectation = compiler.compile_expectation(test_case.get("expectedResult", ""))
+            if expectation is None:
+                compiler.unresolved += 1
+                pending.append((body, len(body), expected))
+            else:
+                compiler.compiled += 1
+            body.append((expected, expectation or []))
+            first = next((step for step in test_case.get("steps", []) if NAVIGATE_RE.match(step.strip())), "")
+            compiled.append({"id": case_fingerprint(test_case)[:16],
+                             "testCase": test_case.get("testCase") or "Untitled test case",
+                             "screen": (QUOTED_RE.findall(first) or ["General"])[-1], "body": body})
+
+        resolved_by_llm = 0
+        if pending and use_llm:
+            print(f" Asking the LLM for {len(pending)} steps the templates could not compile...")
+            for (body, position, step), code in zip(pending, resolve_with_llm([step for *_, step in pending],
+                                                                              selectors, cache)):
+                if code:
+                    body[position] = (step, [line for line in code.strip().splitlines() if line.strip()])
+                    resolved_by_llm += 1
+
+        stats = {"cases": len(test_cases), "steps": compiler.compiled + compiler.unresolved,
+                 "compiledLocally": compiler.compiled, "resolvedByLlm": resolved_by_llm,
+                 "unresolved": compiler.unresolved - resolved_by_llm}
+        stage.set(**stats)
+        return compiled, stats
+
+
+def render_spec(compiled):
+    """Render compiled cases as one spec file, grouped by the screen each case starts on.
+
+    Every test carries a caseId annotation so results can be traced back to the case.
+    """
+    groups = {}
+    for case in compiled:
+        groups.setdefault(case["screen"], []).append(case)
+
+    lines = ["import { test, expect } from '@playwright/test';", ""]
+    for screen, cases in groups.items():
+        lines.append(f"test.describe({js_string(screen)}, () => {{")
+        for case in cases:
+            lines.append(f"  test({js_string(case['testCase'])}, "
+                         f"{{ annotation: {{ type: 'caseId', description: {js_string(case['id'])} }} }}, "
+                         "async ({ page }) => {")
+            for step, statements in case["body"]:
+                lines.append(f"    // {step}")
+                if not statements:
+                    lines.append("    // TODO: no Playwright code could be generated for this step")
+                lines.extend(f"    {statement}" for statement in statements)
+            lines.append("  });")
+            lines.append("")
+        lines[-1] = "});"
+        lines.append("")
+    return "\n".join(lines)
+
+
+def estimate_seconds(case):
+    """Duration guess for a case that has never run: a second plus half a second per step."""
+    return 1.0 + 0.5 * len(case["body"])
+
+
+def plan_shards(compiled, shards, store=None, skip_passing=0):
+    """Split compiled cases into at most `shards` lists of roughly equal expected run time.
+
+    Durations come from the results store where a case has run before, else from
+    estimate_seconds(). Cases are placed longest first on the least loaded shard; within
+    a shard, cases that failed last time run first. With skip_passing, cases that passed
+    that many consecutive runs are left out. Returns (shard lists, skipped count).
+    """
+    history = store.tests if store is not None else {}
+    skipped = 0
+    planned = []
+    for case in compiled:
+        record = history.get(case["id"])
+        if skip_passing and record and record.get("passStreak", 0) >= skip_passing:
+            skipped += 1
+            continue
+        seconds = store.expected_seconds(case["id"]) if store is not None else None
+        planned.append((seconds if seconds is not None else estimate_seconds(case), case))
+
+    bins = [[0.0, []] for _ in range(max(min(shards, len(planned)), 1))]
+    for seconds, case in sorted(planned, key=lambda item: -item[0]):
+        lightest = min(bins, key=lambda item: item[0])
+        lightest[0] += seconds
+        lightest[1].append(case)
+    order = {case["id"]: position for position, (_, case) in enumerate(planned)}
+    failed_last = lambda case: history.get(case["id"], {}).get("lastStatus") == "failed"
+    return [sorted(cases, key=lambda case: (not failed_last(case), order[case["id"]])) for _, cases in bins], skipped
+
+
+def write_shards(shard_cases, shard_dir):
+    """Write one shard-N.spec.js per shard into shard_dir, replacing earlier shard files."""
+    os.makedirs(shard_dir, exist_ok=True)
+    for name in os.listdir(shard_dir):
+        if name.startswith("shard-") and name.endswith(".spec.js"):
+            os.remove(os.path.join(shard_dir, name))
+    paths = []
+    for number, cases in enumerate(shard_cases, 1):
+        if not cases:
+            continue
+        path = os.path.join(shard_dir, f"shard-{number}.spec.js")
+        with open(path, 'w', encoding="utf-8") as file:
+            file.write(render_spec(cases))
+        paths.append(path)
+    return paths
+
+
+def load_test_cases(path, project=None, screen=None):
+    """Read test cases from test_cases.txt, a JSON array or suite, JSON Lines or a case store.
+
+    From a case store (.db) the newest version of each case of project is read,
+    limited to cases touching screen if one is given.
+    """
+    if path.endswith(".db"):
+        if not project:
+            raise ValueError("reading a case store needs --project")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No such case store: '{path}'")
+        store = CaseStore(path)
+        try:
+            return store.cases(project, screen=screen)
+        finally:
+            store.close()
+    with open(path, 'r', encoding="utf-8") as file:
+        text = file.read()
+    if path.endswith(".jsonl"):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    if path.endswith(".json"):
+        data = json.loads(text)
+        return data["cases"] if isinstance(data, dict) else data
+    return parse_test_cases(text)
+
+
+def add_compiler_arguments(parser):
+    parser.add_argument("test_cases", help="test_cases.txt, a JSON array or suite, a JSON Lines file or a case store (.db)")
+    parser.add_argument("--project", default=os.getenv("TEST_CASE_PROJECT"),
+                        help="Project to read from a case store (default: TEST_CASE_PROJECT)")
+    parser.add_argument("--screen", help="Only compile stored cases touching this screen")
+    parser.add_argument("--figma", help="Figma data (as exported for paste.py) used to build the selector map")
+    parser.add_argument("--selectors", default=os.getenv("SELECTOR_MAP_FILE"),
+                        help="JSON object of {name: css selector or route} overrides (default: SELECTOR_MAP_FILE)")
+    parser.add_argument("--no-llm", action="store_true", help="Never call the LLM; leave unresolved steps as TODOs")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk LLM response cache")
+    parser.add_argument("--shard-dir", default=os.path.join("tests", "generated"),
+                        help="Directory for shard-N.spec.js files (default: tests/generated)")
+    parser.add_argument("--results-store", default=DEFAULT_RESULTS_STORE,
+                        help="Results of earlier runs, used to balance shards "
+                             "(default: PLAYWRIGHT_RESULTS_STORE or .playwright_results.json)")
+    parser.add_argument("--skip-passing", type=int, default=0, metavar="N",
+                        help="Leave out tests that passed their last N runs (default: 0, run everything)")
+
+
+def compile_from_args(args):
+    """Load the inputs named by args and compile them; exits on unreadable input."""
+    try:
+        test_cases = load_test_cases(args.test_cases, project=args.project, screen=args.screen)
+        overrides = None
+        if args.selectors:
+            with open(args.selectors, 'r', encoding="utf-8") as file:
+                overrides = json.load(file)
+        figma_data = {}
+        if args.figma:
+            with open(args.figma, 'r', encoding="utf-8") as file:
+                figma_data = json.load(file)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error reading compiler input: {e}")
+        sys.exit(1)
+
+    cache = None
+    if not args.no_llm and not args.no_cache and not os.getenv("LLM_CACHE_DISABLE"):
+        from llm_cache import ResponseCache
+        cache = ResponseCache()
+    compiled, stats = compile_cases(test_cases, SelectorMap.from_figma(figma_data, overrides),
+                                    use_llm=not args.no_llm, cache=cache)
+    print(f" Compiled {stats['cases']} test cases: {stats['compiledLocally']} of {stats['steps']} steps from "
+          f"templates, {stats['resolvedByLlm']} by the LLM, {stats['unresolved']} left as TODOs.")
+    return compiled
+
+
+def write_balanced_shards(compiled, args, shards):
+    """Plan and write shard files from the results store; returns the written paths."""
+    shard_cases, skipped = plan_shards(compiled, shards, ResultsStore(args.results_store), args.skip_passing)
+    paths = write_shards(shard_cases, args.shard_dir)
+    print(f" Wrote {sum(map(len, shard_cases))} tests to {len(paths)} shards in '{args.shard_dir}'"
+          + (f", skipping {skipped} that kept passing." if skipped else "."))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile parsed test cases into a Playwright spec.")
+    add_compiler_arguments(parser)
+    parser.add_argument("--output", default="playwright_tests2.js", help="Spec file to write")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Write this many duration-balanced shard files to --shard-dir instead of --output")
+    args = parser.parse_args(argv)
+
+    compiled = compile_from_args(args)
+    if args.shards:
+        write_balanced_shards(compiled, args, args.shards)
+        return
+    with open(args.output, 'w', encoding="utf-8") as file:
+        file.write(render_spec(compiled))
+    print(f" Playwright spec saved to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
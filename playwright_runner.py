@@ -0,0 +1,103 @@
+"""Compile test cases into balanced shards, run them on parallel Playwright workers and record the results.
+
+Shards are balanced by the per-test durations stored in the results store by earlier
+runs. After the run, the Playwright JSON report is folded back into the store, so the
+next run balances on real timings, runs last run's failures first and can skip tests
+that keep passing (--skip-passing N).
+
+Usage: python playwright_runner.py test_cases.txt [--figma figma_data.json] [--workers 4]
+       [--base-url http://localhost:3000 | --fixture tests/fixtures/app]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from playwright_compiler import add_compiler_arguments, compile_from_args, write_balanced_shards
+from results_store import ResultsStore, ingest_report
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Static file handler that serves /login from login.html, like a single-page app's routes."""
+
+    def translate_path(self, path):
+        translated = super().translate_path(path)
+        if not os.path.exists(translated) and os.path.exists(translated.rstrip("/") + ".html"):
+            return translated.rstrip("/") + ".html"
+        return translated
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixture(directory):
+    """Serve a static HTML fixture on a free local port; returns the server (its URL is server.url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(FixtureHandler, directory=directory))
+    server.daemon_threads = True
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_playwright(shard_dir, workers, report_file, base_url=None):
+    """Run the shard files with `npx playwright test`; returns its exit code."""
+    npx = shutil.which("npx") or "npx"
+    env = dict(os.environ, PLAYWRIGHT_JSON_OUTPUT_NAME=report_file, PLAYWRIGHT_HEADLESS="1")
+    if base_url:
+        env["PLAYWRIGHT_BASE_URL"] = base_url
+    command = [npx, "playwright", "test", shard_dir.replace(os.sep, "/"), "--workers", str(workers),
+               "--reporter", "json"]
+    print(f" Running: {' '.join(command)}")
+    # The JSON reporter writes to report_file; keep Playwright's own output off our stdout
+    return subprocess.run(command, env=env, stdout=subprocess.DEVNULL).returncode
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run generated Playwright tests in balanced parallel shards.")
+    add_compiler_arguments(parser)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PLAYWRIGHT_WORKERS", "4")),
+                        help="Parallel Playwright workers (default: PLAYWRIGHT_WORKERS or 4)")
+    parser.add_argument("--shards", type=int,
+                        help="Shard files to split the suite into (default: one per worker)")
+    parser.add_argument("--base-url", default=os.getenv("PLAYWRIGHT_BASE_URL"),
+                        help="Application under test (default: PLAYWRIGHT_BASE_URL)")
+    parser.add_argument("--fixture", help="Serve this directory of static HTML as the application under test")
+    parser.add_argument("--report", default="playwright_report.json",
+                        help="Where Playwright writes its JSON report (default: playwright_report.json)")
+    parser.add_argument("--compile-only", action="store_true", help="Write the shard files but do not run them")
+    args = parser.parse_args(argv)
+    workers = max(args.workers, 1)
+
+    paths = write_balanced_shards(compile_from_args(args), args, args.shards or workers)
+    if args.compile_only or not paths:
+        return
+
+    fixture = serve_fixture(args.fixture) if args.fixture else None
+    try:
+        exit_code = run_playwright(args.shard_dir, workers, os.path.abspath(args.report),
+                                   fixture.url if fixture else args.base_url)
+    finally:
+        if fixture is not None:
+            fixture.shutdown()
+
+    try:
+        with open(args.report, 'r', encoding="utf-8") as file:
+            report = json.load(file)
+    except (OSError, ValueError) as e:
+        print(f"Error reading Playwright report: {e}")
+        sys.exit(exit_code or 1)
+    store = ResultsStore(args.results_store)
+    counts = ingest_report(report, store)
+    store.save()
+    print(f" Recorded {sum(counts.values())} results in '{args.results_store}': "
+          + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+# Rough BPE-style token count: words and individual punctuation marks, scaled up by a
+# safety factor. Raw counts run about 25% below real BPE counts on SRS text, because
+# long and rare words split into several tokens, and budgets must not be overrun.
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+TOKEN_SAFETY_FACTOR = float(os.getenv("LLM_TOKEN_SAFETY_FACTOR", "1.3"))
+WORD_RE = re.compile(r"[a-z0-9]+")
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Prompt templates live in prompts/test_cases_<version>.txt with {{name}} placeholders.
+# From v2 on, everything before the first placeholder is static, so every request
+# starts with the same bytes and servers with prefix (KV) caching skip its prefill.
+PROMPT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+PROMPT_VERSION = os.getenv("PROMPT_TEMPLATE_VERSION", "v3")
+PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have in is it its of on or should shall that the this "
+    "to user users was will with".split()
+)
+
+
+def count_tokens(text):
+    """Approximate the number of LLM tokens in text, erring on the high side."""
+    return math.ceil(len(TOKEN_RE.findall(text)) * TOKEN_SAFETY_FACTOR)
+
+
+def _terms(text):
+    return [word for word in WORD_RE.findall(text.lower()) if word not in STOPWORDS]
+
+
+@lru_cache(maxsize=None)
+def load_prompt_template(version=PROMPT_VERSION):
+    """Return the text of prompts/test_cases_<version>.txt."""
+    with open(os.path.join(PROMPT_DIR, f"test_cases_{version}.txt"), 'r', encoding="utf-8") as file:
+        return file.read()
+
+
+def render_prompt(template, values):
+    """Fill the {{name}} placeholders of template; raises KeyError for a missing value."""
+    return PLACEHOLDER_RE.sub(lambda match: str(values[match.group(1)]), template)
+
+
+def static_prefix(template):
+    """The part of template before its first placeholder, identical in every request."""
+    match = PLACEHOLDER_RE.search(template)
+    return template[:match.start()] if match else template
+
+
+def _fitting_words(words, budget, start=0):
+    """How many of words[start:] fit, in order, in budget tokens."""
+    raw = 0
+    for end in range(start, len(words)):
+        raw += len(TOKEN_RE.findall(words[end]))
+        if math.ceil(raw * TOKEN_SAFETY_FACTOR) > budget:
+            return end - start
+    return len(words) - start
+
+
+def truncate_tokens(text, budget):
+    """Return the longest run of leading words of text that fits in budget tokens."""
+    words = text.split()
+    return " ".join(words[:_fitting_words(words, budget)])
+
+
+def _split_line(line, chunk_tokens):
+    """Split a line longer than chunk_tokens at sentence ends, then at words."""
+    if count_tokens(line) <= chunk_tokens:
+        yield line
+        return
+    for sentence in SENTENCE_END_RE.split(line.strip()):
+        words = sentence.split()
+        start = 0
+        while start < len(words):
+            # A single word over the limit still becomes a chunk of its own
+            end = start + max(_fitting_words(words, chunk_tokens, start), 1)
+            yield " ".join(words[start:end])
+            start = end
+
+
+def chunk_text(text, chunk_tokens=200):
+    """Split text into chunks of roughly chunk_tokens, breaking between lines where possible.
+
+    Lines longer than chunk_tokens are split at sentence ends, and sentences that are
+    still too long at word boundaries, so every chunk can fit a chunk_tokens budget.
+    """
+    chunks = []
+    current = []
+    size = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        for piece in _split_line(line, chunk_tokens):
+            tokens = count_tokens(piece)
+            if current and size + tokens > chunk_tokens:
+                chunks.append("\n".join(current))
+                current = []
+                size = 0
+            current.append(piece)
+            size += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class SrsIndex:
+    """Okapi BM25 index over SRS chunks."""
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(_terms(chunk)) for chunk in chunks]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if chunks else 0
+        document_frequency = Counter(term for counts in self.term_counts for term in counts)
+        total = len(chunks)
+        self.idf = {term: math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+                    for term, frequency in document_frequency.items()}
+
+    def scores(self, query):
+        """Return the BM25 score of every chunk for query."""
+        terms = set(_terms(query))
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            for term in terms:
+                frequency = counts.get(term)
+                if frequency:
+                    score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
+
+
+@lru_cache(maxsize=8)
+def build_srs_index(srs_description, chunk_tokens=200):
+    """Chunk and index an SRS summary; cached because every shard reuses the same SRS."""
+    return SrsIndex(tuple(chunk_text(srs_description, chunk_tokens)))
+
+
+def select_srs(srs_description, processed_data, budget, chunk_tokens=200):
+    """Return the SRS chunks most relevant to processed_data that fit in budget tokens.
+
+    Chunks are ranked with BM25 against the screen, input and button names and
+    returned in their original order. If nothing matches, the leading chunks are used.
+    If no whole chunk fits, the best one is cut to the budget, so some SRS text is
+    returned whenever the budget allows a word.
+    """
+    if budget <= 0:
+        return ""
+    if count_tokens(srs_description) <= budget:
+        return srs_description
+
+    index = build_srs_index(srs_description, chunk_tokens)
+    query = " ".join(name for names in processed_data.values() if isinstance(names, list) for name in names)
+    scores = index.scores(query)
+    ranked = sorted((position for position in range(len(index.chunks)) if scores[position] > 0),
+                    key=lambda position: (-scores[position], position))
+    if not ranked:
+        ranked = range(len(index.chunks))
+
+    selected = []
+    used = 0
+    for position in ranked:
+        tokens = count_tokens(index.chunks[position])
+        if used + tokens <= budget:
+            selected.append(position)
+            used += tokens
+    if not selected and index.chunks:
+        return truncate_tokens(index.chunks[ranked[0]], budget)
+    return "\n".join(index.chunks[position] for position in sorted(selected))
+
+
+def fit_processed_data(processed_data, budget, measure):
+    """Trim the longest element lists until measure(processed_data) fits in budget tokens.
+
+    Trimmed lists keep their leading names and end with an "... (N more)" marker.
+    """
+    list_keys = [key for key, names in processed_data.items() if isinstance(names, list)]
+    fitted = dict(processed_data)
+    omitted = {key: 0 for key in list_keys}
+    for key in list_keys:
+        fitted[key] = list(processed_data[key])
+    while list_keys and measure(fitted) > budget:
+        key = max(list_keys, key=lambda name: len(fitted[name]) - (1 if omitted[name] else 0))
+        names = fitted[key][:-1] if omitted[key] else fitted[key]
+        if len(names) <= 1:
+            break
+        keep = len(names) // 2
+        omitted[key] += len(names) - keep
+        fitted[key] = names[:keep] + [f"... ({omitted[key]} more)"]
+    return fitted
@@ -0,0 +1,108 @@
+import { spawn } from 'child_process';
+import net from 'net';
+import readline from 'readline';
+import { fileURLToPath } from 'url';
+import path from 'path';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+const pythonScriptPath = path.join(__dirname, 'paste.py');
+
+// Client for a resident `paste.py --serve` worker. Requests and events are JSON lines:
+//   -> { id, figma, srs, options }
+//   <- { id, event: "testCase", testCase } ... { id, event: "done", text } | { id, event: "error", error }
+// If PASTE_WORKER_ADDR (host:port) is set, connect to a worker started with
+// `python paste.py --serve-port <port>`; otherwise spawn one over stdin/stdout.
+export class PythonWorker {
+    constructor({ address = process.env.PASTE_WORKER_ADDR } = {}) {
+        this.address = address;
+        this.nextId = 1;
+        this.pending = new Map();
+        this.stream = null;
+    }
+
+    connect() {
+        if (this.stream) return;
+
+        if (this.address) {
+            const [host, port] = this.address.split(":");
+            console.log(`🔌 Connecting to Python worker at ${host}:${port}...`);
+            const socket = net.connect(Number(port), host);
+            socket.on('error', (err) => this.fail(err));
+            socket.on('close', () => this.fail(new Error("Python worker connection closed")));
+            this.stream = socket;
+            this.listen(socket);
+            return;
+        }
+
+        console.log("🐍 Starting resident Python worker...");
+        const pythonCommand = process.platform === 'win32' ? 'python' : 'python';
+        const child = spawn(pythonCommand, [pythonScriptPath, '--serve'], { stdio: ['pipe', 'pipe', 'pipe'] });
+        child.stderr.on('data', (data) => {
+            const output = data.toString().trim();
+            if (output) console.log(`🐍 Python worker: ${output}`);
+        });
+        child.on('error', (err) => this.fail(err));
+        child.on('close', (code) => this.fail(new Error(`Python worker exited with code ${code}`)));
+        this.child = child;
+        this.stream = child.stdin;
+        this.listen(child.stdout);
+    }
+
+    listen(readable) {
+        const lines = readline.createInterface({ input: readable });
+        lines.on('line', (line) => {
+            let event;
+            try {
+                event = JSON.parse(line);
+            } catch (err) {
+                console.error("⚠️ Invalid line from Python worker:", line);
+                return;
+            }
+            const request = this.pending.get(event.id);
+            if (!request) return;
+            if (event.event === "testCase") {
+                request.onTestCase(event.testCase);
+            } else if (event.event === "done") {
+                this.pending.delete(event.id);
+                request.resolve(event.text);
+            } else if (event.event === "error") {
+                this.pending.delete(event.id);
+                request.reject(new Error(event.error));
+            }
+        });
+    }
+
+    // Reject everything in flight and allow the next request to reconnect.
+    fail(err) {
+        this.stream = null;
+        this.child = null;
+        for (const request of this.pending.values()) request.reject(err);
+        this.pending.clear();
+    }
+
+    // Generate test cases for inline Figma data and SRS text. onTestCase is called for each
+    // parsed test case as it arrives; the promise resolves with the full generated text.
+    generate({ figma, srs, options = {} }, onTestCase = () => {}) {
+        this.connect();
+        const id = this.nextId++;
+        return new Promise((resolve, reject) => {
+            this.pending.set(id, { resolve, reject, onTestCase });
+            this.stream.write(JSON.stringify({ id, figma, srs, options }) + "\n");
+        });
+    }
+
+    close() {
+        if (this.child) this.child.stdin.end();
+        else if (this.stream) this.stream.end();
+        this.stream = null;
+    }
+}
+
+let sharedWorker = null;
+
+// The process-wide worker, so every job in this process reuses one warm Python interpreter.
+export const getPythonWorker = () => {
+    if (!sharedWorker) sharedWorker = new PythonWorker();
+    return sharedWorker;
+};
@@ -0,0 +1,86 @@
+import json
+import os
+import time
+
+DEFAULT_RESULTS_STORE = os.getenv("PLAYWRIGHT_RESULTS_STORE", ".playwright_results.json")
+
+# Playwright JSON reporter test outcomes, mapped to the statuses kept in the store.
+OUTCOMES = {"expected": "passed", "unexpected": "failed", "flaky": "flaky", "skipped": "skipped"}
+
+
+class ResultsStore:
+    """Pass/fail history and durations of compiled Playwright tests, keyed by case id.
+
+    The case id is the test case's content fingerprint (see playwright_compiler), so
+    history survives re-generation and re-sharding but resets when a case changes.
+    Only the last HISTORY durations are kept per test.
+    """
+
+    HISTORY = 5
+
+    def __init__(self, store_file=DEFAULT_RESULTS_STORE):
+        self.store_file = store_file
+        self.tests = {}
+        try:
+            with open(store_file, 'r', encoding="utf-8") as file:
+                self.tests = json.load(file).get("tests", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error reading results store, starting a new one: {e}")
+
+    def record(self, case_id, title, status, seconds):
+        """Add one run of a test; skipped runs are ignored."""
+        if status == "skipped":
+            return
+        entry = self.tests.setdefault(case_id, {"runs": 0, "passes": 0, "failures": 0, "flaky": 0,
+                                                "passStreak": 0, "durations": []})
+        entry["title"] = title
+        entry["runs"] += 1
+        entry["lastStatus"] = status
+        entry["lastRun"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        if status == "failed":
+            entry["failures"] += 1
+            entry["passStreak"] = 0
+        else:
+            entry["passes"] += 1
+            entry["flaky"] += int(status == "flaky")
+            entry["passStreak"] = entry["passStreak"] + 1 if status == "passed" else 0
+        entry["durations"] = (entry["durations"] + [round(seconds, 3)])[-self.HISTORY:]
+
+    def expected_seconds(self, case_id):
+        """Mean of the recent durations of a test, or None if it has never run."""
+        durations = self.tests.get(case_id, {}).get("durations")
+        return sum(durations) / len(durations) if durations else None
+
+    def save(self):
+        temp_file = f"{self.store_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', encoding="utf-8") as file:
+            json.dump({"tests": self.tests}, file, indent=2, ensure_ascii=False)
+        os.replace(temp_file, self.store_file)
+
+
+def iter_report_tests(report):
+    """Yield (case_id, title, status, seconds) for every annotated test in a Playwright JSON report."""
+    suites = list(report.get("suites", []))
+    while suites:
+        suite = suites.pop()
+        suites.extend(suite.get("suites", []))
+        for spec in suite.get("specs", []):
+            for test in spec.get("tests", []):
+                case_id = next((annotation.get("description") for annotation in test.get("annotations", [])
+                                if annotation.get("type") == "caseId"), None)
+                if case_id is None:
+                    continue
+                results = test.get("results") or [{}]
+                yield (case_id, spec.get("title", ""), OUTCOMES.get(test.get("status"), "failed"),
+                       results[-1].get("duration", 0) / 1000)
+
+
+def ingest_report(report, store):
+    """Record every annotated test of a Playwright JSON report; returns counts per status."""
+    counts = {}
+    for case_id, title, status, seconds in iter_report_tests(report):
+        store.record(case_id, title, status, seconds)
+        counts[status] = counts.get(status, 0) + 1
+    return counts
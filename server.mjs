@@ -2,7 +2,6 @@ import express from "express";
 import multer from "multer";
 import path from "path";
 import fs from "fs";
-import { exec, spawn } from 'child_process';
 import { Console } from "console";
 // const express = require("express");
 // const multer = require("multer");
@@ -13,6 +12,11 @@ import { Console } from "console";
 import { fileURLToPath } from "url";
 import cors from 'cors';
 import dotenv from 'dotenv';
+import { randomUUID } from 'crypto';
+import { JobQueue } from './jobQueue.mjs';
+import { runUploadPipeline } from './srsPipeline.mjs';
+import { generateTestCases } from './testCaseGenerator.mjs';
+import { fetchFigmaDesign } from './figmaFetch.mjs';
 
 dotenv.config();
 
@@ -31,6 +35,7 @@ app.use(express.json());
 // Ensure directories exist
 const uploadDir = path.join(__dirname, "uploads");
 const textDataDir = path.join(__dirname, "dataintext");
+const summaryFilePath = path.join(textDataDir, "summary.txt");
 
 if (!fs.existsSync(uploadDir)) fs.mkdirSync(uploadDir);
 if (!fs.existsSync(textDataDir)) fs.mkdirSync(textDataDir);
@@ -42,6 +47,11 @@ const storage = multer.diskStorage({
 });
 const upload = multer({ storage });
 
+// Results of recent uploads (SRS summary and processed Figma data), kept in memory so
+// /execute-temp can generate from them without re-fetching Figma or re-reading files.
+const uploads = new Map();
+const MAX_UPLOADS = Number(process.env.MAX_CACHED_UPLOADS) || 20;
+
 // Route to handle PDF upload, text extraction, and summarization
 app.post("/upload", upload.single("pdfFile"), async (req, res) => {
     console.log("🛠️ Received request:", req.body);
@@ -54,95 +64,138 @@ app.post("/upload", upload.single("pdfFile"), async (req, res) => {
   
     const pdfFilename = req.file.filename;
     const pdfFilePath = path.join(uploadDir, pdfFilename);
-    const textFilePath = path.join(textDataDir, `${pdfFilename}.txt`);
-    const summaryFilePath = path.join(textDataDir, "summary.txt");
   
     console.log("📂 Uploaded PDF File:", pdfFilePath);
   
     try {
-      // Trigger text extraction
-      console.log("🔍 Extracting text from PDF...");
-      exec(`node extractText.js ${pdfFilename}`, (err, stdout, stderr) => {
-        if (err) {
-          console.error("❌ Text extraction failed:", err);
-          return res.status(500).json({ error: "Failed to extract text from PDF" });
-        }
-        console.log("✅ Text extraction completed:", stdout);
-  
-        // Trigger summarization after text extraction
-        console.log("📝 Starting summarization...");
-        exec("node summarizeSRS.js", (err, stdout, stderr) => {
-          if (err) {
-            console.error("❌ Summarization failed:", err);
-            console.error("stderr from summarizeSRS.js:", stderr); // Added stderr logging
-            return res.status(500).json({ error: "Failed to summarize text" });
-          }
-          console.log("✅ Summarization completed:", stdout);
-          if (stderr) {
-            console.warn("⚠️ summarizeSRS.js produced stderr:", stderr); // Warn if stderr is present
-          }
-  
-          // Send response only after summarization is complete
-          res.json({
-            message: "File uploaded, text extracted, and summarization completed",
-            pdfPath: `/uploads/${pdfFilename}`,
-            textFilePath: `/dataintext/${pdfFilename}.txt`,
-            summaryFilePath: `/dataintext/summary.txt`
-          });
-        });
+      // Figma fetch, PDF extraction and per-page summarization run as one overlapped pipeline
+      console.log("🔍 Extracting and summarizing PDF...");
+      const result = await runUploadPipeline({ pdfPath: pdfFilePath, figmaToken, figmaFileId: figmaProjectUrl });
+      console.log("✅ Upload pipeline completed:", result.timings);
+
+      const uploadId = randomUUID();
+      uploads.set(uploadId, { summary: result.summary, figma: result.figma, frontendUrl });
+      if (uploads.size > MAX_UPLOADS) uploads.delete(uploads.keys().next().value);
+
+      // Still written for /summary after a restart and for running paste.py by hand
+      await fs.promises.writeFile(summaryFilePath, result.summary, "utf-8");
+
+      res.json({
+        message: "File uploaded, text extracted, and summarization completed",
+        uploadId,
+        pdfPath: `/uploads/${pdfFilename}`,
+        summaryFilePath: `/dataintext/summary.txt`,
+        pages: result.pages,
+        cachedPages: result.cachedPages,
+        summaryStats: result.summaryStats,
+        figmaFetched: result.figma !== null,
+        figmaError: result.figmaError,
+        timings: result.timings
       });
     } catch (err) {
-      res.status(500).json({ error: "Unexpected error occurred" });
+      console.error("❌ Upload pipeline failed:", err);
+      res.status(500).json({ error: "Failed to extract or summarize PDF", details: err.message });
     }
   });
 
+  // Bounded queue for /execute-temp runs: at most JOB_WORKERS jobs in flight, higher
+  // priority first, tenants served round-robin within a priority. Jobs run in this
+  // process, so with TEST_CASE_GENERATOR=local they all share one resident paste.py worker.
+  const jobsDir = path.join(__dirname, "jobs");
+  if (!fs.existsSync(jobsDir)) fs.mkdirSync(jobsDir);
+
+  // Copy through a temp file and rename, so jobs finishing together never leave a mixed file
+  const replaceFile = async (source, destination, jobId) => {
+    const tempPath = `${destination}.${jobId}.tmp`;
+    await fs.promises.copyFile(source, tempPath);
+    await fs.promises.rename(tempPath, destination);
+  };
+
+  const runTempJob = async (job) => {
+    job.outputDir = path.join(jobsDir, job.id);
+    fs.mkdirSync(job.outputDir, { recursive: true });
+    const testCasesPath = path.join(job.outputDir, "test_cases.txt");
+
+    console.log(`🚀 Starting job ${job.id} (tenant: ${job.tenant}, priority: ${job.priority})`);
+    const { figmaToken, figmaProjectUrl, upload } = job.payload;
+    let testCases;
+    if (upload && upload.figma) {
+      // Figma data and summary are already in memory from /upload
+      testCases = await generateTestCases(upload.figma, upload.summary, testCasesPath);
+    } else {
+      const figma = await fetchFigmaDesign(figmaToken, figmaProjectUrl);
+      // Prefer this upload's own summary: the shared file holds whichever upload finished last
+      let summary = upload?.summary;
+      if (!summary) {
+        summary = "No SRS summary available.";
+        try {
+          summary = await fs.promises.readFile(summaryFilePath, "utf-8");
+        } catch (err) {
+          console.warn(`⚠️ Job ${job.id}: could not read SRS summary file:`, err.message);
+        }
+      }
+      testCases = await generateTestCases(figma, summary, testCasesPath);
+    }
+
+    // Keep the shared copies that ConvertTest.mjs reads up to date with the latest finished job
+    await replaceFile(testCasesPath, path.join(__dirname, "test_cases.txt"), job.id);
+    await replaceFile(path.join(job.outputDir, "figma_data.json"), path.join(__dirname, "figma_data.json"), job.id);
+    console.log(`✅ Job ${job.id} finished`);
+    return { testCases, testCasesFilePath: `/jobs/${job.id}/test_cases.txt` };
+  };
+
+  const jobQueue = new JobQueue({
+    concurrency: Number(process.env.JOB_WORKERS) || 2,
+    runJob: runTempJob
+  });
+
+  const describeJob = (job) => ({
+    jobId: job.id,
+    status: job.status,
+    tenant: job.tenant,
+    priority: job.priority,
+    createdAt: job.createdAt,
+    startedAt: job.startedAt,
+    finishedAt: job.finishedAt,
+    result: job.result,
+    error: job.error
+  });
+
   app.post("/execute-temp", (req, res) => {
     console.log("📥 Received /execute-temp request");
-    console.log("🔍 Full Request Body:", JSON.stringify(req.body, null, 2));
 
     const { figmaToken, figmaProjectUrl, frontendUrl } = req.body;
 
     if (!figmaToken || !figmaProjectUrl || !frontendUrl) {
-        console.error("❌ Missing required parameters!", req.body);
+        console.error("❌ Missing required parameters!");
         return res.status(400).json({ error: "Missing required parameters" });
     }
 
-    // Create a detached process that will continue even if the server restarts
-    const tempProcess = spawn('node', [
-        'temp.mjs', 
-        figmaToken,
-        figmaProjectUrl,
-        frontendUrl
-    ], {
-        detached: true,
-        stdio: ['ignore', 'pipe', 'pipe']
-    });
-    
-    // Capture some initial output before we respond
-    let stdoutChunks = [];
-    let stderrChunks = [];
-    
-    tempProcess.stdout.on('data', (data) => {
-        stdoutChunks.push(data.toString());
-        console.log(`📋 Output: ${data.toString()}`);
-    });
-    
-    tempProcess.stderr.on('data', (data) => {
-        stderrChunks.push(data.toString());
-        console.error(`❌ Error: ${data.toString()}`);
+    // With the uploadId from /upload, generation reuses that upload's Figma data and summary
+    const upload = req.body.uploadId ? uploads.get(req.body.uploadId) : undefined;
+    if (req.body.uploadId && !upload) {
+        return res.status(404).json({ error: "Upload not found" });
+    }
+
+    const tenant = req.body.tenant || req.get("X-Tenant-Id") || "default";
+    const priority = Number(req.body.priority) || 0;
+    const job = jobQueue.enqueue({ tenant, priority, payload: { figmaToken, figmaProjectUrl, frontendUrl, upload } });
+
+    res.status(202).json({
+        message: "Job queued",
+        jobId: job.id,
+        status: job.status,
+        statusUrl: `/jobs/${job.id}`,
+        queue: jobQueue.stats()
     });
-    
-    // Return quickly with a response indicating the process has started
-    setTimeout(() => {
-        // Unref the child process so the parent can exit independently
-        tempProcess.unref();
-        
-        res.json({ 
-            message: "Process started successfully", 
-            initialOutput: stdoutChunks.join(''),
-            initialError: stderrChunks.join('')
-        });
-    }, 1000); // Give it 1 second to capture initial output
+});
+
+app.get("/jobs/:id", (req, res) => {
+  const job = jobQueue.get(req.params.id);
+  if (!job) {
+    return res.status(404).json({ error: "Job not found" });
+  }
+  res.json(describeJob(job));
 });
 
 //   app.post("/execute-temp", (req, res) => {
@@ -0,0 +1,227 @@
+import crypto from 'crypto';
+import fs from 'fs/promises';
+import path from 'path';
+import { performance } from 'perf_hooks';
+import { fileURLToPath } from 'url';
+import { GoogleGenerativeAI } from "@google/generative-ai";
+import { fetchFigmaDesign } from './figmaFetch.mjs';
+import { iterPdfPages } from './pdfPages.mjs';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const genAI = new GoogleGenerativeAI(process.env.GOOGLE_API_KEY);
+const SUMMARY_MODEL = "gemini-2.5-flash";
+
+// Text is summarized in chunks of about this many characters, so a long SRS stays inside
+// the model's context and is summarized while the rest of the PDF is still being extracted.
+const SUMMARY_CHUNK_CHARS = Number(process.env.SRS_SUMMARY_CHUNK_CHARS) || 12000;
+// Maximum number of summarization requests in flight at once.
+const SUMMARY_CONCURRENCY = Number(process.env.SRS_SUMMARY_CONCURRENCY) || 4;
+// Chunk and reduce summaries, keyed by a hash of the model, step and input text.
+const SUMMARY_CACHE_DIR = process.env.SUMMARY_CACHE_DIR || path.join(__dirname, ".summary_cache");
+
+const sha256 = (text) => crypto.createHash("sha256").update(text).digest("hex");
+
+// Returns limit(fn), which runs fn once fewer than `concurrency` calls are active.
+export const createLimiter = (concurrency) => {
+    let active = 0;
+    const queue = [];
+    const next = () => {
+        if (active >= concurrency || queue.length === 0) return;
+        active++;
+        const { fn, resolve, reject } = queue.shift();
+        fn().then(resolve, reject).finally(() => {
+            active--;
+            next();
+        });
+    };
+    return (fn) => new Promise((resolve, reject) => {
+        queue.push({ fn, resolve, reject });
+        next();
+    });
+};
+
+const generate = async (prompt) => {
+    const model = genAI.getGenerativeModel({ model: SUMMARY_MODEL });
+    const result = await model.generateContent(prompt);
+    const response = await result.response;
+    return response.text();
+};
+
+// Summarize SRS text into requirement statements with Gemini.
+export const summarizeText = (text) => generate(`
+      Analyze the following text and extract key functional and non-functional requirements also give url for frontend source if present.
+      Ignore diagrams, metadata, and unrelated information.
+
+      Text:
+      ${text}
+
+      Output:
+      - Provide requirement statements in a simple bullet format.
+      - Ensure clarity and relevance.
+    `);
+
+// Merge partial summaries of consecutive sections of one SRS into a single summary.
+export const reduceSummaries = (summaries) => generate(`
+      The following are requirement summaries of consecutive sections of one Software Requirements Specification.
+      Merge them into a single list: remove duplicates, keep every distinct requirement, and keep the frontend URL if one is given.
+
+      ${summaries.map((summary, index) => `Section ${index + 1}:\n${summary}`).join("\n\n")}
+
+      Output:
+      - Provide requirement statements in a simple bullet format.
+      - Ensure clarity and relevance.
+    `);
+
+// Hierarchical (map-reduce) summarizer. Text units (pages or paragraphs) are added in order
+// and grouped into chunks; each chunk is summarized as soon as it is closed, at most
+// `concurrency` at a time. finish() then reduces the chunk summaries level by level until
+// one summary remains. Chunk boundaries depend on unit content, not position, so editing
+// one section of an SRS changes only the chunks around it and the rest come from the cache.
+export class SrsSummarizer {
+    constructor({
+        chunkChars = SUMMARY_CHUNK_CHARS,
+        concurrency = SUMMARY_CONCURRENCY,
+        cacheDir = SUMMARY_CACHE_DIR,
+        useCache = process.env.SUMMARY_CACHE_DISABLE !== "1",
+        summarize = summarizeText,
+        reduce = reduceSummaries
+    } = {}) {
+        this.chunkChars = chunkChars;
+        this.cacheDir = cacheDir;
+        this.useCache = useCache;
+        this.summarize = summarize;
+        this.reduce = reduce;
+        this.limit = createLimiter(concurrency);
+        this.pending = [];
+        this.pendingChars = 0;
+        this.summaries = [];
+        this.startedAt = null;
+        this.stats = { chunks: 0, cachedChunks: 0, reduces: 0 };
+    }
+
+    // Run fn(input) through the limiter unless its result is cached under (step, text).
+    async cached(step, text, fn, input) {
+        const file = path.join(this.cacheDir, `${sha256(JSON.stringify([SUMMARY_MODEL, step, text]))}.txt`);
+        if (this.useCache) {
+            try {
+                const summary = await fs.readFile(file, "utf-8");
+                if (step === "chunk") this.stats.cachedChunks++;
+                return summary;
+            } catch (err) {
+                // Not cached yet
+            }
+        }
+        const summary = await this.limit(() => fn(input));
+        if (this.useCache) {
+            await fs.mkdir(this.cacheDir, { recursive: true });
+            await fs.writeFile(file, summary, "utf-8");
+        }
+        return summary;
+    }
+
+    add(unitText) {
+        if (!unitText.trim()) return;
+        this.pending.push(unitText);
+        this.pendingChars += unitText.length;
+        // Close the chunk at a content-chosen unit once it is big enough (about one unit in
+        // four qualifies), or unconditionally at twice the target size.
+        const boundary = parseInt(sha256(unitText).slice(0, 2), 16) % 4 === 0;
+        if ((this.pendingChars >= this.chunkChars && boundary) || this.pendingChars >= 2 * this.chunkChars) {
+            this.flush();
+        }
+    }
+
+    flush() {
+        if (this.pending.length === 0) return;
+        if (this.startedAt === null) this.startedAt = performance.now();
+        const chunk = this.pending.join("\n");
+        this.stats.chunks++;
+        const summary = this.cached("chunk", chunk, this.summarize, chunk);
+        // Failures surface from finish(); don't let an early one go unhandled meanwhile
+        summary.catch(() => {});
+        this.summaries.push(summary);
+        this.pending = [];
+        this.pendingChars = 0;
+    }
+
+    async finish() {
+        this.flush();
+        let summaries = await Promise.all(this.summaries);
+        while (summaries.length > 1) {
+            // Reduce consecutive summaries in groups that fit one chunk, at least two per group
+            const groups = [];
+            let group = [];
+            let groupChars = 0;
+            for (const summary of summaries) {
+                if (group.length >= 2 && groupChars + summary.length > this.chunkChars) {
+                    groups.push(group);
+                    group = [];
+                    groupChars = 0;
+                }
+                group.push(summary);
+                groupChars += summary.length;
+            }
+            groups.push(group);
+            summaries = await Promise.all(groups.map((parts) => {
+                if (parts.length === 1) return parts[0];
+                this.stats.reduces++;
+                return this.cached("reduce", JSON.stringify(parts), this.reduce, parts);
+            }));
+        }
+        return summaries[0] || "";
+    }
+}
+
+// Summarize a whole SRS text; long documents are split on blank lines and map-reduced.
+export const summarizeDocument = (text, options) => {
+    const summarizer = new SrsSummarizer(options);
+    for (const paragraph of text.split(/\n\s*\n/)) summarizer.add(paragraph);
+    return summarizer.finish();
+};
+
+// Upload pipeline: the Figma fetch runs alongside PDF extraction, and summarization starts
+// while later pages are still being extracted (pages come from iterPdfPages one at a time).
+// Everything is passed in memory; the result carries per-stage timings in milliseconds.
+export const runUploadPipeline = async ({ pdfPath, figmaToken, figmaFileId }) => {
+    const timings = {};
+    const pipelineStart = performance.now();
+    const elapsed = (start) => Math.round(performance.now() - start);
+
+    const figmaStage = (async () => {
+        if (!figmaToken || !figmaFileId) return { figma: null, figmaError: null };
+        const start = performance.now();
+        try {
+            return { figma: await fetchFigmaDesign(figmaToken, figmaFileId), figmaError: null };
+        } catch (err) {
+            console.error("❌ Figma fetch failed:", err.message);
+            return { figma: null, figmaError: err.message };
+        } finally {
+            timings.figmaFetchMs = elapsed(start);
+        }
+    })();
+
+    const srsStage = (async () => {
+        const summarizer = new SrsSummarizer();
+        const start = performance.now();
+        const pdfBuffer = await fs.readFile(pdfPath);
+        let pages = 0;
+        let cachedPages = 0;
+        for await (const { text, cached } of iterPdfPages(pdfBuffer)) {
+            summarizer.add(text);
+            pages++;
+            if (cached) cachedPages++;
+        }
+        timings.extractMs = elapsed(start);
+
+        const summary = await summarizer.finish();
+        // Measured from the first summary request, so it includes the part overlapped with extraction
+        timings.summarizeMs = summarizer.startedAt === null ? 0 : elapsed(summarizer.startedAt);
+        return { pages, cachedPages, summary, summaryStats: summarizer.stats };
+    })();
+
+    const [{ figma, figmaError }, { pages, cachedPages, summary, summaryStats }] = await Promise.all([figmaStage, srsStage]);
+    timings.totalMs = elapsed(pipelineStart);
+    return { pages, cachedPages, summary, summaryStats, figma, figmaError, timings };
+};
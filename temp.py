@@ -2,6 +2,8 @@ import requests
 import json
 import sys
 
+import case_parser
+
 # Fixed URL for LLM API
 LLM_API_URL = "http://10.21.19.17:1234/v1/completions"
 
@@ -58,17 +60,7 @@ def generate_playwright_test_cases(processed_data, srs_description):
 
 def parse_test_cases(text_output):
     """Convert LLM text output into structured JSON test cases."""
-    test_cases = []
-    sections = text_output.split("Test Case: ")
-    for section in sections[1:]:
-        lines = section.split("\n")
-        case = {"testCase": lines[0].strip(), "steps": [], "expectedResult": ""}
-        for line in lines[1:]:
-            if "- " in line:
-                case["steps"].append(line.strip("- ").strip())
-            elif "Expected Result:" in line:
-                case["expectedResult"] = line.split(":", 1)[-1].strip()
-        test_cases.append(case)
+    test_cases = case_parser.parse_test_cases(text_output)
     return test_cases if test_cases else [{"testCase": "Sample", "steps": ["No data"], "expectedResult": "Error parsing output"}]
 
 def save_test_cases(test_cases):
@@ -0,0 +1,92 @@
+import fs from 'fs/promises';
+import path from 'path';
+import { fileURLToPath } from 'url';
+import { GoogleGenerativeAI } from "@google/generative-ai";
+import { getPythonWorker } from './pythonWorker.mjs';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+// Prompt templates shared with paste.py (prompts/test_cases_<version>.txt)
+const promptDir = path.join(__dirname, "prompts");
+const promptVersion = process.env.PROMPT_TEMPLATE_VERSION || "v3";
+
+const renderPrompt = (template, values) => template.replace(/\{\{(\w+)\}\}/g, (match, name) => {
+    if (!(name in values)) throw new Error(`No value for prompt placeholder ${name}`);
+    return values[name];
+});
+
+// Initialize Google Generative AI with API Key from environment variable
+const genAI = new GoogleGenerativeAI(process.env.GOOGLE_API_KEY);
+
+// Function to generate test cases with the resident Python worker (paste.py --serve).
+// Figma data and the SRS summary travel in the request body instead of a temp file.
+const runPythonScript = async (figmaData, srsDescription, testCasesFilePath) => {
+    console.log("📥 Sending extracted Figma data to the Python worker...");
+    const generatedTestCases = await getPythonWorker().generate(
+        { figma: figmaData, srs: srsDescription, options: { stream: true } },
+        (testCase) => console.log(`🐍 Test case ready: ${testCase.testCase}`)
+    );
+    await fs.writeFile(testCasesFilePath, generatedTestCases, "utf-8");
+    console.log(`✅ Test cases generated by the local LLM and saved to: ${testCasesFilePath}`);
+    return generatedTestCases;
+};
+
+// Generate test cases for processed Figma data and an SRS summary, write them to
+// testCasesFilePath and return the text. Uses Gemini unless TEST_CASE_GENERATOR=local.
+export const generateTestCases = async (pythonFormatData, srsDescription, testCasesFilePath) => {
+    // Keep the Figma data beside the test cases: ConvertTest.mjs builds its selector map from it
+    await fs.writeFile(path.join(path.dirname(testCasesFilePath), "figma_data.json"), JSON.stringify(pythonFormatData), "utf-8");
+
+    // Use the local LLM through the Python worker when requested
+    if (process.env.TEST_CASE_GENERATOR === "local") {
+        return runPythonScript(pythonFormatData, srsDescription, testCasesFilePath);
+    }
+
+    console.log("📝 Generating test cases using Gemini...");
+
+    const processedDataForPrompt = {
+        screens: [],
+        inputs: [],
+        buttons: []
+    };
+
+    // Extract relevant data for the prompt from pythonFormatData
+    pythonFormatData.pages.forEach(page => {
+        page.frames.forEach(frame => {
+            if (frame.frame && frame.frame.toLowerCase() !== "frame") {
+                processedDataForPrompt.screens.push(frame.frame);
+            }
+            frame.elements.forEach(element => {
+                if (element.name && element.name.toLowerCase().includes("input")) {
+                    processedDataForPrompt.inputs.push(element.name);
+                }
+                if (element.name && element.name.toLowerCase().includes("button")) {
+                    processedDataForPrompt.buttons.push(element.name);
+                }
+            });
+        });
+    });
+
+    // Same versioned template as paste.py: static instructions first, request data last
+    const template = await fs.readFile(path.join(promptDir, `test_cases_${promptVersion}.txt`), "utf-8");
+    // Same case count as paste.py's target_case_count(): two per screen, one per three elements
+    const elementCount = processedDataForPrompt.inputs.length + processedDataForPrompt.buttons.length;
+    const caseCount = Number(process.env.LLM_TARGET_CASES) || Math.max(Number(process.env.LLM_MIN_CASES) || 3,
+        Math.min(Number(process.env.LLM_MAX_CASES) || 30, 2 * processedDataForPrompt.screens.length + Math.ceil(elementCount / 3)));
+    const prompt = renderPrompt(template, {
+        case_count: caseCount,
+        srs_description: srsDescription,
+        screens: processedDataForPrompt.screens.join(", "),
+        inputs: processedDataForPrompt.inputs.join(", "),
+        buttons: processedDataForPrompt.buttons.join(", "),
+        extra_elements: ""
+    });
+
+    const model = genAI.getGenerativeModel({ model: "gemini-2.5-flash" });
+    const result = await model.generateContent(prompt);
+    const geminiResponse = await result.response;
+    const generatedTestCases = geminiResponse.text();
+
+    await fs.writeFile(testCasesFilePath, generatedTestCases, "utf-8");
+    console.log(`✅ Test cases generated by Gemini and saved to: ${testCasesFilePath}`);
+    return generatedTestCases;
+};
@@ -0,0 +1,116 @@
+// Tests fetchFigmaDesign against a stub Figma API. Run with: npm test
+import { test, before, after } from 'node:test';
+import assert from 'node:assert/strict';
+import http from 'http';
+import fs from 'fs/promises';
+import os from 'os';
+import path from 'path';
+
+const FILE_ID = "stubFile";
+const requests = [];
+const file = { version: "100", etag: '"v100"' };
+
+const frame = (id) => ({
+    id,
+    name: `Screen ${id}`,
+    type: "FRAME",
+    children: [
+        { id: `${id}:1`, name: "Email input", type: "TEXTBOX" },
+        { id: `${id}:2`, name: "Login button", type: "BUTTON" }
+    ]
+});
+
+// Serves the depth=2 listing (with ETag revalidation) and /nodes batches, recording each request
+const server = http.createServer((req, res) => {
+    const url = new URL(req.url, "http://stub");
+    requests.push({ path: url.pathname, searchParams: url.searchParams, ifNoneMatch: req.headers["if-none-match"] });
+    res.setHeader("Content-Type", "application/json");
+    if (url.pathname === `/v1/files/${FILE_ID}`) {
+        if (req.headers["if-none-match"] === file.etag) {
+            res.writeHead(304);
+            return res.end();
+        }
+        res.setHeader("ETag", file.etag);
+        return res.end(JSON.stringify({
+            version: file.version,
+            document: {
+                children: [
+                    { name: "Page 1", children: ["1:1", "1:2", "1:3"].map(id => ({ id, type: "FRAME" })) },
+                    { name: "Cover", children: [{ id: "9:9", type: "FRAME" }] }
+                ]
+            }
+        }));
+    }
+    if (url.pathname === `/v1/files/${FILE_ID}/nodes`) {
+        const ids = url.searchParams.get("ids").split(",");
+        return res.end(JSON.stringify({ nodes: Object.fromEntries(ids.map(id => [id, { document: frame(id) }])) }));
+    }
+    res.writeHead(404);
+    res.end("{}");
+});
+
+let fetchFigmaDesign;
+let cacheDir;
+
+before(async () => {
+    await new Promise(resolve => server.listen(0, "127.0.0.1", resolve));
+    cacheDir = await fs.mkdtemp(path.join(os.tmpdir(), "figma-cache-"));
+    // figmaFetch.mjs reads its configuration at import time
+    process.env.FIGMA_API_URL = `http://127.0.0.1:${server.address().port}/v1`;
+    process.env.FIGMA_CACHE_DIR = cacheDir;
+    process.env.FIGMA_NODE_BATCH_SIZE = "2";
+    ({ fetchFigmaDesign } = await import('../figmaFetch.mjs'));
+});
+
+after(async () => {
+    server.close();
+    await fs.rm(cacheDir, { recursive: true, force: true });
+});
+
+const takeRequests = () => requests.splice(0, requests.length);
+
+test("lists the file at depth=2 and fetches frames in /nodes batches", async () => {
+    const design = await fetchFigmaDesign("token", FILE_ID);
+    const [listing, ...nodeRequests] = takeRequests();
+
+    assert.equal(listing.path, `/v1/files/${FILE_ID}`);
+    assert.equal(listing.searchParams.get("depth"), "2");
+    assert.equal(listing.ifNoneMatch, undefined);
+
+    // Only frames on "Page N" pages, at most FIGMA_NODE_BATCH_SIZE ids per request
+    const batches = nodeRequests.map(request => request.searchParams.get("ids").split(","));
+    assert.ok(nodeRequests.every(request => request.path === `/v1/files/${FILE_ID}/nodes`));
+    assert.deepEqual(batches.map(ids => ids.length), [2, 1]);
+    assert.deepEqual(batches.flat().sort(), ["1:1", "1:2", "1:3"]);
+
+    assert.equal(design.pages.length, 1);
+    assert.equal(design.pages[0].page, "Page 1");
+    assert.deepEqual(design.pages[0].frames.map(f => f.frame), ["Screen 1:1", "Screen 1:2", "Screen 1:3"]);
+    assert.deepEqual(design.pages[0].frames[0].elements, [
+        { name: "Email input", type: "TEXTBOX", category: "Text" },
+        { name: "Login button", type: "BUTTON", category: "Button" }
+    ]);
+});
+
+test("revalidates with If-None-Match and reuses frames cached at the same version", async () => {
+    const first = await fetchFigmaDesign("token", FILE_ID);
+    takeRequests();
+
+    const second = await fetchFigmaDesign("token", FILE_ID);
+    const seen = takeRequests();
+    assert.equal(seen.length, 1, "a 304 listing needs no /nodes requests");
+    assert.equal(seen[0].ifNoneMatch, file.etag);
+    assert.deepEqual(second, first);
+});
+
+test("refetches frames once the file version changes", async () => {
+    await fetchFigmaDesign("token", FILE_ID);
+    takeRequests();
+
+    file.version = "101";
+    file.etag = '"v101"';
+    await fetchFigmaDesign("token", FILE_ID);
+    const [listing, ...nodeRequests] = takeRequests();
+    assert.equal(listing.ifNoneMatch, '"v100"');
+    assert.deepEqual(nodeRequests.flatMap(request => request.searchParams.get("ids").split(",")).sort(), ["1:1", "1:2", "1:3"]);
+});
@@ -0,0 +1,24 @@
+// Tests the per-page cache key of pdfPages.mjs. Run with: npm test
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import { pageContentHash } from '../pdfPages.mjs';
+
+const item = (str, x, y, fontName = "g_d0_f1") => ({ str, transform: [12, 0, 0, 12, x, y], fontName });
+const content = (...items) => ({ items });
+
+test("the same text content hashes the same", () => {
+    const page = () => content(item("Login", 72, 700), item("Email is required", 72, 680));
+    assert.equal(pageContentHash(page()), pageContentHash(page()));
+});
+
+test("changed strings, positions or fonts change the hash", () => {
+    const base = pageContentHash(content(item("Login", 72, 700)));
+    assert.notEqual(pageContentHash(content(item("Logout", 72, 700))), base);
+    assert.notEqual(pageContentHash(content(item("Login", 72, 650))), base);
+    assert.notEqual(pageContentHash(content(item("Login", 72, 700, "g_d0_f2"))), base);
+});
+
+test("item boundaries are part of the hash", () => {
+    assert.notEqual(pageContentHash(content(item("ab", 72, 700), item("c", 72, 700))),
+                    pageContentHash(content(item("a", 72, 700), item("bc", 72, 700))));
+});
@@ -0,0 +1,127 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import case_dedupe
+import paste
+from case_dedupe import (NUM_PERM, DedupeIndex, case_fingerprint, case_tokens, dedupe_test_cases,
+                         minhash_signature, similarity)
+from case_parser import parse_test_cases
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "figma_data.json")
+
+LOGIN = {
+    "testCase": "Valid Login",
+    "steps": ["Go to the login page", "Enter a registered email", "Enter the correct password", "Click Login",
+              "Wait for the dashboard to load"],
+    "expectedResult": "The dashboard shows the account name and recent orders.",
+}
+# Same steps, reworded with synonyms and filler the normalizer drops
+REWORDED = {
+    "testCase": "Login with valid credentials",
+    "steps": ["Navigate to the login page", "Type a registered email", "Input the correct password",
+              "Tap the Login button", "Wait for the dashboard to load"],
+    "expectedResult": "The dashboard shows the account name and the recent orders.",
+}
+# One step differs: similar, but not the same wording
+NEAR = dict(LOGIN, steps=LOGIN["steps"][:4] + ["Wait for the home page to load"])
+LOGOUT = {
+    "testCase": "Logout",
+    "steps": ["Open the account menu", "Click Logout"],
+    "expectedResult": "The login page is displayed.",
+}
+
+DUPLICATED_OUTPUT = """Test Case: Valid Login
+Steps:
+- Enter a registered email
+- Click 'Login'
+Expected Result: User lands on the dashboard.
+
+Test Case: Login works
+Steps:
+- Type a registered email
+- Tap 'Login'
+Expected Result: User lands on the dashboard.
+"""
+
+
+def signature(test_case):
+    return minhash_signature(case_tokens(test_case))
+
+
+def test_minhash_signature_is_deterministic():
+    assert len(signature(LOGIN)) == NUM_PERM
+    assert signature(LOGIN) == signature(dict(LOGIN))
+    assert similarity(signature(LOGIN), signature(LOGIN)) == 1.0
+
+
+def test_similarity_tracks_shared_shingles():
+    near = similarity(signature(LOGIN), signature(NEAR))
+    assert 0.5 < near < 1.0
+    assert similarity(signature(LOGIN), signature(LOGOUT)) < 0.2
+
+
+def test_reworded_case_is_an_exact_duplicate():
+    assert case_fingerprint(LOGIN) == case_fingerprint(REWORDED)
+    index = DedupeIndex()
+    assert index.add(LOGIN)[0] == "new"
+    status, entry = index.add(REWORDED)
+    assert status == "duplicate"
+    assert entry["testCase"] == "Valid Login"
+
+
+def test_threshold_decides_near_duplicates():
+    score = similarity(signature(LOGIN), signature(NEAR))
+
+    below = DedupeIndex(threshold=score - 0.1)
+    below.add(LOGIN)
+    status, entry = below.add(NEAR)
+    assert status == "near-duplicate"
+    assert entry["steps"] == LOGIN["steps"]
+
+    above = DedupeIndex(threshold=min(score + 0.1, 1.0))
+    above.add(LOGIN)
+    assert above.add(NEAR)[0] == "new"
+    assert len(above.entries) == 2
+
+
+def test_dedupe_keeps_the_first_of_each_group():
+    assert dedupe_test_cases([LOGIN, LOGOUT, REWORDED, NEAR], threshold=0.6) == [LOGIN, LOGOUT]
+    assert dedupe_test_cases([LOGIN, LOGOUT, REWORDED, NEAR], threshold=1.0) == [LOGIN, LOGOUT, NEAR]
+
+
+def test_suite_merges_across_runs(tmp_path):
+    suite_file = str(tmp_path / "suite.json")
+    suite = case_dedupe.TestSuite(suite_file)
+    assert suite.merge([LOGIN, LOGOUT]) == {"new": 2, "duplicate": 0, "near-duplicate": 0}
+    suite.save()
+
+    reloaded = case_dedupe.TestSuite(suite_file)
+    assert reloaded.merge([REWORDED]) == {"new": 0, "duplicate": 1, "near-duplicate": 0}
+    assert [case["testCase"] for case in reloaded.test_cases()] == ["Valid Login", "Logout"]
+    entry = reloaded.index.entries[0]
+    assert entry["occurrences"] == 2
+    assert entry["aliases"] == ["Login with valid credentials"]
+
+
+def run_pipeline(tmp_path, monkeypatch, *flags):
+    monkeypatch.setattr(paste, "generate_playwright_test_cases", lambda *args, **kwargs: DUPLICATED_OUTPUT)
+    output_file = tmp_path / "test_cases.txt"
+    args = paste.parse_args([FIXTURE, "--suite", str(tmp_path / "suite.json"), *flags])
+    paste.run_pipeline(FIXTURE, "SRS", args, output_file=str(output_file))
+    return parse_test_cases(output_file.read_text(encoding="utf-8"))
+
+
+def test_pipeline_drops_duplicates_into_the_suite(tmp_path, monkeypatch):
+    test_cases = run_pipeline(tmp_path, monkeypatch, "--no-store")
+    assert [case["testCase"] for case in test_cases] == ["Valid Login"]
+    with open(tmp_path / "suite.json", encoding="utf-8") as file:
+        assert len(json.load(file)["cases"]) == 1
+
+
+def test_no_dedupe_keeps_duplicates_and_skips_the_suite(tmp_path, monkeypatch):
+    test_cases = run_pipeline(tmp_path, monkeypatch, "--no-store", "--no-dedupe")
+    assert [case["testCase"] for case in test_cases] == ["Valid Login", "Login works"]
+    assert not (tmp_path / "suite.json").exists()
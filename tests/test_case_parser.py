@@ -0,0 +1,81 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import case_parser
+from case_parser import IncrementalTestCaseParser, parse_test_cases
+from paste import merge_test_case_texts, split_test_case_blocks
+
+PLAIN = """Test Case: Valid Login
+Steps:
+- Enter a registered email
+- Click 'Login'
+Expected Result: User lands on the dashboard.
+"""
+
+NUMBERED = """1. Test Case: Valid Login
+Steps:
+1. Enter a registered email
+2. Click 'Login'
+Expected Result: User lands on the dashboard.
+
+2. Test Case: Invalid Login
+Steps:
+1. Enter a wrong password
+Expected Result: An error message is shown.
+"""
+
+BOLD_NUMBERED = """**1. Test Case: Valid Login**
+**Steps:**
+* Enter a registered email
+* Click 'Login'
+**Expected Result:** User lands on the dashboard.
+
+**2) Test Case 2: Invalid Login**
+- Enter a wrong password
+**Expected Result:** An error message is shown.
+"""
+
+VALID_LOGIN = {
+    "testCase": "Valid Login",
+    "steps": ["Enter a registered email", "Click 'Login'"],
+    "expectedResult": "User lands on the dashboard.",
+}
+INVALID_LOGIN = {
+    "testCase": "Invalid Login",
+    "steps": ["Enter a wrong password"],
+    "expectedResult": "An error message is shown.",
+}
+
+
+def test_plain_heading():
+    assert parse_test_cases(PLAIN) == [VALID_LOGIN]
+
+
+def test_numbered_headings_are_not_steps():
+    assert parse_test_cases(NUMBERED) == [VALID_LOGIN, INVALID_LOGIN]
+
+
+def test_bold_numbered_headings():
+    assert parse_test_cases(BOLD_NUMBERED) == [VALID_LOGIN, INVALID_LOGIN]
+
+
+def test_chunked_feed_matches_whole_text():
+    parser = IncrementalTestCaseParser()
+    test_cases = []
+    for start in range(0, len(BOLD_NUMBERED), 7):
+        test_cases += parser.feed(BOLD_NUMBERED[start:start + 7])
+    assert test_cases + parser.close() == [VALID_LOGIN, INVALID_LOGIN]
+
+
+def test_numbered_heading_blocks_survive_merge():
+    assert len(split_test_case_blocks(NUMBERED)) == 2
+    merged = merge_test_case_texts([NUMBERED, BOLD_NUMBERED])
+    assert parse_test_cases(merged) == [VALID_LOGIN, INVALID_LOGIN, VALID_LOGIN, INVALID_LOGIN]
+
+
+def test_long_input_spans_scan_blocks():
+    text = NUMBERED * 2000
+    assert len(text) > case_parser.SCAN_BLOCK * 2
+    assert parse_test_cases(text) == [VALID_LOGIN, INVALID_LOGIN] * 2000
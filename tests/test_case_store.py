@@ -0,0 +1,159 @@
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import case_store
+import paste
+from case_store import CaseStore, screen_key
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "figma_data.json")
+SCREENS = ["Login Page", "Dashboard"]
+
+LOGIN = {
+    "testCase": "Valid Login",
+    "steps": ["Go to 'Login Page'", "Enter a registered email", "Click 'Login'"],
+    "expectedResult": "The Dashboard is shown.",
+}
+SIGN_UP = {
+    "testCase": "Sign Up",
+    "steps": ["Navigate to 'Sign Up Screen'", "Enter a new email", "Click 'Create account'"],
+    "expectedResult": "A welcome message is shown.",
+}
+LOGOUT = {
+    "testCase": "Logout",
+    "steps": ["Open the account menu", "Click 'Logout'"],
+    "expectedResult": "The account menu is closed.",
+}
+
+OUTPUT = """Test Case: Valid Login
+Steps:
+- Go to 'Login Page'
+- Enter a registered email
+Expected Result: The Dashboard is shown.
+"""
+
+
+def open_store(tmp_path):
+    return CaseStore(str(tmp_path / "cases.db"))
+
+
+def titles(cases):
+    return [case["testCase"] for case in cases]
+
+
+def test_screen_key_ignores_case_and_suffixes():
+    assert screen_key("Login Page") == screen_key("login") == "login"
+    assert screen_key("Sign Up Screen") == "sign up"
+    assert screen_key("Page") == "page"
+
+
+def test_screen_query(tmp_path):
+    store = open_store(tmp_path)
+    store.add_run("shop", [LOGIN, SIGN_UP, LOGOUT], known_screens=SCREENS)
+    store.add_run("other", [LOGIN], known_screens=SCREENS)
+    # Navigated to, or named in the text
+    assert titles(store.cases("shop", screen="Login Page")) == ["Valid Login"]
+    assert titles(store.cases("shop", screen="dashboard")) == ["Valid Login"]
+    assert titles(store.cases("shop", screen="Sign Up")) == ["Sign Up"]
+    assert store.cases("shop", screen="Settings") == []
+    assert titles(store.cases("shop")) == ["Valid Login", "Sign Up", "Logout"]
+    store.close()
+
+
+def test_since_and_latest_queries(tmp_path):
+    store = open_store(tmp_path)
+    first = store.add_run("shop", [LOGIN, SIGN_UP])
+    last_id = store.cases("shop")[-1]["id"]
+    second = store.add_run("shop", [LOGIN, LOGOUT])
+
+    assert titles(store.cases("shop", since=last_id)) == ["Valid Login", "Logout"]
+    # The repeated case is kept once, from the newest run
+    latest = store.cases("shop")
+    assert titles(latest) == ["Sign Up", "Valid Login", "Logout"]
+    assert [case["runId"] for case in latest] == [first, second, second]
+    assert titles(store.cases("shop", latest=False)) == ["Valid Login", "Sign Up", "Valid Login", "Logout"]
+    assert [run["cases"] for run in store.runs("shop")] == [2, 2]
+    store.close()
+
+
+def test_repeats_within_a_run_are_stored_once(tmp_path):
+    store = open_store(tmp_path)
+    store.add_run("shop", [LOGIN, dict(LOGIN, testCase="Login again")])
+    assert titles(store.cases("shop", latest=False)) == ["Valid Login"]
+    store.close()
+
+
+def test_export_since_the_last_printed_id(tmp_path, capsys):
+    db_file = str(tmp_path / "cases.db")
+    store = CaseStore(db_file)
+    store.add_run("shop", [LOGIN])
+    store.close()
+    case_store.main(["--db", db_file, "export", "--project", "shop", "--format", "jsonl"])
+    output = capsys.readouterr()
+    assert [json.loads(line)["testCase"] for line in output.out.splitlines()] == ["Valid Login"]
+    last_id = output.err.split("last id: ")[1].strip()
+
+    store = CaseStore(db_file)
+    store.add_run("shop", [SIGN_UP])
+    store.close()
+    case_store.main(["--db", db_file, "export", "--project", "shop", "--since", last_id, "--format", "jsonl"])
+    assert [json.loads(line)["testCase"] for line in capsys.readouterr().out.splitlines()] == ["Sign Up"]
+
+
+def test_concurrent_writers(tmp_path):
+    db_file = str(tmp_path / "cases.db")
+    CaseStore(db_file).close()
+    errors = []
+
+    def write(worker):
+        store = CaseStore(db_file)
+        try:
+            for run in range(10):
+                store.add_run(f"project-{worker}", [dict(LOGIN, steps=LOGIN["steps"] + [f"Check run {run}"]), LOGOUT])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            store.close()
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    store = CaseStore(db_file)
+    runs = store.runs()
+    assert len(runs) == 40
+    assert all(run["cases"] == 2 for run in runs)
+    for worker in range(4):
+        assert len(store.cases(f"project-{worker}")) == 11
+        assert len(store.cases(f"project-{worker}", latest=False)) == 20
+    store.close()
+
+
+def run_pipeline(tmp_path, monkeypatch, *flags):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("TEST_CASE_DB", raising=False)
+    monkeypatch.setattr(paste, "generate_playwright_test_cases", lambda *args, **kwargs: OUTPUT)
+    args = paste.parse_args([FIXTURE, *flags])
+    paste.run_pipeline(FIXTURE, "SRS", args, output_file=str(tmp_path / "test_cases.txt"))
+
+
+def test_pipeline_does_not_store_unless_asked(tmp_path, monkeypatch):
+    run_pipeline(tmp_path, monkeypatch)
+    assert sorted(os.listdir(tmp_path)) == ["test_cases.txt"]
+
+
+def test_pipeline_appends_each_run(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "cases.db")
+    run_pipeline(tmp_path, monkeypatch, "--store", db_file)
+    run_pipeline(tmp_path, monkeypatch, "--store", db_file, "--project", "shop")
+    store = CaseStore(db_file)
+    assert [run["project"] for run in store.runs()] == ["figma_data", "shop"]
+    # The fixture's frames are known screens
+    assert titles(store.cases("shop", screen="Login Page")) == ["Valid Login"]
+    store.close()
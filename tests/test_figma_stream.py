@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import figma_stream
+from figma_stream import iter_figma_frames
+
+FRAME_LOGIN = {
+    "frame": "Login",
+    "elements": [
+        {"name": "Email \"work\" address", "type": "TEXT", "children": [[1, [2, 3]], []]},
+        {"name": "Path C:\\temp\\{x}", "type": "RECTANGLE", "text": "[not] {json}"},
+        {"name": "Caf\u00e9 \u2713", "type": "BUTTON"},
+    ],
+}
+FRAME_SIGNUP = {"frame": "Sign Up", "elements": [{"name": "Full Name", "type": "INSTANCE", "sizes": [1.5, -2e3, 0]}]}
+
+DOCUMENT = {
+    "name": "Design with \"quotes\", \\backslashes\\ and } braces {",
+    "meta": {"nested": [[["deep", {"a": [1, 2, {"b": "]"}]}]]], "flag": True, "none": None},
+    "pages": [
+        {"page": "Page 1", "frames": [FRAME_LOGIN], "notes": ["x", {"y": "\\\""}]},
+        {"frames": [FRAME_SIGNUP, FRAME_LOGIN], "thumbnail": "\\u005c", "page": "Page 2"},
+        {"frames": [FRAME_SIGNUP]},
+    ],
+    "version": 12345,
+}
+EXPECTED = [("Page 1", FRAME_LOGIN), ("Page 2", FRAME_SIGNUP), ("Page 2", FRAME_LOGIN), ("", FRAME_SIGNUP)]
+
+
+@pytest.fixture
+def figma_file(tmp_path):
+    path = tmp_path / "figma_data.json"
+    path.write_text(json.dumps(DOCUMENT, indent=1, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, figma_stream.CHUNK_SIZE])
+def test_chunk_boundaries_inside_strings_and_escapes(figma_file, chunk_size):
+    assert list(iter_figma_frames(figma_file, chunk_size)) == EXPECTED
+
+
+def test_page_name_after_frames(figma_file):
+    # "Page 2" lists its frames before its name; they still get the name
+    assert [page for page, _ in iter_figma_frames(figma_file, 5)] == ["Page 1", "Page 2", "Page 2", ""]
+
+
+def test_compact_json_and_nested_arrays(tmp_path):
+    path = tmp_path / "compact.json"
+    path.write_text(json.dumps(DOCUMENT, separators=(",", ":")), encoding="utf-8")
+    assert list(iter_figma_frames(str(path), 4)) == EXPECTED
+
+
+def test_skipped_values_are_not_decoded(figma_file, monkeypatch):
+    decoded = []
+    value = figma_stream._JsonStream.value
+
+    def record(stream):
+        result = value(stream)
+        decoded.append(result)
+        return result
+
+    monkeypatch.setattr(figma_stream._JsonStream, "value", record)
+    list(iter_figma_frames(figma_file, 16))
+    # Keys, page names and frames only; "name", "meta", "notes" and "thumbnail" are scanned past
+    assert DOCUMENT["meta"] not in decoded
+    assert DOCUMENT["name"] not in decoded
+    assert DOCUMENT["pages"][0]["notes"] not in decoded
+
+
+def test_truncated_file_raises(tmp_path):
+    path = tmp_path / "truncated.json"
+    path.write_text(json.dumps(DOCUMENT)[:60], encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_figma_frames(str(path), 8))
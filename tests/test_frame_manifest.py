@@ -0,0 +1,152 @@
+import copy
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import paste
+from frame_manifest import FrameManifest, fingerprint_frame, frame_keys
+
+LOGIN = {
+    "frame": "Login Page",
+    "elements": [
+        {"name": "Email", "type": "TEXTBOX", "category": "Input Field"},
+        {"name": "Login Button", "type": "BUTTON", "category": "Button"},
+    ],
+}
+DASHBOARD = {
+    "frame": "Dashboard",
+    "elements": [{"name": "Logout", "type": "BUTTON", "category": "Button"}],
+}
+
+
+def design(*frames, page="Page 1"):
+    return {"pages": [{"page": page, "frames": [copy.deepcopy(frame) for frame in frames]}]}
+
+
+class FakeLLM:
+    """Stands in for generate_playwright_test_cases and records the screens it was prompted for."""
+
+    def __init__(self, failing=()):
+        self.prompted = []
+        self.failing = set(failing)
+
+    def __call__(self, processed_data, srs_description, **kwargs):
+        screens = processed_data["screens"]
+        self.prompted.extend(screens)
+        if self.failing.intersection(screens):
+            return ""
+        return "\n".join(f"Test Case: {screen} ({srs_description})\nSteps:\n- Go to '{screen}'\n"
+                         f"Expected Result: {screen} is shown.\n" for screen in screens)
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    figma_file = tmp_path / "figma_data.json"
+    manifest_file = str(tmp_path / "frame_manifest.json")
+
+    def run(figma_data, srs="SRS", llm=None):
+        llm = llm or FakeLLM()
+        monkeypatch.setattr(paste, "generate_playwright_test_cases", llm)
+        figma_file.write_text(json.dumps(figma_data), encoding="utf-8")
+        text = paste.generate_incremental_test_cases(str(figma_file), srs, manifest_file, workers=1)
+        return llm.prompted, text
+
+    run.manifest_file = manifest_file
+    return run
+
+
+def test_fingerprint_covers_frame_and_element_fields():
+    fingerprint = fingerprint_frame(LOGIN)
+    assert fingerprint_frame(copy.deepcopy(LOGIN)) == fingerprint
+    for field in ("name", "type", "category"):
+        changed = copy.deepcopy(LOGIN)
+        changed["elements"][0][field] = "Other"
+        assert fingerprint_frame(changed) != fingerprint
+    assert fingerprint_frame(dict(LOGIN, frame="Sign In")) != fingerprint
+    assert fingerprint_frame(dict(LOGIN, elements=LOGIN["elements"][:1])) != fingerprint
+
+
+def test_fingerprint_ignores_other_attributes():
+    decorated = copy.deepcopy(LOGIN)
+    decorated["id"] = "12:34"
+    decorated["elements"][0]["x"] = 40
+    assert fingerprint_frame(decorated) == fingerprint_frame(LOGIN)
+
+
+def test_frame_keys_number_repeated_names():
+    frames = [("Page 1", LOGIN), ("Page 1", LOGIN), ("Page 2", LOGIN)]
+    assert [key for key, _ in frame_keys(frames)] == ["Page 1/Login Page", "Page 1/Login Page#2", "Page 2/Login Page"]
+
+
+def test_lookup_and_context(tmp_path):
+    manifest_file = str(tmp_path / "frame_manifest.json")
+    manifest = FrameManifest(manifest_file)
+    manifest.set_context("SRS", False)
+    manifest.save({"Page 1/Login Page": {"fingerprint": "abc", "testCases": "Test Case: Login"}})
+
+    reloaded = FrameManifest(manifest_file)
+    reloaded.set_context("SRS", False)
+    assert reloaded.lookup("Page 1/Login Page", "abc") == "Test Case: Login"
+    assert reloaded.lookup("Page 1/Login Page", "def") is None
+    assert reloaded.lookup("Page 1/Dashboard", "abc") is None
+    reloaded.set_context("SRS", True)
+    assert reloaded.lookup("Page 1/Login Page", "abc") is None
+
+
+def test_unreadable_manifest_regenerates_everything(tmp_path):
+    manifest_file = tmp_path / "frame_manifest.json"
+    manifest_file.write_text("{not json", encoding="utf-8")
+    assert FrameManifest(str(manifest_file)).frames == {}
+
+
+def test_unchanged_frames_are_reused(pipeline):
+    prompted, first = pipeline(design(LOGIN, DASHBOARD))
+    assert prompted == ["Login Page", "Dashboard"]
+    prompted, second = pipeline(design(LOGIN, DASHBOARD))
+    assert prompted == []
+    assert second == first
+
+
+def test_only_changed_frames_are_regenerated(pipeline):
+    pipeline(design(LOGIN, DASHBOARD))
+    changed = copy.deepcopy(DASHBOARD)
+    changed["elements"].append({"name": "Settings", "type": "BUTTON", "category": "Button"})
+    prompted, text = pipeline(design(LOGIN, changed))
+    assert prompted == ["Dashboard"]
+    assert "Test Case: Login Page" in text and "Test Case: Dashboard" in text
+
+
+def test_new_and_removed_frames(pipeline):
+    pipeline(design(LOGIN))
+    prompted, _ = pipeline(design(LOGIN, DASHBOARD))
+    assert prompted == ["Dashboard"]
+    prompted, text = pipeline(design(DASHBOARD))
+    assert prompted == []
+    assert "Login Page" not in text
+    with open(pipeline.manifest_file, encoding="utf-8") as file:
+        assert list(json.load(file)["frames"]) == ["Page 1/Dashboard"]
+
+
+def test_renamed_page_is_a_new_frame(pipeline):
+    pipeline(design(LOGIN))
+    prompted, _ = pipeline(design(LOGIN, page="Page 2"))
+    assert prompted == ["Login Page"]
+
+
+def test_srs_change_regenerates_every_frame(pipeline):
+    pipeline(design(LOGIN, DASHBOARD))
+    prompted, text = pipeline(design(LOGIN, DASHBOARD), srs="New SRS")
+    assert prompted == ["Login Page", "Dashboard"]
+    assert "(New SRS)" in text and "(SRS)" not in text
+
+
+def test_failed_frames_are_retried(pipeline):
+    prompted, text = pipeline(design(LOGIN, DASHBOARD), llm=FakeLLM(failing=["Dashboard"]))
+    assert prompted == ["Login Page", "Dashboard"]
+    assert "Dashboard" not in text
+    prompted, _ = pipeline(design(LOGIN, DASHBOARD))
+    assert prompted == ["Dashboard"]
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import STALE_TEMP_AGE, ResponseCache, cache_key
+
+PAYLOAD = {"model": "stub", "prompt": "Generate test cases", "max_tokens": 50, "temperature": 0.2}
+
+
+def payload(number):
+    return {**PAYLOAD, "prompt": f"Generate test cases {number}"}
+
+
+def age(path, seconds):
+    """Move a file's modification time seconds into the past."""
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def entry_path(cache, payload):
+    return os.path.join(cache.cache_dir, f"{cache_key(payload)}.json")
+
+
+def test_miss_then_hit(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    assert cache.get(PAYLOAD) is None
+    cache.put(PAYLOAD, "Test Case: Login")
+    assert cache.get(PAYLOAD) == "Test Case: Login"
+    # A fresh instance reads the same directory
+    assert ResponseCache(str(tmp_path)).get(PAYLOAD) == "Test Case: Login"
+
+
+def test_key_covers_only_completion_fields(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put(PAYLOAD, "Test Case: Login")
+    assert cache.get({**PAYLOAD, "stream": True}) == "Test Case: Login"
+    for field, value in (("model", "other"), ("prompt", "Other"), ("temperature", 0.7), ("max_tokens", 60),
+                         ("stop", ["\n\n"])):
+        assert cache.get({**PAYLOAD, field: value}) is None
+
+
+def test_empty_completion_is_not_stored(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put(PAYLOAD, "")
+    assert os.listdir(tmp_path) == []
+
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age=60)
+    cache.put(PAYLOAD, "Test Case: Login")
+    path = entry_path(cache, PAYLOAD)
+    age(path, 30)
+    assert cache.get(PAYLOAD) == "Test Case: Login"
+    age(path, 120)
+    assert cache.get(PAYLOAD) is None
+    assert not os.path.exists(path)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=0)
+    for number in range(3):
+        cache.put(payload(number), "x" * 100)
+        age(entry_path(cache, payload(number)), 100 - number)
+    cache.max_bytes = os.path.getsize(entry_path(cache, payload(0))) * 2
+
+    # Reading the oldest entry makes the middle one the least recently used
+    assert cache.get(payload(0)) is not None
+    cache.put(payload(3), "x" * 100)
+    assert [cache.get(payload(number)) is not None for number in range(4)] == [True, False, False, True]
+
+
+def test_eviction_removes_expired_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age=60)
+    cache.put(payload(0), "Test Case: Login")
+    age(entry_path(cache, payload(0)), 120)
+    cache.evict()
+    assert os.listdir(tmp_path) == []
+
+
+def test_stale_temp_files_are_removed(tmp_path):
+    # Left behind by writers that crashed between mkstemp and replace
+    stale = tmp_path / f"{cache_key(PAYLOAD)}.abc123.tmp"
+    stale.write_text("x" * 100, encoding="utf-8")
+    age(stale, STALE_TEMP_AGE + 60)
+    fresh = tmp_path / f"{cache_key(PAYLOAD)}.def456.tmp"
+    fresh.write_text("x" * 100, encoding="utf-8")
+
+    cache = ResponseCache(str(tmp_path))
+    # The first write of a process scans the directory
+    cache.put(payload(1), "Test Case: Login")
+    assert not stale.exists()
+    assert fresh.exists()
+    assert cache._size == 100 + os.path.getsize(entry_path(cache, payload(1)))
+
+
+def test_temp_files_count_towards_the_budget(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=0)
+    cache.put(payload(0), "x" * 100)
+    cache.max_bytes = os.path.getsize(entry_path(cache, payload(0))) + 50
+    (tmp_path / "in-progress.tmp").write_text("x" * 100, encoding="utf-8")
+    cache.evict()
+    assert cache.get(payload(0)) is None
@@ -0,0 +1,116 @@
+import json
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+from llm_cache import ResponseCache, answered_payload, lookup
+from llm_router import Backend, LLMRouter
+from stub_llm import start_stub
+
+PAYLOAD = {"model": "stub", "prompt": "Generate test cases", "max_tokens": 50}
+
+
+def start_status_server(status):
+    """A completions endpoint that answers every POST with the given error status."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.server.requests += 1
+            body = json.dumps({"error": "rejected"}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.requests = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v1/completions"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/v1/completions"
+
+
+def make_router(*urls, strategy="least-outstanding"):
+    backends = [Backend(url, max_retries=0) for url in urls]
+    return LLMRouter(backends, strategy=strategy, health_interval=0)
+
+
+@pytest.fixture
+def stubs():
+    servers = [start_stub(latency=0, tokens_per_second=0, cases=2) for _ in range(2)]
+    yield servers
+    for server in servers:
+        server.shutdown()
+
+
+def test_weighted_round_robin_spreads_requests(stubs):
+    router = make_router(*(server.url for server in stubs), strategy="weighted-round-robin")
+    for _ in range(4):
+        assert "Test Case:" in router.complete(PAYLOAD)
+    assert [server.requests for server in stubs] == [2, 2]
+
+
+def test_fails_over_from_unreachable_backend(stubs):
+    router = make_router(closed_port_url(), stubs[0].url)
+    stats = {}
+    assert "Test Case:" in router.complete(PAYLOAD, stats=stats)
+    assert stats["backend"] == stubs[0].url
+    assert [backend.healthy for backend in router.backends] == [False, True]
+    assert "Test Case:" in "".join(router.stream(PAYLOAD))
+
+
+def test_fails_over_on_server_error(stubs):
+    failing = start_status_server(503)
+    router = make_router(failing.url, stubs[0].url)
+    assert "Test Case:" in router.complete(PAYLOAD)
+    assert failing.requests == 1
+    assert not router.backends[0].healthy
+    failing.shutdown()
+
+
+def test_client_error_does_not_fail_over(stubs):
+    rejecting = start_status_server(400)
+    router = make_router(rejecting.url, stubs[0].url)
+    with pytest.raises(requests.exceptions.HTTPError):
+        router.complete(PAYLOAD)
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(router.stream(PAYLOAD))
+    assert stubs[0].requests == 0
+    assert all(backend.healthy for backend in router.backends)
+    rejecting.shutdown()
+
+
+def test_cache_entries_are_keyed_by_the_backend_model(stubs, tmp_path):
+    backends = [Backend(server.url, model=model, max_retries=0) for server, model in zip(stubs, ("model-a", "model-b"))]
+    router = LLMRouter(backends, health_interval=0)
+    assert [payload["model"] for payload in router.cache_payloads(PAYLOAD)] == ["model-a", "model-b"]
+
+    cache = ResponseCache(str(tmp_path))
+    stats = {}
+    text = router.complete(PAYLOAD, stats=stats)
+    assert stats["model"] == "model-a"
+    cache.put(answered_payload(PAYLOAD, stats), text)
+
+    # Stored under the model that answered, not the payload's model, and found through the router
+    assert cache.get(PAYLOAD) is None
+    assert cache.get({**PAYLOAD, "model": "model-a"}) == text
+    assert cache.get({**PAYLOAD, "model": "model-b"}) is None
+    assert lookup(cache, router, PAYLOAD) == text
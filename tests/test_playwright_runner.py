@@ -0,0 +1,113 @@
+import json
+import os
+import re
+import sys
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import playwright_compiler
+import playwright_runner
+from results_store import ResultsStore
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+TEST_CASES = os.path.join(FIXTURES, "test_cases.txt")
+FIGMA = os.path.join(FIXTURES, "figma_data.json")
+
+
+def compile_fixture(tmp_path):
+    spec = tmp_path / "spec.js"
+    playwright_compiler.main([TEST_CASES, "--figma", FIGMA, "--no-llm", "--output", str(spec),
+                              "--results-store", str(tmp_path / "results.json")])
+    return spec.read_text(encoding="utf-8")
+
+
+def test_fixture_cases_compile_without_llm(tmp_path):
+    spec = compile_fixture(tmp_path)
+
+    assert spec.startswith("import { test, expect } from '@playwright/test';")
+    assert "TODO" not in spec
+    assert spec.count("annotation: { type: 'caseId'") == 4
+    assert "await page.goto('/login');" in spec
+    assert "await page.getByLabel('Email').fill('test.user@example.com');" in spec
+    assert "await page.getByRole('checkbox', { name: 'Remember me' }).check();" in spec
+    assert "await page.getByLabel('Country').selectOption({ label: 'India' });" in spec
+    assert "await expect(page).toHaveURL(new RegExp('/dashboard'));" in spec
+    assert "await expect(page.getByText('Email is required')).toBeVisible();" in spec
+
+
+def test_fixture_app_has_every_compiled_route_and_label(tmp_path):
+    spec = compile_fixture(tmp_path)
+    server = playwright_runner.serve_fixture(os.path.join(FIXTURES, "app"))
+    try:
+        for body in spec.split("  test(")[1:]:
+            route = re.search(r"page\.goto\('([^']+)'\)", body).group(1)
+            with urllib.request.urlopen(server.url + route) as response:
+                html = response.read().decode("utf-8")
+            for name in re.findall(r"getBy(?:Label\('|Role\('\w+', \{ name: ')([^']+)'", body):
+                assert name in html, f"'{name}' is not on {route}"
+    finally:
+        server.shutdown()
+
+
+def compiled_fixture_cases():
+    test_cases = playwright_compiler.load_test_cases(TEST_CASES)
+    with open(FIGMA, 'r', encoding="utf-8") as file:
+        selectors = playwright_compiler.SelectorMap.from_figma(json.load(file))
+    compiled, _ = playwright_compiler.compile_cases(test_cases, selectors, use_llm=False)
+    return compiled
+
+
+def test_shards_balance_on_recorded_durations(tmp_path):
+    compiled = compiled_fixture_cases()
+    store = ResultsStore(str(tmp_path / "results.json"))
+    # One slow case, as long as the other three together
+    slow, *fast = compiled
+    store.record(slow["id"], slow["testCase"], "passed", 9.0)
+    for case in fast:
+        store.record(case["id"], case["testCase"], "passed", 3.0)
+    store.save()
+
+    shard_dir = tmp_path / "shards"
+    playwright_runner.main([TEST_CASES, "--figma", FIGMA, "--no-llm", "--compile-only", "--shards", "2",
+                            "--shard-dir", str(shard_dir), "--results-store", str(tmp_path / "results.json")])
+
+    shards = sorted(os.listdir(shard_dir))
+    assert shards == ["shard-1.spec.js", "shard-2.spec.js"]
+    ids = sorted((re.findall(r"description: '([0-9a-f]+)'", (shard_dir / name).read_text(encoding="utf-8"))
+                  for name in shards), key=len)
+    assert ids[0] == [slow["id"]]
+    assert sorted(ids[1]) == sorted(case["id"] for case in fast)
+
+
+def test_failed_cases_run_first_and_passing_cases_can_be_skipped(tmp_path):
+    compiled = compiled_fixture_cases()
+    store = ResultsStore(str(tmp_path / "results.json"))
+    for case in compiled[:-1]:
+        for _ in range(2):
+            store.record(case["id"], case["testCase"], "passed", 1.0)
+    store.record(compiled[-1]["id"], compiled[-1]["testCase"], "failed", 1.0)
+
+    shards, skipped = playwright_compiler.plan_shards(compiled, 1, store)
+    assert skipped == 0
+    assert shards[0][0]["id"] == compiled[-1]["id"]
+
+    shards, skipped = playwright_compiler.plan_shards(compiled, 1, store, skip_passing=2)
+    assert skipped == 3
+    assert [case["id"] for case in shards[0]] == [compiled[-1]["id"]]
+
+
+def test_step_quoting_two_fields_fills_both():
+    with open(FIGMA, 'r', encoding="utf-8") as file:
+        selectors = playwright_compiler.SelectorMap.from_figma(json.load(file))
+    compiler = playwright_compiler.PlaywrightCompiler(selectors)
+
+    statements = compiler.compile_step("Enter a valid email and password in the 'Email' and 'Password' fields.")
+    assert statements == [
+        "await page.getByLabel('Email').fill('test.user@example.com');",
+        "await page.getByLabel('Password').fill('Password123!');",
+    ]
+    assert compiler.compile_step("Enter 'Jane' in the 'Full Name' field.") == [
+        "await page.getByLabel('Full Name').fill('Jane');",
+    ]
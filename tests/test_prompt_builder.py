@@ -0,0 +1,51 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_builder import chunk_text, count_tokens, select_srs
+
+SRS = """Login
+The login screen shall accept an email and a password.
+Users who enter a wrong password shall see an error message.
+Reports
+The reports screen shall export monthly sales as CSV.
+Admins can schedule report delivery by email every week.
+"""
+
+LOGIN = {"screen_name": "Login", "inputs": ["Email", "Password"], "buttons": ["Login"]}
+
+# One paragraph, no line breaks, far larger than the budgets below
+PARAGRAPH = " ".join(f"The system shall validate field number {i} before submitting the form."
+                     for i in range(200))
+
+
+def test_whole_srs_is_returned_when_it_fits():
+    assert select_srs(SRS, LOGIN, count_tokens(SRS)) == SRS
+
+
+def test_most_relevant_chunks_are_selected_in_order():
+    selected = select_srs(SRS, LOGIN, 40, chunk_tokens=20)
+    assert "password" in selected
+    assert "CSV" not in selected
+    assert count_tokens(selected) <= 40
+
+
+def test_zero_budget_returns_nothing():
+    assert select_srs(SRS, LOGIN, 0) == ""
+
+
+def test_long_lines_are_split_to_the_chunk_size():
+    chunks = chunk_text(PARAGRAPH, chunk_tokens=100)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == PARAGRAPH
+
+
+def test_single_paragraph_srs_is_not_dropped():
+    assert count_tokens(PARAGRAPH) > 3000
+    for budget in (500, 50, 5):
+        selected = select_srs(PARAGRAPH, {"inputs": ["field"]}, budget)
+        assert selected
+        assert count_tokens(selected) <= budget
+        assert PARAGRAPH.startswith(selected.split("\n")[0])